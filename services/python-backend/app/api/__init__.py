@@ -1,5 +1,17 @@
 from __future__ import annotations
 
-from . import agents, generate, posts, rituals, vault
+import importlib
+from typing import Any
 
-__all__ = ["agents", "generate", "posts", "rituals", "vault"]
+_ROUTERS = ("agents", "generate", "posts", "rituals", "search", "vault")
+
+
+def __getattr__(name: str) -> Any:
+    # Routers load on first use, so importing a helper such as
+    # ``app.api.pagination`` does not import every endpoint module.
+    if name in _ROUTERS:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ["agents", "generate", "posts", "rituals", "search", "vault"]
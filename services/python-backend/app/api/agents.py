@@ -4,13 +4,19 @@ from datetime import datetime
 from typing import Any
 from uuid import uuid4
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Body, Depends, Response, status
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from app.api.dependencies import get_db, require_api_key
+from app.api.batch import BatchResponse, batch_response, parse_batch
+from app.api.dependencies import get_read_db, require_api_key
+from app.api.fast import page_response, raw_json
+from app.api.pagination import PageParams, keyset_page, page_params
+from app.db.writer import write_rows
 from app.models.agent import Agent
+from app.utils.clock import utc_now
 
 router = APIRouter(prefix="/agents", tags=["agents"])
 
@@ -31,19 +37,34 @@ class AgentRead(BaseModel):
         return cls(id=agent.id, name=agent.name, traits=agent.traits or {}, created_at=agent.created_at)
 
 
+AGENT_COLUMNS = (Agent.id, Agent.name, raw_json(Agent.traits, "{}"), Agent.created_at)
+AGENT_JSON_COLUMNS = ("traits",)
+
+
+def build_agent_row(payload: AgentCreate) -> dict[str, Any]:
+    return {"id": str(uuid4()), "name": payload.name, "traits": payload.traits, "created_at": utc_now()}
+
+
 @router.get("", response_model=list[AgentRead])
-def list_agents(db: Session = Depends(get_db)) -> list[AgentRead]:
-    agents = db.scalars(select(Agent).order_by(Agent.created_at.desc())).all()
-    return [AgentRead.from_orm(agent) for agent in agents]
+def list_agents(page: PageParams = Depends(page_params), db: Session = Depends(get_read_db)) -> ORJSONResponse:
+    rows = db.execute(keyset_page(select(*AGENT_COLUMNS), Agent.created_at, Agent.id, page)).all()
+    return page_response(rows, page, AGENT_JSON_COLUMNS)
 
 
 @router.post("", response_model=AgentRead, status_code=status.HTTP_201_CREATED, dependencies=[Depends(require_api_key)])
-def create_agent(payload: AgentCreate, db: Session = Depends(get_db)) -> AgentRead:
-    agent = Agent(id=str(uuid4()), name=payload.name, traits=payload.traits)
-    db.add(agent)
-    db.commit()
-    db.refresh(agent)
-    return AgentRead.from_orm(agent)
+def create_agent(payload: AgentCreate) -> AgentRead:
+    row = build_agent_row(payload)
+    write_rows(Agent, [row])
+    return AgentRead(**row)
+
+
+@router.post("/batch", response_model=BatchResponse, status_code=status.HTTP_201_CREATED, dependencies=[Depends(require_api_key)])
+def create_agents_batch(response: Response, items: list[Any] = Body(...)) -> BatchResponse:
+    valid, rejected = parse_batch(AgentCreate, items)
+    rows = [build_agent_row(payload) for _, payload in valid]
+    if rows:
+        write_rows(Agent, rows)
+    return batch_response([(index, row["id"]) for (index, _), row in zip(valid, rows)], rejected, response)
 
 
 __all__ = ["router"]
@@ -0,0 +1,11 @@
+"""Event-loop-native versions of the API routers, used when ``db_async`` is enabled.
+
+Request/response models and row builders are shared with the sync routers;
+only the database access differs (``AsyncSession`` on aiosqlite).
+"""
+
+from __future__ import annotations
+
+from . import agents, generate, posts, rituals, search, vault
+
+__all__ = ["agents", "generate", "posts", "rituals", "search", "vault"]
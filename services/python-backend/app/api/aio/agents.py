@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from typing import Any
+
+from fastapi import APIRouter, Body, Depends, Response, status
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.agents import AGENT_COLUMNS, AGENT_JSON_COLUMNS, AgentCreate, AgentRead, build_agent_row
+from app.api.batch import BatchResponse, batch_response, parse_batch
+from app.api.dependencies import get_async_read_db, require_api_key
+from app.api.fast import page_response
+from app.api.pagination import PageParams, keyset_page, page_params
+from app.db.async_session import async_write_rows
+from app.models.agent import Agent
+
+router = APIRouter(prefix="/agents", tags=["agents"])
+
+
+@router.get("", response_model=list[AgentRead])
+async def list_agents(page: PageParams = Depends(page_params), db: AsyncSession = Depends(get_async_read_db)) -> ORJSONResponse:
+    rows = (await db.execute(keyset_page(select(*AGENT_COLUMNS), Agent.created_at, Agent.id, page))).all()
+    return page_response(rows, page, AGENT_JSON_COLUMNS)
+
+
+@router.post("", response_model=AgentRead, status_code=status.HTTP_201_CREATED, dependencies=[Depends(require_api_key)])
+async def create_agent(payload: AgentCreate) -> AgentRead:
+    row = build_agent_row(payload)
+    await async_write_rows(Agent, [row])
+    return AgentRead(**row)
+
+
+@router.post("/batch", response_model=BatchResponse, status_code=status.HTTP_201_CREATED, dependencies=[Depends(require_api_key)])
+async def create_agents_batch(response: Response, items: list[Any] = Body(...)) -> BatchResponse:
+    valid, rejected = parse_batch(AgentCreate, items)
+    rows = [build_agent_row(payload) for _, payload in valid]
+    if rows:
+        await async_write_rows(Agent, rows)
+    return batch_response([(index, row["id"]) for (index, _), row in zip(valid, rows)], rejected, response)
+
+
+__all__ = ["router"]
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from typing import Any
+
+from fastapi import APIRouter, Body, Depends, Response, status
+
+from app.api.batch import BatchResponse, batch_response, parse_batch
+from app.api.dependencies import require_api_key
+from app.api.generate import GeneratePayload, GenerateResponse, generate_rows
+from app.db.vault_posts import async_write_vault_rows
+
+router = APIRouter(prefix="/generate", tags=["generate"])
+
+
+@router.post("", response_model=GenerateResponse, status_code=status.HTTP_201_CREATED, dependencies=[Depends(require_api_key)])
+async def generate(payload: GeneratePayload) -> GenerateResponse:
+    [row] = await generate_rows([payload])
+    await async_write_vault_rows([row])
+    return GenerateResponse(**row)
+
+
+@router.post(
+    "/batch",
+    response_model=BatchResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(require_api_key)],
+)
+async def generate_batch(response: Response, items: list[Any] = Body(...)) -> BatchResponse:
+    valid, rejected = parse_batch(GeneratePayload, items)
+    rows = await generate_rows([payload for _, payload in valid])
+    if rows:
+        await async_write_vault_rows(rows)
+    return batch_response([(index, row["id"]) for (index, _), row in zip(valid, rows)], rejected, response)
+
+
+__all__ = ["router"]
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from typing import Any
+
+from fastapi import APIRouter, Body, Depends, Response, status
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.batch import BatchResponse, batch_response, parse_batch
+from app.api.dependencies import get_async_read_db, require_api_key
+from app.api.fast import page_response
+from app.api.filters import Predicates, post_filters
+from app.api.pagination import PageParams, keyset_page, page_params
+from app.api.posts import POST_COLUMNS, POST_JSON_COLUMNS, PostRead, QuickPostPayload, build_post_row
+from app.db.async_session import async_write_rows
+from app.models.post import Post
+
+router = APIRouter(tags=["posts"])
+
+
+@router.get("/posts", response_model=list[PostRead])
+async def list_posts(
+    page: PageParams = Depends(page_params),
+    filters: Predicates = Depends(post_filters),
+    db: AsyncSession = Depends(get_async_read_db),
+) -> ORJSONResponse:
+    stmt = select(*POST_COLUMNS).where(*filters)
+    rows = (await db.execute(keyset_page(stmt, Post.created_at, Post.id, page))).all()
+    return page_response(rows, page, POST_JSON_COLUMNS)
+
+
+@router.post("/quickpost", response_model=PostRead, status_code=status.HTTP_201_CREATED, dependencies=[Depends(require_api_key)])
+async def quickpost(payload: QuickPostPayload) -> PostRead:
+    row = build_post_row(payload)
+    await async_write_rows(Post, [row])
+    return PostRead(**row)
+
+
+@router.post(
+    "/quickpost/batch",
+    response_model=BatchResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(require_api_key)],
+)
+async def quickpost_batch(response: Response, items: list[Any] = Body(...)) -> BatchResponse:
+    valid, rejected = parse_batch(QuickPostPayload, items)
+    rows = [build_post_row(payload) for _, payload in valid]
+    if rows:
+        await async_write_rows(Post, rows)
+    return batch_response([(index, row["id"]) for (index, _), row in zip(valid, rows)], rejected, response)
+
+
+__all__ = ["router"]
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from typing import Any
+
+from fastapi import APIRouter, Body, Depends, Response, status
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.batch import BatchResponse, batch_response, parse_batch
+from app.api.dependencies import get_async_read_db, require_api_key
+from app.api.fast import page_response
+from app.api.filters import Predicates, ritual_filters
+from app.api.pagination import PageParams, keyset_page, page_params
+from app.api.rituals import (
+    RITUAL_COLUMNS,
+    RitualPayload,
+    RitualRead,
+    RitualStat,
+    build_ritual_row,
+    ritual_stats_statement,
+    stats_response,
+)
+from app.db.async_session import async_write_rows
+from app.models.ritual import RitualLog
+
+router = APIRouter(prefix="/rituals", tags=["rituals"])
+
+
+@router.get("", response_model=list[RitualRead])
+async def list_rituals(
+    page: PageParams = Depends(page_params),
+    filters: Predicates = Depends(ritual_filters),
+    db: AsyncSession = Depends(get_async_read_db),
+) -> ORJSONResponse:
+    stmt = select(*RITUAL_COLUMNS).where(*filters)
+    rows = (await db.execute(keyset_page(stmt, RitualLog.created_at, RitualLog.id, page))).all()
+    return page_response(rows, page)
+
+
+@router.get("/stats", response_model=list[RitualStat])
+async def ritual_stats(
+    stmt: Select = Depends(ritual_stats_statement), db: AsyncSession = Depends(get_async_read_db)
+) -> ORJSONResponse:
+    return stats_response((await db.execute(stmt)).all())
+
+
+@router.post("", response_model=RitualRead, status_code=status.HTTP_201_CREATED, dependencies=[Depends(require_api_key)])
+async def create_ritual(payload: RitualPayload) -> RitualRead:
+    row = build_ritual_row(payload)
+    await async_write_rows(RitualLog, [row])
+    return RitualRead(**row)
+
+
+@router.post("/batch", response_model=BatchResponse, status_code=status.HTTP_201_CREATED, dependencies=[Depends(require_api_key)])
+async def create_rituals_batch(response: Response, items: list[Any] = Body(...)) -> BatchResponse:
+    valid, rejected = parse_batch(RitualPayload, items)
+    rows = [build_ritual_row(payload) for _, payload in valid]
+    if rows:
+        await async_write_rows(RitualLog, rows)
+    return batch_response([(index, row["id"]) for (index, _), row in zip(valid, rows)], rejected, response)
+
+
+__all__ = ["router"]
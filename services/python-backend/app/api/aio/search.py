@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.dependencies import get_async_read_db
+from app.api.search import SearchQuery, SearchResult, search_query, search_response
+
+router = APIRouter(tags=["search"])
+
+
+@router.get("/search", response_model=list[SearchResult])
+async def search(query: SearchQuery = Depends(search_query), db: AsyncSession = Depends(get_async_read_db)) -> ORJSONResponse:
+    return search_response((await db.execute(query.statement)).all(), query)
+
+
+__all__ = ["router"]
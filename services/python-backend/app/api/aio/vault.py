@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from typing import Any, AsyncIterator
+
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.dependencies import get_async_read_db, get_current_settings, require_api_key
+from app.api.fast import page_response
+from app.api.filters import Predicates, vault_filters
+from app.api.pagination import PageParams, keyset_page, page_params
+from app.api.vault import (
+    EXPORT_MEDIA_TYPES,
+    VAULT_JSON_COLUMNS,
+    VaultColumns,
+    VaultPostRead,
+    export_chunk,
+    export_statement,
+    vault_view,
+)
+from app.config import Settings
+from app.db.async_session import get_async_read_sessionmaker
+from app.db.vault_posts import async_append_vault_post
+from app.models.vault import VaultRecord
+
+router = APIRouter(prefix="/vault", tags=["vault"])
+
+
+@router.get("", response_model=list[dict[str, Any]])
+async def list_vault(
+    page: PageParams = Depends(page_params),
+    filters: Predicates = Depends(vault_filters),
+    columns: VaultColumns = Depends(vault_view),
+    db: AsyncSession = Depends(get_async_read_db),
+) -> ORJSONResponse:
+    stmt = select(*columns).where(*filters)
+    rows = (await db.execute(keyset_page(stmt, VaultRecord.created_at, VaultRecord.id, page))).all()
+    return page_response(rows, page, VAULT_JSON_COLUMNS)
+
+
+@router.post(
+    "/{record_id}/posts",
+    response_model=VaultPostRead,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(require_api_key)],
+)
+async def append_post(record_id: str, post: dict[str, Any] = Body(...)) -> VaultPostRead:
+    row = await async_append_vault_post(record_id, post)
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Vault record not found")
+    return VaultPostRead(**row)
+
+
+async def _aiter_export(export_format: str, batch_size: int) -> AsyncIterator[bytes]:
+    ndjson = export_format == "ndjson"
+    if not ndjson:
+        yield b'{"records":['
+    first = True
+    async with get_async_read_sessionmaker()() as session:
+        result = await session.stream(export_statement(batch_size))
+        async for rows in result.partitions():
+            yield export_chunk(rows, ndjson=ndjson, first=first)
+            first = False
+    if not ndjson:
+        yield b"]}"
+
+
+@router.get("/export")
+async def export_vault(
+    export_format: str = Query(default="json", alias="format", pattern="^(json|ndjson)$"),
+    settings: Settings = Depends(get_current_settings),
+) -> StreamingResponse:
+    return StreamingResponse(
+        _aiter_export(export_format, settings.export_batch_size), media_type=EXPORT_MEDIA_TYPES[export_format]
+    )
+
+
+__all__ = ["router"]
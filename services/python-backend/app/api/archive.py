@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Literal, Optional
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.api.dependencies import get_read_db
+from app.api.filters import SINCE_QUERY, UNTIL_QUERY
+from app.db.retention import ARCHIVE_MODELS, iter_archive
+from app.models.archive_segment import ArchiveSegment
+
+router = APIRouter(prefix="/archive", tags=["archive"])
+
+ArchivedTable = Literal["ritual_logs", "posts"]
+
+
+@router.get("")
+def archive_summary(db: Session = Depends(get_read_db)) -> dict[str, Any]:
+    """Archived segments, rows and time span per table; ``newest`` is the retention horizon."""
+
+    rows = db.execute(
+        select(
+            ArchiveSegment.table_name,
+            func.count(),
+            func.sum(ArchiveSegment.rows),
+            func.min(ArchiveSegment.first_created_at),
+            func.max(ArchiveSegment.last_created_at),
+        )
+        .where(ArchiveSegment.state == "archived")
+        .group_by(ArchiveSegment.table_name)
+    ).all()
+    summary: dict[str, Any] = {table: {"segments": 0, "rows": 0, "oldest": None, "newest": None} for table in ARCHIVE_MODELS}
+    for table, segments, count, oldest, newest in rows:
+        summary[table] = {"segments": segments, "rows": count, "oldest": oldest, "newest": newest}
+    return summary
+
+
+@router.get("/{table}")
+def read_archive(
+    table: ArchivedTable,
+    since: Optional[datetime] = SINCE_QUERY,
+    until: Optional[datetime] = UNTIL_QUERY,
+) -> StreamingResponse:
+    """Stream archived rows of ``table`` in the time range as NDJSON."""
+
+    return StreamingResponse(iter_archive(table, since, until), media_type="application/x-ndjson")
+
+
+__all__ = ["router"]
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from typing import Any, Literal, Optional, TypeVar
+
+from fastapi import HTTPException, Response, status
+from pydantic import BaseModel, ValidationError
+
+from app.config import get_settings
+
+PayloadT = TypeVar("PayloadT", bound=BaseModel)
+
+
+class BatchItemResult(BaseModel):
+    index: int
+    status: Literal["created", "invalid"]
+    id: Optional[str] = None
+    errors: Optional[list[dict[str, Any]]] = None
+
+
+class BatchResponse(BaseModel):
+    created: int
+    failed: int
+    results: list[BatchItemResult]
+
+
+def parse_batch(
+    payload_model: type[PayloadT], items: list[Any]
+) -> tuple[list[tuple[int, PayloadT]], list[BatchItemResult]]:
+    """Validate each item on its own so one bad entry does not reject the whole batch.
+
+    Endpoints accept any JSON value per item, so items that are not even
+    objects are reported here as ``invalid`` along with the rest.
+    """
+
+    max_items = get_settings().batch_max_items
+    if len(items) > max_items:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch exceeds the limit of {max_items} items",
+        )
+
+    valid: list[tuple[int, PayloadT]] = []
+    rejected: list[BatchItemResult] = []
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, payload_model.parse_obj(item)))
+        except ValidationError as exc:
+            rejected.append(BatchItemResult(index=index, status="invalid", errors=exc.errors()))
+    return valid, rejected
+
+
+def batch_response(created: list[tuple[int, str]], rejected: list[BatchItemResult], response: Response) -> BatchResponse:
+    """Merge per-item outcomes in request order; partial success answers 207."""
+
+    results = [BatchItemResult(index=index, status="created", id=row_id) for index, row_id in created]
+    results.extend(rejected)
+    results.sort(key=lambda result: result.index)
+    if rejected:
+        response.status_code = status.HTTP_207_MULTI_STATUS
+    return BatchResponse(created=len(created), failed=len(rejected), results=results)
+
+
+__all__ = ["BatchItemResult", "BatchResponse", "batch_response", "parse_batch"]
@@ -0,0 +1,82 @@
+"""Weak ETags and ``304 Not Modified`` for the polled list endpoints.
+
+The tag of a route is derived from the change versions of the tables it reads
+(see :mod:`app.db.changes`), so a matching ``If-None-Match`` is answered by
+the middleware without running the endpoint or opening a database session.
+"""
+
+from __future__ import annotations
+
+from email.utils import formatdate
+from typing import Iterable, Mapping
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.db.changes import ChangeTracker, get_change_tracker
+
+# Request path -> tables its response is built from.
+CONDITIONAL_ROUTES: dict[str, tuple[str, ...]] = {
+    "/agents": ("agents",),
+    "/posts": ("posts",),
+    "/rituals": ("ritual_logs",),
+    "/rituals/stats": ("ritual_logs",),
+    "/vault": ("vault_records", "vault_posts"),
+    "/vault/export": ("vault_records", "vault_posts"),
+    "/search": ("ritual_logs", "posts", "vault_records", "vault_posts"),
+}
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of ``etag`` against an ``If-None-Match`` header value."""
+
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
+
+
+class ConditionalGetMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        routes: Mapping[str, Iterable[str]] = CONDITIONAL_ROUTES,
+        tracker: ChangeTracker | None = None,
+    ) -> None:
+        self.app = app
+        self.routes = {path: tuple(tables) for path, tables in routes.items()}
+        self.tracker = tracker or get_change_tracker()
+
+    def validators(self, tables: tuple[str, ...]) -> dict[str, str]:
+        versions = ".".join(str(version) for version in self.tracker.version(tables))
+        return {
+            "ETag": f'W/"{self.tracker.epoch}.{versions}"',
+            "Last-Modified": formatdate(self.tracker.last_modified(tables), usegmt=True),
+            "Cache-Control": "no-cache",
+        }
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        tables = self.routes.get(scope["path"]) if scope["type"] == "http" else None
+        if tables is None or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+
+        validators = self.validators(tables)
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        if if_none_match is not None and etag_matches(if_none_match, validators["ETag"]):
+            headers = [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in validators.items()]
+            await send({"type": "http.response.start", "status": 304, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        async def send_with_validators(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                headers = MutableHeaders(scope=message)
+                for name, value in validators.items():
+                    headers[name] = value
+            await send(message)
+
+        await self.app(scope, receive, send_with_validators)
+
+
+__all__ = ["CONDITIONAL_ROUTES", "ConditionalGetMiddleware", "etag_matches"]
@@ -1,12 +1,14 @@
 from __future__ import annotations
 
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
 
 from fastapi import Depends, Header, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.config import Settings, get_settings
-from app.db.session import get_sessionmaker
+from app.db.async_session import get_async_read_sessionmaker, get_async_sessionmaker
+from app.db.session import get_read_sessionmaker, get_sessionmaker
 
 
 def get_db() -> Generator[Session, None, None]:
@@ -18,6 +20,27 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+def get_read_db() -> Generator[Session, None, None]:
+    """Yield a session bound to the query-only reader pool."""
+
+    ReadSessionLocal = get_read_sessionmaker()
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+
+async def get_async_read_db() -> AsyncGenerator[AsyncSession, None]:
+    async with get_async_read_sessionmaker()() as db:
+        yield db
+
+
 def get_current_settings() -> Settings:
     return get_settings()
 
@@ -29,4 +52,11 @@ def require_api_key(settings: Settings = Depends(get_current_settings), x_api_ke
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid API key")
 
 
-__all__ = ["get_db", "get_current_settings", "require_api_key"]
+__all__ = [
+    "get_async_db",
+    "get_async_read_db",
+    "get_current_settings",
+    "get_db",
+    "get_read_db",
+    "require_api_key",
+]
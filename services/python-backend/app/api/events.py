@@ -0,0 +1,89 @@
+"""Live feed of newly created agents, posts, rituals and vault records.
+
+``GET /events`` streams Server-Sent Events and honours ``Last-Event-ID``;
+``/ws`` pushes the same JSON messages (``{"id", "type", "data"}``) over a
+WebSocket and accepts ``?last_event_id=`` for resumption. Both start with a
+``connected`` message. A ``resync`` message means events were missed and the
+client should refetch the lists it shows.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import AsyncIterator, Optional
+
+from fastapi import APIRouter, Depends, Header, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+
+from app.api.dependencies import get_current_settings
+from app.config import Settings
+from app.engine.events import Event, Subscription, get_event_bus
+
+router = APIRouter(tags=["events"])
+
+
+def connected_event(bus_epoch: str) -> Event:
+    return Event(f"{bus_epoch}-0", "connected")
+
+
+async def _sse_stream(request: Request, subscription: Subscription, heartbeat: float) -> AsyncIterator[bytes]:
+    bus = get_event_bus()
+    try:
+        yield b"retry: 3000\n" + connected_event(bus.epoch).sse()
+        while not await request.is_disconnected():
+            try:
+                event = await asyncio.wait_for(subscription.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                # Comment lines keep proxies from closing an idle stream.
+                yield b": ping\n\n"
+                continue
+            yield event.sse()
+    finally:
+        bus.unsubscribe(subscription)
+
+
+@router.get("/events")
+async def events(
+    request: Request,
+    last_event_id: Optional[str] = Header(default=None),
+    settings: Settings = Depends(get_current_settings),
+) -> StreamingResponse:
+    subscription = get_event_bus().subscribe(last_event_id)
+    return StreamingResponse(
+        _sse_stream(request, subscription, settings.events_heartbeat_seconds),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/ws")
+async def events_socket(websocket: WebSocket, last_event_id: Optional[str] = Query(default=None)) -> None:
+    await websocket.accept()
+    bus = get_event_bus()
+    subscription = bus.subscribe(last_event_id)
+    # Client messages are ignored, but receiving is how a disconnect is noticed
+    # while no events are flowing.
+    receiver = asyncio.ensure_future(websocket.receive())
+    getter: asyncio.Future[Event] | None = None
+    try:
+        await websocket.send_text(connected_event(bus.epoch).json().decode())
+        while True:
+            getter = getter or asyncio.ensure_future(subscription.get())
+            done, _ = await asyncio.wait({receiver, getter}, return_when=asyncio.FIRST_COMPLETED)
+            if receiver in done:
+                if receiver.result()["type"] == "websocket.disconnect":
+                    break
+                receiver = asyncio.ensure_future(websocket.receive())
+            if getter in done:
+                await websocket.send_text(getter.result().json().decode())
+                getter = None
+    except WebSocketDisconnect:
+        pass
+    finally:
+        for task in (receiver, getter):
+            if task is not None:
+                task.cancel()
+        bus.unsubscribe(subscription)
+
+
+__all__ = ["router"]
@@ -0,0 +1,61 @@
+"""Zero-ORM serialization helpers for the read endpoints.
+
+List routes select plain column rows and encode them straight to bytes with
+orjson. Datetimes are serialized natively, and JSON columns are selected as
+their stored text and embedded with ``orjson.Fragment``, so they are never
+decoded into Python objects. The exception is text holding ``NaN`` or
+``Infinity``, which rows written by the stdlib ``json.dumps`` may contain and
+which is not valid JSON: it is decoded and re-encoded, turning those values
+into ``null`` as orjson does everywhere else. Returning the response object directly also
+skips FastAPI's ``response_model`` re-validation; the declared models remain
+for the OpenAPI schema only.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Iterable, Sequence
+
+import orjson
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import Row, String, func, literal_column, type_coerce
+from sqlalchemy.sql.elements import ColumnElement, KeyedColumnElement
+
+from app.api.pagination import NEXT_CURSOR_HEADER, PageParams, split_page
+
+
+def raw_json(column: KeyedColumnElement[Any], empty: str) -> ColumnElement[str]:
+    """Select a JSON column as its stored text, substituting ``empty`` for NULL/``null``."""
+
+    stored = func.coalesce(func.nullif(column, literal_column("'null'")), literal_column(f"'{empty}'"))
+    return type_coerce(stored, String).label(column.key)
+
+
+def json_fragment(text: str) -> Any:
+    """Embed stored JSON text as is, unless it holds values only the stdlib accepts."""
+
+    if "NaN" in text or "Infinity" in text:
+        return json.loads(text)
+    return orjson.Fragment(text)
+
+
+def row_to_item(row: Row, json_columns: Iterable[str] = ()) -> dict[str, Any]:
+    item = row._asdict()
+    for name in json_columns:
+        item[name] = json_fragment(item[name])
+    return item
+
+
+def encode_rows(rows: Iterable[Row], json_columns: Iterable[str] = ()) -> list[bytes]:
+    columns = tuple(json_columns)
+    return [orjson.dumps(row_to_item(row, columns)) for row in rows]
+
+
+def page_response(rows: Sequence[Row], page: PageParams, json_columns: Iterable[str] = ()) -> ORJSONResponse:
+    items, next_cursor = split_page(rows, page)
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    columns = tuple(json_columns)
+    return ORJSONResponse([row_to_item(row, columns) for row in items], headers=headers)
+
+
+__all__ = ["encode_rows", "json_fragment", "page_response", "raw_json", "row_to_item"]
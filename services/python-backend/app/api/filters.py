@@ -0,0 +1,85 @@
+"""Query-string filters for the list endpoints.
+
+Each dependency returns SQL predicates for ``Select.where``. Equality filters
+are paired with composite ``(column, created_at)`` indexes, so a filtered page
+is an index range scan in keyset order, not a table scan.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi import Query
+from sqlalchemy.orm import InstrumentedAttribute
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.models.post import Post
+from app.models.ritual import RitualLog
+from app.models.vault import VaultRecord
+
+Predicates = list[ColumnElement[bool]]
+
+SINCE_QUERY = Query(default=None, description="Only rows created at or after this time (naive times are UTC)")
+UNTIL_QUERY = Query(default=None, description="Only rows created before this time (naive times are UTC)")
+
+
+def _as_utc(value: datetime) -> datetime:
+    # Timestamps are stored as naive UTC text, so bounds must be converted to UTC.
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def time_range(column: InstrumentedAttribute, since: Optional[datetime], until: Optional[datetime]) -> Predicates:
+    predicates: Predicates = []
+    if since is not None:
+        predicates.append(column >= _as_utc(since))
+    if until is not None:
+        predicates.append(column < _as_utc(until))
+    return predicates
+
+
+def post_filters(
+    agent_id: Optional[str] = Query(default=None),
+    theme: Optional[str] = Query(default=None),
+    since: Optional[datetime] = SINCE_QUERY,
+    until: Optional[datetime] = UNTIL_QUERY,
+) -> Predicates:
+    predicates = time_range(Post.created_at, since, until)
+    if agent_id is not None:
+        predicates.append(Post.agent_id == agent_id)
+    if theme is not None:
+        predicates.append(Post.theme == theme)
+    return predicates
+
+
+def vault_filters(
+    theme: Optional[str] = Query(default=None),
+    since: Optional[datetime] = SINCE_QUERY,
+    until: Optional[datetime] = UNTIL_QUERY,
+) -> Predicates:
+    predicates = time_range(VaultRecord.created_at, since, until)
+    if theme is not None:
+        predicates.append(VaultRecord.theme == theme)
+    return predicates
+
+
+def ritual_filters(
+    agent_id: Optional[str] = Query(default=None),
+    event_type: Optional[str] = Query(default=None),
+    emotion: Optional[str] = Query(default=None),
+    since: Optional[datetime] = SINCE_QUERY,
+    until: Optional[datetime] = UNTIL_QUERY,
+) -> Predicates:
+    predicates = time_range(RitualLog.created_at, since, until)
+    if agent_id is not None:
+        predicates.append(RitualLog.agent_id == agent_id)
+    if event_type is not None:
+        predicates.append(RitualLog.event_type == event_type)
+    if emotion is not None:
+        predicates.append(RitualLog.emotion == emotion)
+    return predicates
+
+
+__all__ = ["Predicates", "post_filters", "ritual_filters", "time_range", "vault_filters"]
@@ -1,15 +1,23 @@
 from __future__ import annotations
 
+import asyncio
 from datetime import datetime
-from typing import Any, Optional
+from typing import Any, Optional, Sequence
+from uuid import uuid4
 
-from fastapi import APIRouter, Depends, status
-from pydantic import BaseModel, Field
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Body, Depends, HTTPException, Response, status
+from pydantic import BaseModel, Field, validator
+from starlette.concurrency import run_in_threadpool
 
-from app.api.dependencies import get_db, require_api_key
-from app.engine.generator import render_threadlight
+from app.api.batch import BatchResponse, batch_response, parse_batch
+from app.api.dependencies import require_api_key
+from app.config import get_settings
+from app.db.vault_posts import write_vault_rows
+from app.engine.backends import GeneratorError, backend_targets
+from app.engine.generator import GenerateRequest
+from app.engine.workers import GeneratorTimeout, get_generator_engine
 from app.models.vault import VaultRecord
+from app.utils.clock import utc_now
 
 router = APIRouter(prefix="/generate", tags=["generate"])
 
@@ -17,6 +25,13 @@ router = APIRouter(prefix="/generate", tags=["generate"])
 class GeneratePayload(BaseModel):
     theme: str = Field(..., min_length=1)
     prompt: Optional[str] = None
+    backend: Optional[str] = None
+
+    @validator("backend")
+    def known_backend(cls, value: Optional[str]) -> Optional[str]:
+        if value is not None and value not in backend_targets():
+            raise ValueError(f"Unknown generator backend {value!r}")
+        return value
 
 
 class GenerateResponse(BaseModel):
@@ -27,17 +42,67 @@ class GenerateResponse(BaseModel):
 
     @classmethod
     def from_record(cls, record: VaultRecord) -> "GenerateResponse":
-        return cls(id=record.id, theme=record.theme, posts=record.posts or [], created_at=record.created_at)
+        posts = [post.content for post in record.posts]
+        return cls(id=record.id, theme=record.theme, posts=posts, created_at=record.created_at)
+
+
+def build_generated_row(payload: GeneratePayload, post: dict[str, Any]) -> dict[str, Any]:
+    return {"id": str(uuid4()), "theme": payload.theme, "posts": [post], "created_at": utc_now()}
+
+
+async def generate_rows(payloads: Sequence[GeneratePayload]) -> list[dict[str, Any]]:
+    """Generate a vault row per payload on the generator engine, one job per backend.
+
+    The request only awaits the engine's futures, so neither the event loop
+    nor a threadpool thread is held while a backend runs.
+    """
+
+    engine = get_generator_engine()
+    default_backend = get_settings().generator_backend
+    by_backend: dict[str, list[int]] = {}
+    for index, payload in enumerate(payloads):
+        by_backend.setdefault(payload.backend or default_backend, []).append(index)
+
+    jobs = [
+        asyncio.wrap_future(
+            engine.submit(backend, [GenerateRequest(payloads[i].theme, payloads[i].prompt) for i in indexes])
+        )
+        for backend, indexes in by_backend.items()
+    ]
+    try:
+        results = await asyncio.gather(*jobs)
+    except GeneratorTimeout as exc:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(exc)) from exc
+    except GeneratorError as exc:
+        raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=str(exc)) from exc
+
+    rows: list[dict[str, Any]] = [{} for _ in payloads]
+    for indexes, posts in zip(by_backend.values(), results):
+        for index, post in zip(indexes, posts):
+            rows[index] = build_generated_row(payloads[index], post)
+    return rows
 
 
 @router.post("", response_model=GenerateResponse, status_code=status.HTTP_201_CREATED, dependencies=[Depends(require_api_key)])
-def generate(payload: GeneratePayload, db: Session = Depends(get_db)) -> GenerateResponse:
-    post = render_threadlight(payload.theme, prompt=payload.prompt)
-    record = VaultRecord(theme=payload.theme, posts=[post])
-    db.add(record)
-    db.commit()
-    db.refresh(record)
-    return GenerateResponse.from_record(record)
+async def generate(payload: GeneratePayload) -> GenerateResponse:
+    [row] = await generate_rows([payload])
+    await run_in_threadpool(write_vault_rows, [row])
+    return GenerateResponse(**row)
+
+
+@router.post(
+    "/batch",
+    response_model=BatchResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(require_api_key)],
+)
+async def generate_batch(response: Response, items: list[Any] = Body(...)) -> BatchResponse:
+    valid, rejected = parse_batch(GeneratePayload, items)
+    rows = await generate_rows([payload for _, payload in valid])
+    if rows:
+        # Every generated record is committed in one transaction.
+        await run_in_threadpool(write_vault_rows, rows)
+    return batch_response([(index, row["id"]) for (index, _), row in zip(valid, rows)], rejected, response)
 
 
 __all__ = ["router"]
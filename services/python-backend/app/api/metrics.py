@@ -0,0 +1,99 @@
+"""``GET /metrics`` in the Prometheus text format, and the HTTP middleware feeding it.
+
+Requests are labelled with the route template (``/vault/{record_id}/posts``)
+rather than the raw path, so ids never create new series; paths that match
+no route share the ``unmatched`` label. Responses answered by the cache or
+conditional-GET middleware are counted under their route as well.
+
+Threadpool gauges are sampled per scrape; ``agent_spark_threadpool_saturated_total``
+counts requests that arrived with no free thread, which catches saturation
+between scrapes.
+"""
+
+from __future__ import annotations
+
+import time
+
+import anyio.to_thread
+from fastapi import APIRouter, Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.utils.metrics import CONTENT_TYPE, REGISTRY
+from app.utils.request_context import route_template
+
+REQUEST_SECONDS = REGISTRY.histogram(
+    "agent_spark_http_request_duration_seconds",
+    "Time from receiving a request to sending the last byte of its response.",
+    ("method", "route"),
+)
+REQUESTS = REGISTRY.counter(
+    "agent_spark_http_requests_total", "Completed requests by method, route and status.", ("method", "route", "status")
+)
+REQUEST_ERRORS = REGISTRY.counter(
+    "agent_spark_http_request_errors_total", "Requests answered with a 5xx status or an exception.", ("method", "route")
+)
+IN_FLIGHT = REGISTRY.gauge("agent_spark_http_requests_in_flight", "Requests currently being handled.")
+THREADPOOL_CAPACITY = REGISTRY.gauge(
+    "agent_spark_threadpool_capacity", "Threads available to sync endpoints and dependencies."
+)
+THREADPOOL_BUSY = REGISTRY.gauge("agent_spark_threadpool_busy", "Threadpool threads currently running work.")
+THREADPOOL_WAITING = REGISTRY.gauge("agent_spark_threadpool_waiting", "Tasks queued for a free threadpool thread.")
+THREADPOOL_SATURATED = REGISTRY.counter(
+    "agent_spark_threadpool_saturated_total", "Requests that arrived while every threadpool thread was busy."
+)
+
+router = APIRouter()
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        IN_FLIGHT.inc()
+        if anyio.to_thread.current_default_thread_limiter().available_tokens < 1:
+            THREADPOOL_SATURATED.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        except BaseException:
+            status = 500
+            raise
+        finally:
+            IN_FLIGHT.dec()
+            method = scope["method"]
+            route = route_template(scope)
+            REQUEST_SECONDS.observe(time.perf_counter() - started, method, route)
+            REQUESTS.inc(method, route, str(status))
+            if status >= 500:
+                REQUEST_ERRORS.inc(method, route)
+
+
+def sample_threadpool() -> None:
+    """Sample AnyIO's default limiter, which bounds the threads running sync endpoints; needs the event loop."""
+
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    THREADPOOL_CAPACITY.set(limiter.total_tokens)
+    THREADPOOL_BUSY.set(limiter.borrowed_tokens)
+    THREADPOOL_WAITING.set(limiter.statistics().tasks_waiting)
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    sample_threadpool()
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
+__all__ = ["MetricsMiddleware", "router", "sample_threadpool"]
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Callable, Optional, Sequence, TypeVar
+
+from fastapi import Depends, HTTPException, Query, status
+from sqlalchemy import Select, tuple_
+from sqlalchemy.orm import InstrumentedAttribute
+
+from app.api.dependencies import get_current_settings
+from app.config import Settings
+
+T = TypeVar("T")
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(created_at: datetime, row_id: str) -> str:
+    raw = json.dumps([created_at.isoformat(), row_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(created_at), str(row_id)
+    except (binascii.Error, ValueError, TypeError, UnicodeError) as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from exc
+
+
+def encode_offset_cursor(offset: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"offset": offset}).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_offset_cursor(cursor: str) -> int:
+    """Decode a cursor for ranked results, which have no stable keyset order."""
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        offset = int(json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))["offset"])
+    except (binascii.Error, ValueError, TypeError, KeyError, UnicodeError) as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from exc
+    if offset < 0:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return offset
+
+
+class PageParams:
+    """Decoded keyset position and page size for a list request."""
+
+    def __init__(self, after: Optional[tuple[datetime, str]], limit: int) -> None:
+        self.after = after
+        self.limit = limit
+
+
+def page_params(
+    cursor: Optional[str] = Query(default=None, description="Opaque cursor from a previous page"),
+    limit: Optional[int] = Query(default=None, ge=1),
+    settings: Settings = Depends(get_current_settings),
+) -> PageParams:
+    after = decode_cursor(cursor) if cursor else None
+    return PageParams(after, min(limit or settings.page_default_limit, settings.page_max_limit))
+
+
+def keyset_page(
+    stmt: Select,
+    created_at: InstrumentedAttribute,
+    row_id: InstrumentedAttribute,
+    page: PageParams,
+) -> Select:
+    """Order ``stmt`` newest first and restrict it to the rows after ``page``'s cursor.
+
+    One extra row is fetched so :func:`split_page` can tell whether another page exists
+    without issuing a count query.
+    """
+
+    if page.after is not None:
+        stmt = stmt.where(tuple_(created_at, row_id) < tuple_(*page.after))
+    return stmt.order_by(created_at.desc(), row_id.desc()).limit(page.limit + 1)
+
+
+def split_page(
+    rows: Sequence[T],
+    page: PageParams,
+    key: Callable[[T], tuple[datetime, str]] = lambda row: (row.created_at, row.id),  # type: ignore[attr-defined]
+) -> tuple[list[T], Optional[str]]:
+    """Trim the look-ahead row; return the page and the cursor for the next one, if any."""
+
+    items = list(rows[: page.limit])
+    if len(rows) > page.limit:
+        return items, encode_cursor(*key(items[-1]))
+    return items, None
+
+
+__all__ = [
+    "NEXT_CURSOR_HEADER",
+    "PageParams",
+    "decode_cursor",
+    "decode_offset_cursor",
+    "encode_cursor",
+    "encode_offset_cursor",
+    "keyset_page",
+    "page_params",
+    "split_page",
+]
@@ -4,13 +4,20 @@ from datetime import datetime
 from typing import Any, Optional
 from uuid import uuid4
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Body, Depends, Response, status
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from app.api.dependencies import get_db, require_api_key
+from app.api.batch import BatchResponse, batch_response, parse_batch
+from app.api.dependencies import get_read_db, require_api_key
+from app.api.fast import page_response, raw_json
+from app.api.filters import Predicates, post_filters
+from app.api.pagination import PageParams, keyset_page, page_params
+from app.db.writer import write_rows
 from app.models.post import Post
+from app.utils.clock import utc_now
 
 router = APIRouter(tags=["posts"])
 
@@ -39,19 +46,49 @@ class PostRead(BaseModel):
         )
 
 
+POST_COLUMNS = (Post.id, Post.theme, raw_json(Post.content, "{}"), Post.agent_id, Post.created_at)
+POST_JSON_COLUMNS = ("content",)
+
+
+def build_post_row(payload: QuickPostPayload) -> dict[str, Any]:
+    return {
+        "id": str(uuid4()),
+        "theme": payload.theme,
+        "content": payload.content,
+        "agent_id": payload.agent_id,
+        "created_at": utc_now(),
+    }
+
+
 @router.get("/posts", response_model=list[PostRead])
-def list_posts(db: Session = Depends(get_db)) -> list[PostRead]:
-    posts = db.scalars(select(Post).order_by(Post.created_at.desc())).all()
-    return [PostRead.from_orm(post) for post in posts]
+def list_posts(
+    page: PageParams = Depends(page_params),
+    filters: Predicates = Depends(post_filters),
+    db: Session = Depends(get_read_db),
+) -> ORJSONResponse:
+    rows = db.execute(keyset_page(select(*POST_COLUMNS).where(*filters), Post.created_at, Post.id, page)).all()
+    return page_response(rows, page, POST_JSON_COLUMNS)
 
 
 @router.post("/quickpost", response_model=PostRead, status_code=status.HTTP_201_CREATED, dependencies=[Depends(require_api_key)])
-def quickpost(payload: QuickPostPayload, db: Session = Depends(get_db)) -> PostRead:
-    post = Post(id=str(uuid4()), theme=payload.theme, content=payload.content, agent_id=payload.agent_id)
-    db.add(post)
-    db.commit()
-    db.refresh(post)
-    return PostRead.from_orm(post)
+def quickpost(payload: QuickPostPayload) -> PostRead:
+    row = build_post_row(payload)
+    write_rows(Post, [row])
+    return PostRead(**row)
+
+
+@router.post(
+    "/quickpost/batch",
+    response_model=BatchResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(require_api_key)],
+)
+def quickpost_batch(response: Response, items: list[Any] = Body(...)) -> BatchResponse:
+    valid, rejected = parse_batch(QuickPostPayload, items)
+    rows = [build_post_row(payload) for _, payload in valid]
+    if rows:
+        write_rows(Post, rows)
+    return batch_response([(index, row["id"]) for (index, _), row in zip(valid, rows)], rejected, response)
 
 
 __all__ = ["router", "PostRead"]
@@ -0,0 +1,131 @@
+"""Every read query the list endpoints can issue, for plan checks.
+
+Statements are built with the same column sets, filters and keyset paging as
+the routes, one per filter combination that selects a different index. Filter
+values are sampled from the database so timings reflect real data; on an
+empty database placeholders keep the plans meaningful.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import Select, select
+from sqlalchemy.orm import Session
+
+from app.api.agents import AGENT_COLUMNS
+from app.api.filters import post_filters, ritual_filters, vault_filters
+from app.api.pagination import PageParams, keyset_page
+from app.api.posts import POST_COLUMNS
+from app.api.rituals import RITUAL_COLUMNS
+from app.api.vault import export_statement, vault_columns
+from app.config import Settings
+from app.db.rollups import stats_statement
+from app.db.search import SEARCH_KINDS, match_expression, search_statement
+from app.models.agent import Agent
+from app.models.post import Post
+from app.models.ritual import RitualLog
+from app.models.vault import VaultRecord
+
+
+@dataclass(frozen=True)
+class QuerySamples:
+    agent_id: str = "agent"
+    post_theme: str = "theme"
+    vault_theme: str = "theme"
+    event_type: str = "event"
+    emotion: str = "emotion"
+    newest: datetime = datetime(2026, 1, 1)
+    search_term: str = "spark"
+
+
+def _first(session: Session, stmt: Select) -> Optional[object]:
+    return session.execute(stmt.limit(1)).scalar()
+
+
+def sample_values(session: Session) -> QuerySamples:
+    """Filter values that exist in the database, falling back to placeholders."""
+
+    defaults = QuerySamples()
+    newest = _first(session, select(Post.created_at).order_by(Post.created_at.desc()))
+    return QuerySamples(
+        agent_id=_first(session, select(Post.agent_id).where(Post.agent_id.is_not(None))) or defaults.agent_id,
+        post_theme=_first(session, select(Post.theme)) or defaults.post_theme,
+        vault_theme=_first(session, select(VaultRecord.theme)) or defaults.vault_theme,
+        event_type=_first(session, select(RitualLog.event_type)) or defaults.event_type,
+        emotion=_first(session, select(RitualLog.emotion).where(RitualLog.emotion.is_not(None))) or defaults.emotion,
+        newest=newest or defaults.newest,
+        search_term=str(_first(session, select(Post.theme)) or defaults.search_term).split()[0],
+    )
+
+
+def _name(path: str, *params: str) -> str:
+    params = tuple(param for param in params if param)
+    return f"{path}?{'&'.join(params)}" if params else path
+
+
+def list_queries(samples: QuerySamples, settings: Settings) -> list[tuple[str, Select]]:
+    """``(name, statement)`` for each list query, as a first page and as a cursor page."""
+
+    limit = settings.page_default_limit
+    pages = {"": PageParams(None, limit), "cursor": PageParams((samples.newest - timedelta(days=7), "~"), limit)}
+    since = samples.newest - timedelta(days=30)
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+
+    post_variants: dict[str, dict[str, object]] = {
+        "": {},
+        "agent_id": {"agent_id": samples.agent_id},
+        "theme": {"theme": samples.post_theme},
+        "since": {"since": since},
+        "agent_id&since": {"agent_id": samples.agent_id, "since": since},
+    }
+    ritual_variants: dict[str, dict[str, object]] = {
+        "": {},
+        "agent_id": {"agent_id": samples.agent_id},
+        "agent_id&event_type": {"agent_id": samples.agent_id, "event_type": samples.event_type},
+        "event_type": {"event_type": samples.event_type},
+        "emotion": {"emotion": samples.emotion},
+        "since": {"since": since},
+    }
+    vault_variants: dict[str, Select] = {
+        "": select(*vault_columns()),
+        "theme": select(*vault_columns()).where(*vault_filters(theme=samples.vault_theme, since=None, until=None)),
+        "since": select(*vault_columns()).where(*vault_filters(theme=None, since=since, until=None)),
+        "posts_limit&post_count": select(*vault_columns(posts_limit=3, post_count=True)),
+    }
+
+    queries: list[tuple[str, Select]] = []
+    for page_name, page in pages.items():
+        queries.append((_name("agents", page_name), keyset_page(select(*AGENT_COLUMNS), Agent.created_at, Agent.id, page)))
+    for variant, filters in post_variants.items():
+        predicates = post_filters(**{"agent_id": None, "theme": None, "since": None, "until": None, **filters})
+        for page_name, page in pages.items():
+            stmt = keyset_page(select(*POST_COLUMNS).where(*predicates), Post.created_at, Post.id, page)
+            queries.append((_name("posts", variant, page_name), stmt))
+    for variant, filters in ritual_variants.items():
+        defaults = {"agent_id": None, "event_type": None, "emotion": None, "since": None, "until": None}
+        predicates = ritual_filters(**{**defaults, **filters})
+        for page_name, page in pages.items():
+            stmt = keyset_page(select(*RITUAL_COLUMNS).where(*predicates), RitualLog.created_at, RitualLog.id, page)
+            queries.append((_name("rituals", variant, page_name), stmt))
+    for variant, base in vault_variants.items():
+        for page_name, page in pages.items():
+            stmt = keyset_page(base, VaultRecord.created_at, VaultRecord.id, page)
+            queries.append((_name("vault", variant, page_name), stmt))
+    for bucket in ("hour", "day"):
+        queries.append((_name("rituals/stats", f"bucket={bucket}"), stats_statement(bucket, None, since, None)))
+        queries.append(
+            (_name("rituals/stats", f"bucket={bucket}", "agent_id"), stats_statement(bucket, samples.agent_id, since, None))
+        )
+    queries.append(("vault/export", export_statement(settings.export_batch_size)))
+    match = match_expression(samples.search_term)
+    for kind in SEARCH_KINDS:
+        queries.append((_name("search", f"type={kind}"), search_statement(match, (kind,), limit + 1, 0)))
+    queries.append(("search", search_statement(match, SEARCH_KINDS, limit + 1, 0)))
+    return queries
+
+
+__all__ = ["QuerySamples", "list_queries", "sample_values"]
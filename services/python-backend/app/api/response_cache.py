@@ -0,0 +1,172 @@
+"""Bounded in-process cache of encoded list responses.
+
+Entries are keyed by path plus normalized query string and hold the final
+response bytes and headers. Each entry remembers the change versions of the
+tables it was built from (see :mod:`app.db.changes`); a lookup only hits
+while those versions are unchanged, so a write can never be served stale,
+even if it races the request that filled the entry or was committed by
+another process. Every cached route must be one of ``CONDITIONAL_ROUTES``;
+:func:`app.main.create_app` rejects others at startup. The change listener
+additionally drops affected entries straight away to free their memory.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Iterable, Mapping
+from urllib.parse import parse_qsl, urlencode
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.api.conditional import CONDITIONAL_ROUTES
+from app.db.changes import ChangeTracker, get_change_tracker
+
+CACHE_STATUS_HEADER = "X-Cache"
+
+
+@dataclass
+class CacheEntry:
+    tables: tuple[str, ...]
+    versions: tuple[int, ...]
+    headers: list[tuple[bytes, bytes]]
+    body: bytes
+    expires: float
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(len(name) + len(value) for name, value in self.headers)
+
+
+class ResponseCache:
+    def __init__(self, max_bytes: int, ttl_seconds: float, tracker: ChangeTracker | None = None) -> None:
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.tracker = tracker or get_change_tracker()
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+
+    def _drop(self, key: str, counter: str) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+        self._counters[counter] += 1
+
+    def get(self, key: str) -> CacheEntry | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+            if entry.expires <= time.monotonic():
+                self._drop(key, "expirations")
+                self._counters["misses"] += 1
+                return None
+            if self.tracker.version(entry.tables) != entry.versions:
+                self._drop(key, "invalidations")
+                self._counters["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counters["hits"] += 1
+            return entry
+
+    def put(self, key: str, entry: CacheEntry) -> None:
+        if entry.size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key).size
+            self._entries[key] = entry
+            self._bytes += entry.size
+            self._counters["stores"] += 1
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)), "evictions")
+
+    def invalidate(self, tables: Iterable[str]) -> None:
+        changed = set(tables)
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if changed.intersection(entry.tables)]:
+                self._drop(key, "invalidations")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                **self._counters,
+                "hit_ratio": self._counters["hits"] / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+def cache_key(scope: Scope) -> str:
+    query = parse_qsl(scope.get("query_string", b"").decode("latin-1"), keep_blank_values=True)
+    return f"{scope['path']}?{urlencode(sorted(query))}"
+
+
+class ResponseCacheMiddleware:
+    """Serve GETs on ``routes`` from :class:`ResponseCache`, filling it from 200 responses."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        cache: ResponseCache,
+        routes: Iterable[str],
+        tables: Mapping[str, Iterable[str]] = CONDITIONAL_ROUTES,
+    ) -> None:
+        self.app = app
+        self.cache = cache
+        self.routes = {path: tuple(tables[path]) for path in routes}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        tables = self.routes.get(scope["path"]) if scope["type"] == "http" else None
+        if tables is None or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        key = cache_key(scope)
+        entry = self.cache.get(key)
+        if entry is not None:
+            headers = [*entry.headers, (CACHE_STATUS_HEADER.lower().encode("latin-1"), b"HIT")]
+            await send({"type": "http.response.start", "status": 200, "headers": headers})
+            await send({"type": "http.response.body", "body": entry.body})
+            return
+
+        # Versions are read before the handler so that a concurrent write makes the entry stale.
+        versions = self.cache.tracker.version(tables)
+        started: dict[str, Any] = {}
+        chunks: list[bytes] = []
+        cacheable = True
+        buffered = 0
+
+        async def capture(message: Message) -> None:
+            nonlocal cacheable, buffered
+            if message["type"] == "http.response.start":
+                started.update(message)
+                cacheable = message["status"] == 200
+                message["headers"] = [*message["headers"], (CACHE_STATUS_HEADER.lower().encode("latin-1"), b"MISS")]
+            elif message["type"] == "http.response.body" and cacheable:
+                chunks.append(message.get("body", b""))
+                buffered += len(chunks[-1])
+                # Stop buffering responses that could never fit in the cache.
+                if buffered > self.cache.max_bytes:
+                    cacheable = False
+                    chunks.clear()
+                elif not message.get("more_body", False):
+                    expires = time.monotonic() + self.cache.ttl_seconds
+                    self.cache.put(key, CacheEntry(tables, versions, list(started["headers"]), b"".join(chunks), expires))
+            await send(message)
+
+        await self.app(scope, receive, capture)
+
+
+__all__ = ["CACHE_STATUS_HEADER", "CacheEntry", "ResponseCache", "ResponseCacheMiddleware", "cache_key"]
@@ -1,15 +1,24 @@
 from __future__ import annotations
 
-from datetime import datetime
-from typing import Optional
+from datetime import datetime, timezone
+from typing import Any, Optional, Sequence
+from uuid import uuid4
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Body, Depends, Query, Response, status
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
-from sqlalchemy import select
+from sqlalchemy import Row, Select, select
 from sqlalchemy.orm import Session
 
-from app.api.dependencies import get_db, require_api_key
+from app.api.batch import BatchResponse, batch_response, parse_batch
+from app.api.dependencies import get_read_db, require_api_key
+from app.api.fast import page_response
+from app.api.filters import SINCE_QUERY, UNTIL_QUERY, Predicates, ritual_filters
+from app.api.pagination import PageParams, keyset_page, page_params
+from app.db.rollups import Bucket, stats_statement
+from app.db.writer import write_rows
 from app.models.ritual import RitualLog
+from app.utils.clock import utc_now
 
 router = APIRouter(prefix="/rituals", tags=["rituals"])
 
@@ -44,25 +53,83 @@ class RitualRead(BaseModel):
         )
 
 
+RITUAL_COLUMNS = (
+    RitualLog.id,
+    RitualLog.agent_id,
+    RitualLog.event_type,
+    RitualLog.emotion,
+    RitualLog.context,
+    RitualLog.text,
+    RitualLog.created_at,
+)
+
+
+class RitualStat(BaseModel):
+    bucket_start: datetime
+    event_type: str
+    emotion: Optional[str]
+    count: int
+
+
+def build_ritual_row(payload: RitualPayload) -> dict[str, Any]:
+    return {"id": str(uuid4()), **payload.dict(), "created_at": utc_now()}
+
+
+def ritual_stats_statement(
+    agent_id: Optional[str] = Query(default=None),
+    bucket: Bucket = Query(default="hour"),
+    since: Optional[datetime] = SINCE_QUERY,
+    until: Optional[datetime] = UNTIL_QUERY,
+) -> Select:
+    return stats_statement(bucket, agent_id, since, until)
+
+
+def stats_response(rows: Sequence[Row]) -> ORJSONResponse:
+    return ORJSONResponse(
+        [
+            {
+                "bucket_start": datetime.fromisoformat(row.bucket_start).replace(tzinfo=timezone.utc),
+                "event_type": row.event_type,
+                "emotion": row.emotion or None,
+                "count": row.count,
+            }
+            for row in rows
+        ]
+    )
+
+
 @router.get("", response_model=list[RitualRead])
-def list_rituals(db: Session = Depends(get_db)) -> list[RitualRead]:
-    records = db.scalars(select(RitualLog).order_by(RitualLog.created_at.desc())).all()
-    return [RitualRead.from_orm(record) for record in records]
+def list_rituals(
+    page: PageParams = Depends(page_params),
+    filters: Predicates = Depends(ritual_filters),
+    db: Session = Depends(get_read_db),
+) -> ORJSONResponse:
+    stmt = select(*RITUAL_COLUMNS).where(*filters)
+    rows = db.execute(keyset_page(stmt, RitualLog.created_at, RitualLog.id, page)).all()
+    return page_response(rows, page)
+
+
+@router.get("/stats", response_model=list[RitualStat])
+def ritual_stats(stmt: Select = Depends(ritual_stats_statement), db: Session = Depends(get_read_db)) -> ORJSONResponse:
+    """Ritual counts per time bucket, read from the trigger-maintained rollups."""
+
+    return stats_response(db.execute(stmt).all())
 
 
 @router.post("", response_model=RitualRead, status_code=status.HTTP_201_CREATED, dependencies=[Depends(require_api_key)])
-def create_ritual(payload: RitualPayload, db: Session = Depends(get_db)) -> RitualRead:
-    record = RitualLog(
-        agent_id=payload.agent_id,
-        event_type=payload.event_type,
-        emotion=payload.emotion,
-        context=payload.context,
-        text=payload.text,
-    )
-    db.add(record)
-    db.commit()
-    db.refresh(record)
-    return RitualRead.from_orm(record)
+def create_ritual(payload: RitualPayload) -> RitualRead:
+    row = build_ritual_row(payload)
+    write_rows(RitualLog, [row])
+    return RitualRead(**row)
+
+
+@router.post("/batch", response_model=BatchResponse, status_code=status.HTTP_201_CREATED, dependencies=[Depends(require_api_key)])
+def create_rituals_batch(response: Response, items: list[Any] = Body(...)) -> BatchResponse:
+    valid, rejected = parse_batch(RitualPayload, items)
+    rows = [build_ritual_row(payload) for _, payload in valid]
+    if rows:
+        write_rows(RitualLog, rows)
+    return batch_response([(index, row["id"]) for (index, _), row in zip(valid, rows)], rejected, response)
 
 
 __all__ = ["router"]
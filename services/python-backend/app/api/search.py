@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from typing import Literal, Optional, Sequence
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+from sqlalchemy import Row, Select
+from sqlalchemy.orm import Session
+
+from app.api.dependencies import get_current_settings, get_read_db
+from app.api.pagination import NEXT_CURSOR_HEADER, decode_offset_cursor, encode_offset_cursor
+from app.config import Settings
+from app.db.search import match_expression, search_kinds, search_statement
+
+router = APIRouter(tags=["search"])
+
+SearchKind = Literal["ritual", "post", "vault"]
+
+
+class SearchResult(BaseModel):
+    type: SearchKind
+    id: str
+    score: float
+    snippet: str
+
+
+class SearchQuery:
+    def __init__(self, statement: Select, limit: int, offset: int) -> None:
+        self.statement = statement
+        self.limit = limit
+        self.offset = offset
+
+
+def search_query(
+    q: str = Query(..., min_length=1, description="Words to match; a trailing * matches a prefix"),
+    kinds: Optional[list[SearchKind]] = Query(default=None, alias="type"),
+    cursor: Optional[str] = Query(default=None, description="Opaque cursor from a previous page"),
+    limit: Optional[int] = Query(default=None, ge=1),
+    settings: Settings = Depends(get_current_settings),
+) -> SearchQuery:
+    match = match_expression(q)
+    if not match:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Query has no searchable terms")
+    offset = decode_offset_cursor(cursor) if cursor else 0
+    page_size = min(limit or settings.page_default_limit, settings.page_max_limit)
+    # One look-ahead row tells whether another page exists.
+    return SearchQuery(search_statement(match, search_kinds(kinds), page_size + 1, offset), page_size, offset)
+
+
+def search_response(rows: Sequence[Row], query: SearchQuery) -> ORJSONResponse:
+    items = [row._asdict() for row in rows[: query.limit]]
+    headers = None
+    if len(rows) > query.limit:
+        headers = {NEXT_CURSOR_HEADER: encode_offset_cursor(query.offset + query.limit)}
+    return ORJSONResponse(items, headers=headers)
+
+
+@router.get("/search", response_model=list[SearchResult])
+def search(query: SearchQuery = Depends(search_query), db: Session = Depends(get_read_db)) -> ORJSONResponse:
+    return search_response(db.execute(query.statement).all(), query)
+
+
+__all__ = ["SearchResult", "router", "search_query", "search_response"]
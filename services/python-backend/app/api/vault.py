@@ -1,37 +1,131 @@
 from __future__ import annotations
 
-from typing import Any
+from datetime import datetime
+from typing import Any, Iterator, Optional, Sequence
 
-from fastapi import APIRouter, Depends
-from fastapi.responses import JSONResponse
-from sqlalchemy import select
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy import Row, Select, select
 from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
 
-from app.api.dependencies import get_db
+from app.api.dependencies import get_current_settings, get_read_db, require_api_key
+from app.api.fast import encode_rows, page_response
+from app.api.filters import Predicates, vault_filters
+from app.api.pagination import PageParams, keyset_page, page_params
+from app.config import Settings
+from app.db.session import get_read_sessionmaker
+from app.db.vault_posts import append_vault_post, post_count_column, posts_column
 from app.models.vault import VaultRecord
 
 router = APIRouter(prefix="/vault", tags=["vault"])
 
 
-def _record_to_dict(record: VaultRecord) -> dict[str, Any]:
-    return {
-        "id": record.id,
-        "theme": record.theme,
-        "posts": record.posts or [],
-        "created_at": record.created_at.isoformat(),
-    }
+VaultColumns = tuple[ColumnElement[Any], ...]
+
+
+class VaultPostRead(BaseModel):
+    record_id: str
+    seq: int
+    content: Any
+    created_at: datetime
+
+
+def vault_columns(posts_limit: Optional[int] = None, post_count: bool = False) -> VaultColumns:
+    columns: list[ColumnElement[Any]] = [VaultRecord.id, VaultRecord.theme, posts_column(posts_limit)]
+    if post_count:
+        columns.append(post_count_column())
+    return (*columns, VaultRecord.created_at)
+
+
+def vault_view(
+    posts_limit: Optional[int] = Query(default=None, ge=0, description="Return only each record's first N posts"),
+    post_count: bool = Query(default=False, description="Include each record's total number of posts"),
+) -> VaultColumns:
+    return vault_columns(posts_limit, post_count)
+
+
+VAULT_COLUMNS = vault_columns()
+VAULT_JSON_COLUMNS = ("posts",)
 
 
 @router.get("", response_model=list[dict[str, Any]])
-def list_vault(db: Session = Depends(get_db)) -> list[dict[str, Any]]:
-    records = db.scalars(select(VaultRecord).order_by(VaultRecord.created_at.desc())).all()
-    return [_record_to_dict(record) for record in records]
+def list_vault(
+    page: PageParams = Depends(page_params),
+    filters: Predicates = Depends(vault_filters),
+    columns: VaultColumns = Depends(vault_view),
+    db: Session = Depends(get_read_db),
+) -> ORJSONResponse:
+    stmt = select(*columns).where(*filters)
+    rows = db.execute(keyset_page(stmt, VaultRecord.created_at, VaultRecord.id, page)).all()
+    return page_response(rows, page, VAULT_JSON_COLUMNS)
+
+
+@router.post(
+    "/{record_id}/posts",
+    response_model=VaultPostRead,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(require_api_key)],
+)
+def append_post(record_id: str, post: dict[str, Any] = Body(...)) -> VaultPostRead:
+    row = append_vault_post(record_id, post)
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Vault record not found")
+    return VaultPostRead(**row)
+
+
+EXPORT_MEDIA_TYPES = {"json": "application/json", "ndjson": "application/x-ndjson"}
+
+
+def export_statement(batch_size: int) -> Select:
+    """Select plain column rows newest first, fetched ``batch_size`` at a time.
+
+    Rows rather than ORM instances keep the identity map empty, and
+    ``yield_per`` keeps only one batch of the result set in memory.
+    """
+
+    return (
+        select(*VAULT_COLUMNS)
+        .order_by(VaultRecord.created_at.desc(), VaultRecord.id.desc())
+        .execution_options(yield_per=batch_size)
+    )
+
+
+def export_chunk(rows: Sequence[Row], *, ndjson: bool, first: bool) -> bytes:
+    encoded = encode_rows(rows, VAULT_JSON_COLUMNS)
+    if ndjson:
+        return b"\n".join(encoded) + b"\n"
+    return (b"" if first else b",") + b",".join(encoded)
+
+
+def _iter_export(export_format: str, batch_size: int) -> Iterator[bytes]:
+    """Yield the vault as one encoded chunk per fetched batch.
+
+    The generator owns its session because request-scoped dependencies are
+    closed before a streaming body is sent.
+    """
+
+    ndjson = export_format == "ndjson"
+    if not ndjson:
+        yield b'{"records":['
+    first = True
+    with get_read_sessionmaker()() as session:
+        for rows in session.execute(export_statement(batch_size)).partitions():
+            yield export_chunk(rows, ndjson=ndjson, first=first)
+            first = False
+    if not ndjson:
+        yield b"]}"
 
 
 @router.get("/export")
-def export_vault(db: Session = Depends(get_db)) -> JSONResponse:
-    records = list_vault(db)
-    return JSONResponse(content={"records": records})
+def export_vault(
+    export_format: str = Query(default="json", alias="format", pattern="^(json|ndjson)$"),
+    settings: Settings = Depends(get_current_settings),
+) -> StreamingResponse:
+    return StreamingResponse(
+        _iter_export(export_format, settings.export_batch_size), media_type=EXPORT_MEDIA_TYPES[export_format]
+    )
 
 
 __all__ = ["router"]
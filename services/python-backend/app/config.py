@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Literal, Optional
 
 from pydantic import BaseSettings, Field
 
@@ -16,6 +16,59 @@ class Settings(BaseSettings):
     data_dir: Path = Field(default=Path("data"), env="AGENT_SPARK_DATA_DIR")
     dev_mode: bool = Field(default=True, env="AGENT_SPARK_DEV_MODE")
     scheduler_enabled: bool = Field(default=True, env="AGENT_SPARK_SCHEDULER_ENABLED")
+    fast_start: bool = Field(default=False, env="AGENT_SPARK_FAST_START")
+    # Set by ``runserver --workers`` for its worker processes.
+    skip_startup_tasks: bool = Field(default=False, env="AGENT_SPARK_SKIP_STARTUP_TASKS")
+    events_relay: bool = Field(default=False, env="AGENT_SPARK_EVENTS_RELAY")
+    change_epoch: Optional[str] = Field(default=None, env="AGENT_SPARK_CHANGE_EPOCH")
+    scheduler_lease_path: Optional[Path] = Field(default=None, env="AGENT_SPARK_SCHEDULER_LEASE_PATH")
+    scheduler_heartbeat_seconds: float = Field(default=10.0, gt=0, env="AGENT_SPARK_SCHEDULER_HEARTBEAT_SECONDS")
+    scheduler_misfire_grace_seconds: int = Field(default=900, ge=1, env="AGENT_SPARK_SCHEDULER_MISFIRE_GRACE_SECONDS")
+    db_async: bool = Field(default=False, env="AGENT_SPARK_DB_ASYNC")
+    page_default_limit: int = Field(default=50, ge=1, env="AGENT_SPARK_PAGE_DEFAULT_LIMIT")
+    page_max_limit: int = Field(default=500, ge=1, env="AGENT_SPARK_PAGE_MAX_LIMIT")
+    export_batch_size: int = Field(default=500, ge=1, env="AGENT_SPARK_EXPORT_BATCH_SIZE")
+    sqlite_journal_mode: Literal["wal", "delete", "truncate", "persist"] = Field(
+        default="wal", env="AGENT_SPARK_SQLITE_JOURNAL_MODE"
+    )
+    sqlite_synchronous: Literal["off", "normal", "full", "extra"] = Field(
+        default="normal", env="AGENT_SPARK_SQLITE_SYNCHRONOUS"
+    )
+    sqlite_busy_timeout_ms: int = Field(default=5000, ge=0, env="AGENT_SPARK_SQLITE_BUSY_TIMEOUT_MS")
+    sqlite_cache_size_kib: int = Field(default=65536, ge=0, env="AGENT_SPARK_SQLITE_CACHE_SIZE_KIB")
+    sqlite_mmap_size: int = Field(default=268_435_456, ge=0, env="AGENT_SPARK_SQLITE_MMAP_SIZE")
+    sqlite_temp_store: Literal["default", "file", "memory"] = Field(default="memory", env="AGENT_SPARK_SQLITE_TEMP_STORE")
+    db_read_pool_size: int = Field(default=8, ge=1, env="AGENT_SPARK_DB_READ_POOL_SIZE")
+    db_busy_retries: int = Field(default=5, ge=0, env="AGENT_SPARK_DB_BUSY_RETRIES")
+    db_busy_retry_base_ms: int = Field(default=10, ge=1, env="AGENT_SPARK_DB_BUSY_RETRY_BASE_MS")
+    write_coalescer_enabled: bool = Field(default=True, env="AGENT_SPARK_WRITE_COALESCER_ENABLED")
+    write_batch_max_size: int = Field(default=128, ge=1, env="AGENT_SPARK_WRITE_BATCH_MAX_SIZE")
+    write_batch_window_ms: float = Field(default=2.0, ge=0, env="AGENT_SPARK_WRITE_BATCH_WINDOW_MS")
+    batch_max_items: int = Field(default=500, ge=1, env="AGENT_SPARK_BATCH_MAX_ITEMS")
+    legacy_import_chunk_size: int = Field(default=1000, ge=1, env="AGENT_SPARK_LEGACY_IMPORT_CHUNK_SIZE")
+    response_cache_routes: list[str] = Field(
+        default=["/agents", "/posts", "/rituals", "/vault"], env="AGENT_SPARK_RESPONSE_CACHE_ROUTES"
+    )
+    response_cache_max_bytes: int = Field(default=16 * 1024 * 1024, ge=0, env="AGENT_SPARK_RESPONSE_CACHE_MAX_BYTES")
+    response_cache_ttl_seconds: float = Field(default=30.0, ge=0, env="AGENT_SPARK_RESPONSE_CACHE_TTL_SECONDS")
+    events_queue_size: int = Field(default=256, ge=1, env="AGENT_SPARK_EVENTS_QUEUE_SIZE")
+    events_replay_size: int = Field(default=1024, ge=0, env="AGENT_SPARK_EVENTS_REPLAY_SIZE")
+    events_heartbeat_seconds: float = Field(default=15.0, gt=0, env="AGENT_SPARK_EVENTS_HEARTBEAT_SECONDS")
+    events_relay_interval_seconds: float = Field(default=0.1, gt=0, env="AGENT_SPARK_EVENTS_RELAY_INTERVAL_SECONDS")
+    generator_backend: str = Field(default="threadlight", env="AGENT_SPARK_GENERATOR_BACKEND")
+    generator_backends: dict[str, str] = Field(default_factory=dict, env="AGENT_SPARK_GENERATOR_BACKENDS")
+    generator_workers: int = Field(default=2, ge=0, env="AGENT_SPARK_GENERATOR_WORKERS")
+    generator_timeout_seconds: float = Field(default=30.0, gt=0, env="AGENT_SPARK_GENERATOR_TIMEOUT_SECONDS")
+    generator_batch_max_size: int = Field(default=32, ge=1, env="AGENT_SPARK_GENERATOR_BATCH_MAX_SIZE")
+    generator_batch_window_ms: float = Field(default=5.0, ge=0, env="AGENT_SPARK_GENERATOR_BATCH_WINDOW_MS")
+    retention_max_age_days: dict[str, float] = Field(default_factory=dict, env="AGENT_SPARK_RETENTION_MAX_AGE_DAYS")
+    retention_max_rows: dict[str, int] = Field(default_factory=dict, env="AGENT_SPARK_RETENTION_MAX_ROWS")
+    retention_interval_minutes: int = Field(default=60, ge=1, env="AGENT_SPARK_RETENTION_INTERVAL_MINUTES")
+    archive_chunk_size: int = Field(default=1000, ge=1, env="AGENT_SPARK_ARCHIVE_CHUNK_SIZE")
+    archive_vacuum_pages: int = Field(default=2000, ge=0, env="AGENT_SPARK_ARCHIVE_VACUUM_PAGES")
+    metrics_enabled: bool = Field(default=True, env="AGENT_SPARK_METRICS_ENABLED")
+    slow_query_ms: float = Field(default=250.0, ge=0, env="AGENT_SPARK_SLOW_QUERY_MS")
+    slow_query_explain: bool = Field(default=True, env="AGENT_SPARK_SLOW_QUERY_EXPLAIN")
 
     class Config:
         env_prefix = "AGENT_SPARK_"
@@ -25,6 +78,18 @@ class Settings(BaseSettings):
     def database_url(self) -> str:
         return f"sqlite:///{self.db_path}"
 
+    @property
+    def async_database_url(self) -> str:
+        return f"sqlite+aiosqlite:///{self.db_path}"
+
+    @property
+    def archive_dir(self) -> Path:
+        return self.data_dir / "archive"
+
+    @property
+    def scheduler_lease_file(self) -> Path:
+        return self.scheduler_lease_path or self.data_dir / "scheduler.lease"
+
 
 @lru_cache()
 def get_settings() -> Settings:
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Mapping, Optional, Sequence, TypeVar
+
+from sqlalchemy import insert
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.config import get_settings
+from app.db.base import Base
+from app.db.changes import get_change_tracker, install_change_tracking
+from app.db.session import (
+    JSON_ENGINE_OPTIONS,
+    busy_retry_delay,
+    install_instrumentation,
+    install_sqlite_pragmas,
+    is_busy_error,
+    is_sqlite_url,
+    sqlite_pragmas,
+)
+from app.db.writer import parents_first
+from app.engine.events import get_event_bus
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_async_engine: Optional[AsyncEngine] = None
+_async_read_engine: Optional[AsyncEngine] = None
+_AsyncSessionLocal: async_sessionmaker[AsyncSession] | None = None
+_AsyncReadSessionLocal: async_sessionmaker[AsyncSession] | None = None
+
+
+def _ensure_async_engine() -> None:
+    global _async_engine, _async_read_engine, _AsyncSessionLocal, _AsyncReadSessionLocal
+    if _async_engine is None:
+        settings = get_settings()
+        url = settings.async_database_url
+        if is_sqlite_url(url):
+            # Same writer/reader split as the sync engines; aiosqlite runs each
+            # connection on its own thread so the event loop never blocks. The
+            # dialect defaults to NullPool, so the queue pool is requested explicitly.
+            _async_engine = create_async_engine(
+                url, poolclass=AsyncAdaptedQueuePool, pool_size=1, max_overflow=0, **JSON_ENGINE_OPTIONS
+            )
+            _async_read_engine = create_async_engine(
+                url,
+                poolclass=AsyncAdaptedQueuePool,
+                pool_size=settings.db_read_pool_size,
+                max_overflow=0,
+                **JSON_ENGINE_OPTIONS,
+            )
+            install_sqlite_pragmas(_async_engine.sync_engine, sqlite_pragmas(settings))
+            install_sqlite_pragmas(_async_read_engine.sync_engine, sqlite_pragmas(settings, read_only=True))
+        else:
+            _async_engine = create_async_engine(
+                url, pool_size=10, max_overflow=20, pool_pre_ping=True, pool_recycle=3600, **JSON_ENGINE_OPTIONS
+            )
+            _async_read_engine = _async_engine
+        install_change_tracking(_async_engine.sync_engine)
+        if is_sqlite_url(url):
+            get_change_tracker().share(Path(settings.db_path), settings.change_epoch)
+        install_instrumentation(settings, _async_engine.sync_engine, _async_read_engine.sync_engine, prefix="async_")
+        _AsyncSessionLocal = async_sessionmaker(_async_engine, autoflush=False, expire_on_commit=False)
+        _AsyncReadSessionLocal = async_sessionmaker(_async_read_engine, autoflush=False, expire_on_commit=False)
+        logger.debug("Async database engine initialised for %s", url)
+
+
+def get_async_engine() -> AsyncEngine:
+    _ensure_async_engine()
+    assert _async_engine is not None
+    return _async_engine
+
+
+def get_async_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    _ensure_async_engine()
+    assert _AsyncSessionLocal is not None
+    return _AsyncSessionLocal
+
+
+def get_async_read_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    _ensure_async_engine()
+    assert _AsyncReadSessionLocal is not None
+    return _AsyncReadSessionLocal
+
+
+async def async_with_busy_retry(operation: Callable[[], Awaitable[T]]) -> T:
+    """Async counterpart of :func:`app.db.session.with_busy_retry`."""
+
+    settings = get_settings()
+    for attempt in range(settings.db_busy_retries + 1):
+        try:
+            return await operation()
+        except OperationalError as exc:
+            if attempt >= settings.db_busy_retries or not is_busy_error(exc):
+                raise
+            delay = busy_retry_delay(settings, attempt)
+            logger.warning("Database busy; retrying in %.3fs (attempt %s)", delay, attempt + 1)
+            await asyncio.sleep(delay)
+    raise AssertionError("unreachable")
+
+
+async def async_write_rows(model: type[Base], rows: Sequence[Mapping[str, Any]]) -> int:
+    """Insert ``rows`` with one executemany and commit, retrying on SQLITE_BUSY, then publish them."""
+
+    return await async_write_related([(model, rows)])
+
+
+async def async_write_related(requests: Sequence[tuple[type[Base], Sequence[Mapping[str, Any]]]]) -> int:
+    """Insert rows for several tables in one transaction, parents first, then publish them."""
+
+    grouped: dict[type[Base], list[Mapping[str, Any]]] = {}
+    for model, rows in requests:
+        if rows:
+            grouped.setdefault(model, []).extend(rows)
+
+    async def attempt() -> None:
+        async with get_async_sessionmaker()() as session:
+            for model in parents_first(grouped):
+                await session.execute(insert(model), grouped[model])
+            await session.commit()
+
+    await async_with_busy_retry(attempt)
+    bus = get_event_bus()
+    for model, rows in requests:
+        bus.publish_rows(model.__tablename__, rows)
+    return sum(len(rows) for _, rows in requests)
+
+
+async def dispose_async_engine() -> None:
+    global _async_engine, _async_read_engine, _AsyncSessionLocal, _AsyncReadSessionLocal
+    if _async_read_engine is not None and _async_read_engine is not _async_engine:
+        await _async_read_engine.dispose()
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    _async_engine = None
+    _async_read_engine = None
+    _AsyncSessionLocal = None
+    _AsyncReadSessionLocal = None
+
+
+__all__ = [
+    "async_with_busy_retry",
+    "async_write_related",
+    "async_write_rows",
+    "dispose_async_engine",
+    "get_async_engine",
+    "get_async_read_sessionmaker",
+    "get_async_sessionmaker",
+]
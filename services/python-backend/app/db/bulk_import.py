@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Literal
+
+from sqlalchemy import insert
+
+from app.config import get_settings
+from app.db.legacy import iter_legacy_records, legacy_record_to_row, quarantine_legacy_file
+from app.db.session import get_sessionmaker, with_busy_retry
+from app.db.vault_posts import split_vault_rows
+from app.engine.events import get_event_bus
+from app.models.vault import VaultPost, VaultRecord
+
+logger = logging.getLogger(__name__)
+
+ImportStatus = Literal["imported", "corrupt", "failed"]
+
+
+@dataclass
+class ParsedFile:
+    path: Path
+    rows: list[dict[str, Any]]
+    seconds: float
+    error: str | None = None
+    corrupt: bool = False
+
+
+@dataclass
+class FileImportResult:
+    path: Path
+    status: ImportStatus
+    rows: int
+    parse_seconds: float
+    write_seconds: float
+    moved_to: Path | None = None
+    error: str | None = None
+
+
+def parse_legacy_file(path: Path) -> ParsedFile:
+    """Parse and normalize one legacy vault file; runs inside a worker process."""
+
+    started = time.perf_counter()
+    try:
+        rows = [legacy_record_to_row(record) for record, _ in iter_legacy_records(path)]
+    except ValueError as exc:  # JSONDecodeError, UnicodeDecodeError or an unsupported layout
+        return ParsedFile(path, [], time.perf_counter() - started, str(exc), corrupt=True)
+    return ParsedFile(path, rows, time.perf_counter() - started)
+
+
+def _write_file_rows(rows: list[dict[str, Any]], chunk_size: int) -> None:
+    """Insert one file's rows in a single transaction so a file is imported whole or not at all."""
+
+    def attempt() -> None:
+        with get_sessionmaker()() as session:
+            for start in range(0, len(rows), chunk_size):
+                records, posts = split_vault_rows(rows[start : start + chunk_size])
+                session.execute(insert(VaultRecord), records)
+                if posts:
+                    session.execute(insert(VaultPost), posts)
+            session.commit()
+
+    with_busy_retry(attempt)
+
+
+def _finish(parsed: ParsedFile, migrated_at: str, chunk_size: int) -> FileImportResult:
+    if parsed.corrupt:
+        moved_to = quarantine_legacy_file(parsed.path, migrated_at)
+        logger.warning("Legacy vault %s corrupted; moved to %s", parsed.path, moved_to)
+        return FileImportResult(parsed.path, "corrupt", 0, parsed.seconds, 0.0, moved_to, parsed.error)
+
+    started = time.perf_counter()
+    try:
+        if parsed.rows:
+            _write_file_rows(parsed.rows, chunk_size)
+    except Exception as exc:  # noqa: BLE001
+        logger.exception("Failed to import legacy vault %s", parsed.path)
+        return FileImportResult(parsed.path, "failed", 0, parsed.seconds, time.perf_counter() - started, error=str(exc))
+    write_seconds = time.perf_counter() - started
+
+    moved_to = parsed.path.with_name(f"{parsed.path.name}.migrated.{migrated_at}")
+    parsed.path.replace(moved_to)
+    get_event_bus().publish("vault.imported", {"records": len(parsed.rows)})
+    return FileImportResult(parsed.path, "imported", len(parsed.rows), parsed.seconds, write_seconds, moved_to)
+
+
+def _collect(future: Future[ParsedFile], path: Path, migrated_at: str, chunk_size: int) -> FileImportResult:
+    try:
+        parsed = future.result()
+    except Exception as exc:  # noqa: BLE001
+        logger.exception("Worker failed to parse %s", path)
+        return FileImportResult(path, "failed", 0, 0.0, 0.0, error=str(exc))
+    result = _finish(parsed, migrated_at, chunk_size)
+    logger.info(
+        "%s: %s %s rows (parse %.2fs, write %.2fs)",
+        path.name,
+        result.status,
+        result.rows,
+        result.parse_seconds,
+        result.write_seconds,
+    )
+    return result
+
+
+def import_legacy_directory(directory: Path, *, jobs: int | None = None) -> list[FileImportResult]:
+    """Import every ``*.json`` legacy vault in ``directory``.
+
+    Files are parsed in a process pool while this process acts as the single
+    writer, inserting each file's rows as soon as its parse completes. At most
+    ``jobs`` files are submitted at a time, so when writing is slower than
+    parsing the parsed rows waiting for the writer stay bounded.
+    """
+
+    paths = sorted(path for path in directory.glob("*.json") if path.is_file())
+    if not paths:
+        return []
+
+    chunk_size = get_settings().legacy_import_chunk_size
+    migrated_at = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    workers = max(1, min(jobs or os.cpu_count() or 1, len(paths)))
+    results: list[FileImportResult] = []
+    queued = iter(paths)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures: dict[Future[ParsedFile], Path] = {}
+        for path in queued:
+            futures[pool.submit(parse_legacy_file, path)] = path
+            if len(futures) >= workers:
+                break
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                path = futures.pop(future)
+                # Refill before writing so workers parse the next file meanwhile.
+                following = next(queued, None)
+                if following is not None:
+                    futures[pool.submit(parse_legacy_file, following)] = following
+                results.append(_collect(future, path, migrated_at, chunk_size))
+    results.sort(key=lambda result: result.path)
+    return results
+
+
+def format_import_report(results: list[FileImportResult], elapsed: float) -> str:
+    width = max([len("file")] + [len(result.path.name) for result in results])
+    lines = [f"{'file':<{width}}  {'status':<8}  {'rows':>8}  {'parse s':>8}  {'write s':>8}"]
+    for result in results:
+        lines.append(
+            f"{result.path.name:<{width}}  {result.status:<8}  {result.rows:>8}"
+            f"  {result.parse_seconds:>8.2f}  {result.write_seconds:>8.2f}"
+        )
+    total = sum(result.rows for result in results)
+    failed = sum(result.status != "imported" for result in results)
+    lines.append(f"{len(results)} files, {total} rows, {failed} not imported, {elapsed:.2f}s total")
+    return "\n".join(lines)
+
+
+__all__ = ["FileImportResult", "format_import_report", "import_legacy_directory", "parse_legacy_file"]
@@ -0,0 +1,215 @@
+"""Per-table change versions for conditional GETs and cache invalidation.
+
+Every engine gets cursor and transaction hooks. Tables written by
+INSERT/UPDATE/DELETE statements are collected per connection and their
+version is bumped when the transaction commits, so every write path
+(routers, the write coalescer, scheduler jobs, legacy imports) is covered
+without call-site bookkeeping. Rolled-back writes bump nothing.
+
+On SQLite, :meth:`ChangeTracker.share` makes the versions of
+:data:`TRACKED_TABLES` the rows of ``change_versions``, which triggers bump in
+the same transaction as every insert, update and delete. Writes from any
+process or connection (CLI imports and archiving, other server workers,
+other containers on the same file, even the ``sqlite3`` shell) therefore
+change the tags. Readers reload the rows only when SQLite's ``PRAGMA
+data_version`` says another connection committed, which costs one pragma per
+lookup. The ``epoch`` is random per process unless configured; the
+supervisor of ``runserver --workers`` hands every worker the same one, so a
+tag issued by one worker is honoured by all of them.
+
+Other databases keep process-local counters, so tags issued before a restart
+never match afterwards.
+"""
+
+from __future__ import annotations
+
+import logging
+import secrets
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
+
+logger = logging.getLogger(__name__)
+
+ChangeListener = Callable[[frozenset[str]], None]
+
+# Tables whose versions back ETags and cached responses (see app.api.conditional).
+TRACKED_TABLES = ("agents", "posts", "ritual_logs", "vault_records", "vault_posts")
+
+_PENDING_KEY = "agent_spark_changed_tables"
+_UNIX_NOW = "(julianday('now') - 2440587.5) * 86400.0"
+
+
+def _change_trigger(table: str, operation: str) -> str:
+    return (
+        f"CREATE TRIGGER IF NOT EXISTS {table}_changes_{operation[0].lower()} AFTER {operation} ON {table} BEGIN "
+        f"INSERT INTO change_versions (table_name, version, modified_at) VALUES ('{table}', 1, {_UNIX_NOW}) "
+        "ON CONFLICT (table_name) DO UPDATE SET version = version + 1, modified_at = excluded.modified_at; END"
+    )
+
+
+def install_change_triggers(connection: Connection) -> None:
+    """Create the triggers that bump ``change_versions`` on every write to a tracked table."""
+
+    if connection.dialect.name != "sqlite":
+        return
+    for table in TRACKED_TABLES:
+        for operation in ("INSERT", "UPDATE", "DELETE"):
+            connection.exec_driver_sql(_change_trigger(table, operation))
+
+
+class ChangeTracker:
+    def __init__(self) -> None:
+        self.epoch = secrets.token_hex(4)
+        self._lock = threading.Lock()
+        self._versions: dict[str, int] = {}
+        self._modified: dict[str, float] = {}
+        self._listeners: list[ChangeListener] = []
+        self._started = time.time()
+        self._shared_path: Optional[Path] = None
+        self._shared_connection: Optional[sqlite3.Connection] = None
+        self._data_version: Optional[int] = None
+
+    @property
+    def shared(self) -> bool:
+        return self._shared_path is not None
+
+    def share(self, db_path: Path, epoch: Optional[str] = None) -> None:
+        """Read versions from the ``change_versions`` table of ``db_path`` from now on."""
+
+        with self._lock:
+            if self._shared_path == db_path and (epoch is None or epoch == self.epoch):
+                return
+            self._close_shared()
+            self._shared_path = db_path
+            if epoch is not None:
+                self.epoch = epoch
+
+    def unshare(self) -> None:
+        with self._lock:
+            self._close_shared()
+            self._shared_path = None
+
+    def _close_shared(self) -> None:
+        if self._shared_connection is not None:
+            self._shared_connection.close()
+        self._shared_connection = None
+        self._data_version = None
+
+    def _refresh(self) -> None:
+        # Caller holds the lock.
+        if self._shared_path is None:
+            return
+        try:
+            if self._shared_connection is None:
+                uri = self._shared_path.resolve().as_uri() + "?mode=ro"
+                self._shared_connection = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            connection = self._shared_connection
+            data_version = connection.execute("PRAGMA data_version").fetchone()[0]
+            if data_version == self._data_version:
+                return
+            rows = connection.execute("SELECT table_name, version, modified_at FROM change_versions").fetchall()
+        except sqlite3.OperationalError as exc:
+            if "no such table" not in str(exc):
+                logger.exception("Could not read shared change versions from %s", self._shared_path)
+            # Otherwise the schema is not migrated yet; versions are read once it is.
+            self._close_shared()
+            return
+        except sqlite3.Error:
+            logger.exception("Could not read shared change versions from %s", self._shared_path)
+            self._close_shared()
+            return
+        self._data_version = data_version
+        for table, version, modified_at in rows:
+            self._versions[table] = version
+            self._modified[table] = modified_at
+
+    def version(self, tables: Iterable[str]) -> tuple[int, ...]:
+        with self._lock:
+            self._refresh()
+            return tuple(self._versions.get(table, 0) for table in tables)
+
+    def last_modified(self, tables: Iterable[str]) -> float:
+        with self._lock:
+            self._refresh()
+            return max((self._modified.get(table, self._started) for table in tables), default=self._started)
+
+    def record_write(self, tables: Iterable[str]) -> None:
+        changed = frozenset(tables)
+        if not changed:
+            return
+        now = time.time()
+        with self._lock:
+            # Shared versions were bumped in the database by the triggers.
+            if self._shared_path is None:
+                for table in changed:
+                    self._versions[table] = self._versions.get(table, 0) + 1
+                    self._modified[table] = now
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener(changed)
+            except Exception:  # noqa: BLE001
+                logger.exception("Change listener %r failed", listener)
+
+    def add_listener(self, listener: ChangeListener) -> None:
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: ChangeListener) -> None:
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+
+_tracker = ChangeTracker()
+
+
+def get_change_tracker() -> ChangeTracker:
+    return _tracker
+
+
+def record_write(*tables: str) -> None:
+    """Bump ``tables`` for writes the engine hooks cannot see (e.g. raw DBAPI access)."""
+
+    _tracker.record_write(tables)
+
+
+def _after_cursor_execute(conn: Any, _cursor: Any, _statement: str, _params: Any, context: Any, _many: bool) -> None:
+    if context is None or not (context.isinsert or context.isupdate or context.isdelete):
+        return
+    table = getattr(getattr(context.compiled, "statement", None), "table", None)
+    name = getattr(table, "name", None)
+    if name:
+        conn.info.setdefault(_PENDING_KEY, set()).add(name)
+
+
+def _on_commit(conn: Any) -> None:
+    tables = conn.info.pop(_PENDING_KEY, None)
+    if tables:
+        _tracker.record_write(tables)
+
+
+def _on_rollback(conn: Any) -> None:
+    conn.info.pop(_PENDING_KEY, None)
+
+
+def install_change_tracking(engine: Engine) -> None:
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "commit", _on_commit)
+    event.listen(engine, "rollback", _on_rollback)
+
+
+__all__ = [
+    "TRACKED_TABLES",
+    "ChangeTracker",
+    "get_change_tracker",
+    "install_change_triggers",
+    "install_change_tracking",
+    "record_write",
+]
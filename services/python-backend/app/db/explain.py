@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import re
+from typing import Any, Union
+
+from sqlalchemy import Executable, event
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+_INDEX_PATTERN = re.compile(r"USING (?:COVERING )?INDEX (\w+)")
+
+
+def explain_query_plan(bind: Union[Connection, Session], statement: Executable) -> list[str]:
+    """Return the ``detail`` lines of SQLite's ``EXPLAIN QUERY PLAN`` for ``statement``.
+
+    The plan is taken from the exact SQL and bound parameters SQLAlchemy sends
+    to the driver, so it matches what the route executes.
+    """
+
+    connection = bind.connection() if isinstance(bind, Session) else bind
+    plan: list[str] = []
+
+    def capture(_conn: Any, cursor: Any, sql: str, parameters: Any, _context: Any, _executemany: bool) -> None:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}", parameters)
+        plan.extend(row[-1] for row in cursor.fetchall())
+
+    event.listen(connection, "before_cursor_execute", capture)
+    try:
+        connection.execute(statement).close()
+    finally:
+        event.remove(connection, "before_cursor_execute", capture)
+    return plan
+
+
+def plan_indexes(plan: list[str]) -> set[str]:
+    """Names of the indexes a query plan reads."""
+
+    return {match.group(1) for line in plan for match in _INDEX_PATTERN.finditer(line)}
+
+
+def plan_scans_table(plan: list[str]) -> bool:
+    """Whether any step of the plan is a full table scan."""
+
+    return any(line.startswith("SCAN ") and " INDEX " not in line for line in plan)
+
+
+def plan_full_scans(plan: list[str]) -> set[str]:
+    """Tables the plan reads in full, without an index."""
+
+    scanned = set()
+    for line in plan:
+        if line.startswith("SCAN ") and " INDEX " not in line:
+            words = line.split()
+            scanned.add(words[2] if words[1] == "TABLE" and len(words) > 2 else words[1])
+    return scanned
+
+
+__all__ = ["explain_query_plan", "plan_full_scans", "plan_indexes", "plan_scans_table"]
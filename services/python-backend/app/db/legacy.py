@@ -1,46 +1,248 @@
 from __future__ import annotations
 
+import codecs
 import json
 import logging
+import threading
+import time
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Iterable
+from typing import Any, BinaryIO, Iterator
+from uuid import uuid4
 
-import portalocker
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
 from app.config import get_settings
-from app.models.vault import VaultRecord
+from app.db.session import with_busy_retry
+from app.db.vault_posts import split_vault_rows
+from app.engine.events import get_event_bus
+from app.models.import_checkpoint import ImportCheckpoint
+from app.models.vault import VaultPost, VaultRecord
+from app.utils.clock import utc_now
 
 logger = logging.getLogger(__name__)
 
+_DECODER = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
 
-def _load_legacy_records(path: Path) -> Iterable[dict]:
-    with path.open("r", encoding="utf-8") as handle:
-        data = json.load(handle)
 
-    if isinstance(data, dict):
-        records = data.get("records") or data.get("vault")
-        if isinstance(records, list):
-            data = records
+class _JSONStream:
+    """Incrementally decode JSON values from a binary file while tracking byte offsets.
+
+    Only the text of the value currently being decoded is buffered, so memory
+    stays bounded by the largest single record rather than the file size.
+    """
+
+    def __init__(self, handle: BinaryIO, offset: int = 0, read_size: int = 1 << 16) -> None:
+        self._handle = handle
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._read_size = read_size
+        self._buffer = ""
+        self._eof = False
+        self.offset = offset
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        # Grow reads with the buffer so re-decoding a large value stays linear.
+        chunk = self._handle.read(max(self._read_size, len(self._buffer)))
+        self._buffer += self._decoder.decode(chunk, final=not chunk)
+        self._eof = not chunk
+        return True
+
+    def _consume(self, count: int) -> None:
+        self.offset += len(self._buffer[:count].encode("utf-8"))
+        self._buffer = self._buffer[count:]
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character, or ``""`` at end of file."""
+
+        while True:
+            stripped = self._buffer.lstrip(_WHITESPACE)
+            if stripped:
+                self._consume(len(self._buffer) - len(stripped))
+                return stripped[0]
+            self._consume(len(self._buffer))
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise json.JSONDecodeError(f"Expecting {char!r}", self._buffer[:20], 0)
+        self._consume(1)
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self._buffer)
+                # A value ending exactly at the buffer edge may be a truncated number.
+                if end < len(self._buffer) or self._eof:
+                    self._consume(end)
+                    return value
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            self._fill()
+
+    def array_items(self, *, resume: bool = False) -> Iterator[Any]:
+        """Yield the items of an array whose ``[`` was consumed (or, with ``resume``, one item ago)."""
+
+        if not resume:
+            if self.peek() == "]":
+                self._consume(1)
+                return
+            yield self.value()
+        while True:
+            char = self.peek()
+            if char == "]":
+                self._consume(1)
+                return
+            if char == "":
+                # Also when resuming: the array was cut off, not finished.
+                raise json.JSONDecodeError(f"Unterminated array at byte {self.offset}", "", 0)
+            self.expect(",")
+            yield self.value()
+
+
+def iter_legacy_records(path: Path, start_offset: int = 0, read_size: int = 1 << 16) -> Iterator[tuple[dict, int]]:
+    """Stream records from a legacy vault file as ``(record, end_byte_offset)`` pairs.
+
+    Accepts a top-level list, an object wrapping a ``records``/``vault`` list,
+    or a single record object. ``start_offset`` resumes inside the record list
+    at an offset previously yielded by this function.
+    """
+
+    with path.open("rb") as handle:
+        handle.seek(start_offset)
+        stream = _JSONStream(handle, start_offset, read_size)
+        if start_offset:
+            items = stream.array_items(resume=True)
         else:
-            data = [data]
+            first = stream.peek()
+            if first == "[":
+                stream.expect("[")
+                items = stream.array_items()
+            elif first == "{":
+                items = _object_records(stream)
+            else:
+                stream.value()
+                raise ValueError("Legacy vault format must be a list or object")
+        for item in items:
+            if isinstance(item, dict):
+                yield item, stream.offset
+        if not start_offset and first == "[" and stream.peek() != "":
+            raise json.JSONDecodeError("Extra data", "", 0)
+
+
+def _object_records(stream: _JSONStream) -> Iterator[Any]:
+    stream.expect("{")
+    fields: dict[str, Any] = {}
+    while stream.peek() != "}":
+        if fields:
+            stream.expect(",")
+        key = stream.value()
+        stream.expect(":")
+        if key in ("records", "vault") and stream.peek() == "[":
+            stream.expect("[")
+            yield from stream.array_items()
+            return
+        fields[key] = stream.value()
+    stream.expect("}")
+    yield fields
+
+
+def legacy_record_to_row(record: dict) -> dict[str, Any]:
+    """Map a legacy vault record onto a ``vault_records`` row."""
+
+    posts = record.get("posts") or record.get("entries") or []
+    theme = record.get("theme") or record.get("title") or "untitled"
+    return {"id": str(uuid4()), "theme": theme, "posts": posts, "created_at": utc_now()}
+
 
-    if not isinstance(data, list):
-        raise ValueError("Legacy vault format must be a list or object")
+def quarantine_legacy_file(path: Path, migrated_at: str) -> Path:
+    corrupt_dir = get_settings().data_dir / "corrupt"
+    corrupt_dir.mkdir(parents=True, exist_ok=True)
+    new_path = corrupt_dir / f"{path.name}.{migrated_at}"
+    path.replace(new_path)
+    return new_path
 
-    for item in data:
-        if not isinstance(item, dict):
-            continue
-        yield item
 
+def _load_checkpoint(session: Session, source: str, stat: Any) -> ImportCheckpoint | None:
+    checkpoint = session.get(ImportCheckpoint, source)
+    if checkpoint is None:
+        return None
+    if checkpoint.quarantined_as is not None:
+        # The repaired file replaces the quarantined one; it is resumed by record count.
+        return checkpoint
+    if checkpoint.source_size != stat.st_size or checkpoint.source_mtime_ns != stat.st_mtime_ns:
+        logger.warning("Ignoring stale import checkpoint for %s; the file has changed", source)
+        return None
+    return checkpoint
+
+
+def _checkpoint(source: str, offset: int, records: int, stat: Any) -> ImportCheckpoint:
+    return ImportCheckpoint(
+        source=source,
+        byte_offset=offset,
+        records=records,
+        source_size=stat.st_size,
+        source_mtime_ns=stat.st_mtime_ns,
+        quarantined_as=None,
+        updated_at=datetime.now(timezone.utc),
+    )
+
+
+def _commit_chunk(session: Session, rows: list[dict[str, Any]], checkpoint: ImportCheckpoint) -> None:
+    """Insert ``rows`` and advance ``checkpoint`` in the same transaction."""
+
+    records, posts = split_vault_rows(rows)
+
+    def attempt() -> None:
+        session.execute(insert(VaultRecord), records)
+        if posts:
+            session.execute(insert(VaultPost), posts)
+        session.merge(checkpoint)
+        session.commit()
+
+    with_busy_retry(attempt, on_retry=session.rollback)
+
+
+def _keep_quarantined_checkpoint(session: Session, checkpoint: ImportCheckpoint, quarantined_as: Path) -> None:
+    """Remember how many records were committed before the file was found corrupt."""
+
+    checkpoint.quarantined_as = str(quarantined_as)
+    checkpoint.updated_at = datetime.now(timezone.utc)
+
+    def attempt() -> None:
+        session.merge(checkpoint)
+        session.commit()
+
+    with_busy_retry(attempt, on_retry=session.rollback)
+
+
+def _drop_checkpoint(session: Session, source: str) -> None:
+    checkpoint = session.get(ImportCheckpoint, source)
+    if checkpoint is not None:
+        session.delete(checkpoint)
+        with_busy_retry(session.commit, on_retry=session.rollback)
+
+
+def migrate_legacy_vault(session: Session, stop: threading.Event | None = None) -> bool:
+    """Import ``legacy_vault_path`` in committed chunks, resuming from the last checkpoint.
+
+    When ``stop`` is set the import pauses after the current chunk; the next
+    call resumes from its checkpoint.
+    """
 
-def migrate_legacy_vault(session: Session) -> bool:
     settings = get_settings()
     path = settings.legacy_vault_path
     if not path.exists():
         return False
 
+    import portalocker  # deferred: most starts have no legacy vault to lock
+
     path.parent.mkdir(parents=True, exist_ok=True)
     migrated_at = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
 
@@ -49,34 +251,74 @@ def migrate_legacy_vault(session: Session) -> bool:
 
     try:
         with portalocker.Lock(lock_path, timeout=1):
+            source = str(path.resolve())
+            stat = path.stat()
+            checkpoint = _load_checkpoint(session, source, stat)
+            repaired = checkpoint is not None and checkpoint.quarantined_as is not None
+            start_offset = checkpoint.byte_offset if checkpoint and not repaired else 0
+            imported = checkpoint.records if checkpoint else 0
+            # Records at the start of a repaired file that were committed before it was quarantined.
+            skip = imported if repaired else 0
+            if repaired:
+                logger.info("Importing repaired %s; skipping the %s records imported before it was quarantined", path, skip)
+            elif checkpoint:
+                logger.info("Resuming legacy import of %s at byte %s (%s records done)", path, start_offset, imported)
+
+            chunk_size = settings.legacy_import_chunk_size
+            started = time.perf_counter()
+            resumed_from = imported
+            rows: list[dict[str, Any]] = []
+            offset = start_offset
             try:
-                records = list(_load_legacy_records(path))
+                for record, offset in iter_legacy_records(path, start_offset):
+                    if skip:
+                        skip -= 1
+                        continue
+                    rows.append(legacy_record_to_row(record))
+                    if len(rows) >= chunk_size:
+                        imported += len(rows)
+                        _commit_chunk(session, rows, _checkpoint(source, offset, imported, stat))
+                        rows = []
+                        rate = (imported - resumed_from) / max(time.perf_counter() - started, 1e-9)
+                        logger.info("Imported %s legacy records (%.0f records/s, byte %s of %s)", imported, rate, offset, stat.st_size)
+                        if stop is not None and stop.is_set():
+                            logger.info("Legacy import paused at byte %s of %s", offset, stat.st_size)
+                            return False
+                if rows:
+                    imported += len(rows)
+                    _commit_chunk(session, rows, _checkpoint(source, offset, imported, stat))
             except json.JSONDecodeError:
-                corrupt_dir = settings.data_dir / "corrupt"
-                corrupt_dir.mkdir(parents=True, exist_ok=True)
-                new_path = corrupt_dir / f"{path.name}.{migrated_at}"
-                path.replace(new_path)
-                logger.warning("Legacy vault corrupted; moved to %s", new_path)
+                session.rollback()
+                new_path = quarantine_legacy_file(path, migrated_at)
+                if imported:
+                    # Earlier chunks are committed; keep their count so the repaired file does not duplicate them.
+                    _keep_quarantined_checkpoint(session, _checkpoint(source, offset, imported, stat), new_path)
+                    logger.warning(
+                        "Legacy vault corrupted after %s records, which were imported; moved to %s. "
+                        "Once repaired and moved back, the import skips those %s records.",
+                        imported,
+                        new_path,
+                        imported,
+                    )
+                else:
+                    _drop_checkpoint(session, source)
+                    logger.warning("Legacy vault corrupted; moved to %s", new_path)
                 return False
             except Exception as exc:  # noqa: BLE001
-                logger.exception("Failed to parse legacy vault: %s", exc)
+                session.rollback()
+                logger.exception("Failed to import legacy vault: %s", exc)
                 raise
 
-            for record in records:
-                posts = record.get("posts") or record.get("entries") or []
-                theme = record.get("theme") or record.get("title") or "untitled"
-                vault_record = VaultRecord(theme=theme, posts=posts)
-                session.add(vault_record)
-
-            session.commit()
-
             migrated_path = path.with_name(f"{path.name}.migrated.{migrated_at}")
             path.replace(migrated_path)
-            logger.info("Migrated %s legacy records into SQLite", len(records))
+            _drop_checkpoint(session, source)
+            elapsed = time.perf_counter() - started
+            logger.info("Migrated %s legacy records into SQLite in %.2fs", imported, elapsed)
+            get_event_bus().publish("vault.imported", {"records": imported})
             return True
     except portalocker.exceptions.LockException:
         logger.warning("Could not acquire lock to migrate legacy vault at %s", path)
         return False
 
 
-__all__ = ["migrate_legacy_vault"]
+__all__ = ["iter_legacy_records", "legacy_record_to_row", "migrate_legacy_vault", "quarantine_legacy_file"]
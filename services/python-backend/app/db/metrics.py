@@ -0,0 +1,109 @@
+"""Query, connection and commit metrics for SQLAlchemy engines.
+
+Queries are timed with the ``before_cursor_execute``/``after_cursor_execute``
+hooks and labelled by engine role and statement verb only, so the number of
+series stays fixed however many distinct statements run. Connection set-up
+and commits have no "after" event, so the engine's dialect methods are
+wrapped instead. Pool occupancy is sampled when metrics are rendered.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any, Callable
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.utils.metrics import REGISTRY
+
+QUERY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+_VERBS = frozenset({"SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "PRAGMA", "CREATE", "DROP", "ALTER", "BEGIN"})
+_STARTED = "_metrics_started"
+
+QUERY_SECONDS = REGISTRY.histogram(
+    "agent_spark_db_query_duration_seconds",
+    "Time spent executing statements, by engine and statement verb.",
+    ("engine", "statement"),
+    QUERY_BUCKETS,
+)
+QUERY_ERRORS = REGISTRY.counter(
+    "agent_spark_db_query_errors_total", "Statements that raised, by engine and statement verb.", ("engine", "statement")
+)
+CONNECT_SECONDS = REGISTRY.histogram(
+    "agent_spark_db_connect_duration_seconds", "Time to open a new DBAPI connection.", ("engine",), QUERY_BUCKETS
+)
+COMMIT_SECONDS = REGISTRY.histogram(
+    "agent_spark_db_commit_duration_seconds", "Time spent in DBAPI commit.", ("engine",), QUERY_BUCKETS
+)
+CONNECTION_HELD_SECONDS = REGISTRY.histogram(
+    "agent_spark_db_connection_held_seconds", "Time a pooled connection stays checked out.", ("engine",)
+)
+POOL_SIZE = REGISTRY.gauge("agent_spark_db_pool_size", "Connections the pool keeps open.", ("engine",))
+POOL_CHECKED_OUT = REGISTRY.gauge("agent_spark_db_pool_checked_out", "Connections currently checked out.", ("engine",))
+
+
+def statement_kind(statement: str) -> str:
+    head = statement.lstrip()[:8].split(None, 1)
+    verb = head[0].upper() if head else ""
+    return verb if verb in _VERBS else "OTHER"
+
+
+def _timed(method: Callable[..., Any], histogram: Any, role: str) -> Callable[..., Any]:
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            histogram.observe(time.perf_counter() - started, role)
+
+    return wrapper
+
+
+def install_query_metrics(engine: Engine, role: str) -> None:
+    """Record metrics for ``engine`` under the ``engine=role`` label."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+        if context is not None:
+            setattr(context, _STARTED, time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+        started = getattr(context, _STARTED, None)
+        if started is not None:
+            QUERY_SECONDS.observe(time.perf_counter() - started, role, statement_kind(statement))
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context: Any) -> None:
+        if exception_context.statement is not None:
+            QUERY_ERRORS.inc(role, statement_kind(exception_context.statement))
+
+    @event.listens_for(engine, "checkout")
+    def _checkout(dbapi_connection: Any, record: Any, proxy: Any) -> None:
+        record.info[_STARTED] = time.perf_counter()
+
+    @event.listens_for(engine, "checkin")
+    def _checkin(dbapi_connection: Any, record: Any) -> None:
+        started = record.info.pop(_STARTED, None)
+        if started is not None:
+            CONNECTION_HELD_SECONDS.observe(time.perf_counter() - started, role)
+
+    # The dialect belongs to this engine alone, so wrapping it affects no other engine.
+    dialect: Any = engine.dialect
+    dialect.connect = _timed(dialect.connect, CONNECT_SECONDS, role)
+    dialect.do_commit = _timed(dialect.do_commit, COMMIT_SECONDS, role)
+
+    pool: Any = engine.pool
+
+    def sample_pool() -> None:
+        if hasattr(pool, "size"):
+            POOL_SIZE.set(pool.size(), role)
+        if hasattr(pool, "checkedout"):
+            POOL_CHECKED_OUT.set(pool.checkedout(), role)
+
+    REGISTRY.on_collect(f"db_pool:{role}", sample_pool)
+
+
+__all__ = ["install_query_metrics", "statement_kind"]
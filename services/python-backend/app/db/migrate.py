@@ -1,30 +1,266 @@
+"""Versioned schema migrations.
+
+Steps are applied in order and recorded in ``schema_version``. Startup reads
+only the newest row there: when its version and metadata hash match the code,
+nothing else touches the schema. Every step must be idempotent (``IF NOT
+EXISTS`` DDL, column checks) so databases created by ``create_all`` before
+versioning existed can be adopted safely.
+
+Indexes are created one per transaction with ``CREATE INDEX IF NOT EXISTS``.
+In WAL mode readers keep working while the index builds; only other writers
+wait, and for no longer than a single index build.
+"""
+
 from __future__ import annotations
 
+import hashlib
 import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import Callable
 
-from sqlalchemy import inspect
+from sqlalchemy import Column, Index, insert, select, update
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.schema import CreateColumn, CreateIndex, CreateTable
 
+import app.models.agent  # noqa: F401  - register every table on Base.metadata
+import app.models.archive_segment  # noqa: F401
+import app.models.change_version  # noqa: F401
+import app.models.import_checkpoint  # noqa: F401
+import app.models.post  # noqa: F401
+import app.models.ritual  # noqa: F401
+import app.models.ritual_rollup  # noqa: F401
+import app.models.shared_event  # noqa: F401
+import app.models.vault  # noqa: F401
 from app.config import get_settings
 from app.db.base import Base
-from app.db.session import get_engine
+from app.db.changes import install_change_triggers
+from app.db.retention import install_retention
+from app.db.rollups import install_rollups
+from app.db.search import install_search
+from app.db.session import get_engine, with_busy_retry
+from app.db.vault_posts import explode_vault_posts
+from app.models.schema_version import SchemaVersion
 
 logger = logging.getLogger(__name__)
 
 
-def run_migrations() -> None:
-    """Create database tables if they do not already exist."""
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    apply: Callable[[Connection], None]
+
+
+def create_index_if_not_exists(connection: Connection, index: Index) -> None:
+    connection.execute(CreateIndex(index, if_not_exists=True))
+
+
+def add_column_if_missing(connection: Connection, table_name: str, column: Column) -> None:
+    """``ALTER TABLE ... ADD COLUMN`` unless ``table_name`` already has ``column``."""
+
+    existing = {row[1] for row in connection.exec_driver_sql(f'PRAGMA table_info("{table_name}")')}
+    if column.name not in existing:
+        ddl = CreateColumn(column).compile(dialect=connection.dialect)
+        connection.exec_driver_sql(f'ALTER TABLE "{table_name}" ADD COLUMN {ddl}')
+
+
+def _declared_indexes(*names: str) -> Callable[[Connection], None]:
+    def apply(connection: Connection) -> None:
+        indexes = {index.name: index for table in Base.metadata.sorted_tables for index in table.indexes}
+        for name in names:
+            create_index_if_not_exists(connection, indexes[name])
+
+    return apply
+
+
+def _create_tables(connection: Connection) -> None:
+    Base.metadata.create_all(bind=connection)
+
+
+def _table_creator(name: str) -> Callable[[Connection], None]:
+    def apply(connection: Connection) -> None:
+        Base.metadata.tables[name].create(bind=connection, checkfirst=True)
+
+    return apply
+
+
+def _column_adder(table_name: str, column_name: str) -> Callable[[Connection], None]:
+    def apply(connection: Connection) -> None:
+        add_column_if_missing(connection, table_name, Base.metadata.tables[table_name].c[column_name])
+
+    return apply
+
+
+def _sync_metadata(connection: Connection) -> None:
+    _create_tables(connection)
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            create_index_if_not_exists(connection, index)
+
+
+MIGRATIONS: tuple[Migration, ...] = (
+    Migration(1, "create tables", _create_tables),
+    Migration(
+        2,
+        "keyset pagination indexes",
+        _declared_indexes(
+            "ix_agents_created_at_id",
+            "ix_posts_created_at_id",
+            "ix_ritual_logs_created_at_id",
+            "ix_vault_records_created_at_id",
+        ),
+    ),
+    Migration(
+        3,
+        "agent lookup indexes",
+        _declared_indexes("ix_posts_agent_id_created_at", "ix_ritual_logs_agent_id_event_type_created_at"),
+    ),
+    Migration(
+        4,
+        "list filter indexes",
+        _declared_indexes(
+            "ix_posts_theme_created_at",
+            "ix_ritual_logs_event_type_created_at",
+            "ix_ritual_logs_emotion_created_at",
+            "ix_vault_records_theme_created_at",
+        ),
+    ),
+    Migration(5, "full-text search", install_search),
+    Migration(6, "ritual rollups", install_rollups),
+    Migration(7, "vault posts table", explode_vault_posts),
+    Migration(8, "retention archive", install_retention),
+    Migration(9, "shared change versions", _table_creator("change_versions")),
+    Migration(10, "quarantined import checkpoints", _column_adder("import_checkpoints", "quarantined_as")),
+    Migration(11, "vault theme search", lambda connection: install_search(connection, "vault_themes_fts")),
+    Migration(12, "shared live events", _table_creator("shared_events")),
+    Migration(13, "change version triggers", install_change_triggers),
+)
 
-    engine = get_engine()
-    inspector = inspect(engine)
-    existing_tables = inspector.get_table_names()
-    if existing_tables:
-        logger.debug("Database already has tables: %s", existing_tables)
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def metadata_hash() -> str:
+    """Fingerprint of the declared tables, columns and indexes."""
+
+    digest = hashlib.sha256()
+    for table in Base.metadata.sorted_tables:
+        digest.update(table.name.encode())
+        for column in table.columns:
+            digest.update(f"{column.name}:{column.type!r}:{column.nullable}".encode())
+        for index in sorted(table.indexes, key=lambda index: index.name or ""):
+            digest.update(f"{index.name}:{[column.name for column in index.columns]}".encode())
+    return digest.hexdigest()
+
+
+def current_version(engine: Engine) -> tuple[int, str | None]:
+    """Return the newest applied version and its metadata hash (``0`` for an unversioned database)."""
+
+    statement = select(SchemaVersion.version, SchemaVersion.metadata_hash).order_by(SchemaVersion.version.desc()).limit(1)
+    try:
+        with engine.connect() as connection:
+            row = connection.execute(statement).first()
+    except OperationalError as exc:
+        # Only a missing ``schema_version`` means unversioned; "database is locked" is not.
+        if "no such table" not in str(exc.orig):
+            raise
+        return 0, None
+    return (row.version, row.metadata_hash) if row else (0, None)
+
+
+@dataclass(frozen=True)
+class MigrationPlan:
+    current: int
+    pending: tuple[Migration, ...]
+    sync_metadata: bool
+
+    @property
+    def up_to_date(self) -> bool:
+        return not self.pending and not self.sync_metadata
+
+
+def plan_migrations(engine: Engine | None = None) -> MigrationPlan:
+    engine = engine or get_engine()
+    version, stored_hash = current_version(engine)
+    pending = tuple(migration for migration in MIGRATIONS if migration.version > version)
+    return MigrationPlan(version, pending, sync_metadata=stored_hash != metadata_hash())
+
+
+def apply_migrations(engine: Engine | None = None) -> MigrationPlan:
+    """Apply pending steps; re-sync tables when the models changed without a new step."""
+
+    engine = engine or get_engine()
+    plan = plan_migrations(engine)
+    if plan.up_to_date:
+        return plan
+
+    fingerprint = metadata_hash()
+    with engine.begin() as connection:
+        connection.execute(CreateTable(SchemaVersion.__table__, if_not_exists=True))
+    for migration in plan.pending:
+        with_busy_retry(lambda migration=migration: _apply_step(engine, migration, fingerprint))
+    if not plan.pending:
+        # Tables or indexes declared without a step of their own.
+        with engine.begin() as connection:
+            _begin_write(connection)
+            _sync_metadata(connection)
+            connection.execute(
+                update(SchemaVersion).where(SchemaVersion.version == plan.current).values(metadata_hash=fingerprint)
+            )
+    return plan
+
+
+def _begin_write(connection: Connection) -> None:
+    """Take SQLite's write lock now, so the checks that follow cannot go stale."""
+
+    if connection.dialect.name == "sqlite":
+        # pysqlite opens no transaction before DDL; without this, steps would also not be atomic.
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def _apply_step(engine: Engine, migration: Migration, fingerprint: str) -> None:
+    with engine.begin() as connection:
+        _begin_write(connection)
+        # Another process (a second worker or container) may have applied it since the plan was read.
+        if connection.scalar(select(SchemaVersion.version).where(SchemaVersion.version == migration.version)) is not None:
+            logger.info("Migration %s was applied by another process", migration.version)
+            return
+        logger.info("Applying migration %s: %s", migration.version, migration.name)
+        migration.apply(connection)
+        connection.execute(
+            insert(SchemaVersion).values(
+                version=migration.version,
+                name=migration.name,
+                metadata_hash=fingerprint,
+                applied_at=datetime.now(timezone.utc),
+            )
+        )
+
+
+def run_migrations() -> None:
+    """Bring the database schema up to date; a no-op beyond one query when it already is."""
 
-    Base.metadata.create_all(bind=engine)
+    plan = apply_migrations()
     settings = get_settings()
     db_path = Path(settings.db_path)
-    logger.info("Initialized database at %s", db_path)
+    if plan.up_to_date:
+        logger.debug("Database at %s is at schema version %s", db_path, plan.current)
+    else:
+        logger.info("Initialized database at %s (schema version %s)", db_path, LATEST_VERSION)
 
 
-__all__ = ["run_migrations"]
+__all__ = [
+    "LATEST_VERSION",
+    "MIGRATIONS",
+    "Migration",
+    "MigrationPlan",
+    "add_column_if_missing",
+    "apply_migrations",
+    "create_index_if_not_exists",
+    "current_version",
+    "metadata_hash",
+    "plan_migrations",
+    "run_migrations",
+]
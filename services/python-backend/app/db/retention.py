@@ -0,0 +1,322 @@
+"""Retention rules and cold-storage archiving for ``ritual_logs`` and ``posts``.
+
+Rows past a table's retention horizon (older than ``retention_max_age_days``
+or beyond the newest ``retention_max_rows``) are moved, oldest first and one
+chunk at a time, into gzip-compressed JSONL segments under
+``<data_dir>/archive/<table>/<YYYY-MM-DD>/``, partitioned by the UTC day of
+``created_at``. Each chunk's segment files are written and fsynced before the
+transaction that records them in ``archive_segments`` and deletes the rows,
+so a crash leaves at worst an orphan file (removed on the next run), never a
+lost row. Runs for one table are serialized by ``<archive_dir>/<table>.lock``,
+so the scheduler's job and ``agent-spark archive`` never mistake each other's
+uncommitted segments for orphans. Freed pages are returned to the filesystem with
+``PRAGMA incremental_vacuum`` after each chunk.
+
+Archived rituals stay counted in ``ritual_rollups``. :func:`iter_archive`
+reads archived rows back for a time range.
+"""
+
+from __future__ import annotations
+
+import gzip
+import logging
+import os
+import secrets
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Iterator, Optional, Sequence
+
+import orjson
+from sqlalchemy import Row, and_, delete, or_, select, update
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.config import get_settings
+from app.db.base import Base
+from app.db.rollups import ROLLUP_DELETE_TRIGGER
+from app.db.session import get_engine, get_read_sessionmaker, get_sessionmaker, with_busy_retry
+from app.models.archive_segment import ArchiveSegment
+from app.models.post import Post
+from app.models.ritual import RitualLog
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_MODELS: dict[str, type[Base]] = {"ritual_logs": RitualLog, "posts": Post}
+
+
+@dataclass(frozen=True)
+class RetentionRule:
+    table: str
+    max_age: Optional[timedelta] = None
+    max_rows: Optional[int] = None
+
+
+@dataclass
+class ArchiveResult:
+    table: str
+    rows: int = 0
+    segments: int = 0
+    freed_pages: int = 0
+    skipped: bool = False
+
+
+def retention_rules() -> list[RetentionRule]:
+    settings = get_settings()
+    tables = sorted(set(settings.retention_max_age_days) | set(settings.retention_max_rows))
+    unknown = [table for table in tables if table not in ARCHIVE_MODELS]
+    if unknown:
+        raise ValueError(f"Retention is not supported for {', '.join(unknown)}")
+    return [
+        RetentionRule(
+            table,
+            max_age=timedelta(days=settings.retention_max_age_days[table]) if table in settings.retention_max_age_days else None,
+            max_rows=settings.retention_max_rows.get(table),
+        )
+        for table in tables
+    ]
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def expired_predicate(session: Session, rule: RetentionRule, now: datetime) -> Optional[ColumnElement[bool]]:
+    """Rows past the horizon of ``rule``, fixed at ``now`` so a run terminates."""
+
+    model: Any = ARCHIVE_MODELS[rule.table]
+    predicates: list[ColumnElement[bool]] = []
+    if rule.max_age is not None:
+        predicates.append(model.created_at < now - rule.max_age)
+    if rule.max_rows is not None:
+        # Key of the newest row beyond the limit; it and everything older expire.
+        boundary = session.execute(
+            select(model.created_at, model.id)
+            .order_by(model.created_at.desc(), model.id.desc())
+            .offset(rule.max_rows)
+            .limit(1)
+        ).first()
+        if boundary is not None:
+            predicates.append(
+                or_(
+                    model.created_at < boundary.created_at,
+                    and_(model.created_at == boundary.created_at, model.id <= boundary.id),
+                )
+            )
+    return or_(*predicates) if predicates else None
+
+
+def _write_segment(path: Path, rows: Sequence[Row]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(path.name + ".partial")
+    with open(partial, "wb") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6) as compressed:
+            for row in rows:
+                compressed.write(orjson.dumps(row._asdict()) + b"\n")
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(partial, path)
+
+
+def _write_chunk(table: str, rows: Sequence[Row], run_id: str, chunk: int) -> list[ArchiveSegment]:
+    """Write ``rows`` as one segment per UTC day and return their (uncommitted) manifest rows."""
+
+    archive_dir = get_settings().archive_dir
+    by_day: dict[str, list[Row]] = {}
+    for row in rows:
+        by_day.setdefault(_as_utc(row.created_at).strftime("%Y-%m-%d"), []).append(row)
+
+    segments = []
+    for day, day_rows in by_day.items():
+        relative = Path(table) / day / f"{run_id}-{chunk:05d}.jsonl.gz"
+        _write_segment(archive_dir / relative, day_rows)
+        segments.append(
+            ArchiveSegment(
+                table_name=table,
+                partition=day,
+                path=relative.as_posix(),
+                rows=len(day_rows),
+                first_created_at=day_rows[0].created_at,
+                last_created_at=day_rows[-1].created_at,
+                state="archiving",
+            )
+        )
+    return segments
+
+
+def _remove_orphans(session: Session, table: str, started: float) -> None:
+    root = get_settings().archive_dir / table
+    if not root.is_dir():
+        return
+    known = set(session.scalars(select(ArchiveSegment.path).where(ArchiveSegment.table_name == table)))
+    for path in root.glob("*/*.jsonl.gz*"):
+        # A file written since this run started belongs to a run that may still commit it.
+        if path.relative_to(root.parent).as_posix() not in known and path.stat().st_mtime < started:
+            logger.warning("Removing orphan archive segment %s", path)
+            path.unlink()
+
+
+def incremental_vacuum(session: Session, pages: int) -> int:
+    """Release up to ``pages`` free pages to the filesystem; returns how many were freed."""
+
+    connection = session.connection()
+    if pages <= 0 or connection.exec_driver_sql("PRAGMA auto_vacuum").scalar() != 2:
+        return 0
+    free = connection.exec_driver_sql("PRAGMA freelist_count").scalar() or 0
+    target = min(pages, free)
+    # The sqlite3 driver steps a statement without result columns only once,
+    # and each step of ``incremental_vacuum`` frees a single page.
+    for _ in range(target):
+        connection.exec_driver_sql("PRAGMA incremental_vacuum(1)")
+    session.commit()
+    return target
+
+
+def archive_table(rule: RetentionRule, *, now: Optional[datetime] = None) -> ArchiveResult:
+    import portalocker  # deferred: keeps the lock library off the app import path
+
+    from app.utils import locking
+
+    try:
+        with locking.exclusive_lock(get_settings().archive_dir / f"{rule.table}.lock"):
+            return _archive_locked(rule, now)
+    except portalocker.exceptions.LockException:
+        logger.warning("Another archive run of %s is in progress; skipping it", rule.table)
+        return ArchiveResult(rule.table, skipped=True)
+
+
+def _archive_locked(rule: RetentionRule, now: Optional[datetime]) -> ArchiveResult:
+    settings = get_settings()
+    model: Any = ARCHIVE_MODELS[rule.table]
+    columns = tuple(model.__table__.columns)
+    result = ArchiveResult(rule.table)
+    started = time.time()
+    run_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S") + "-" + secrets.token_hex(3)
+
+    with get_sessionmaker()() as session:
+        _remove_orphans(session, rule.table, started)
+        expired = expired_predicate(session, rule, now or datetime.now(timezone.utc))
+        if expired is None:
+            return result
+        chunk = 0
+        while True:
+            rows = session.execute(
+                select(*columns).where(expired).order_by(model.created_at, model.id).limit(settings.archive_chunk_size)
+            ).all()
+            session.commit()
+            if not rows:
+                break
+            segments = _write_chunk(rule.table, rows, run_id, chunk)
+            ids = [row.id for row in rows]
+
+            def attempt() -> None:
+                session.add_all(segments)
+                session.flush()
+                session.execute(delete(model).where(model.id.in_(ids)))
+                session.execute(
+                    update(ArchiveSegment)
+                    .where(ArchiveSegment.id.in_([segment.id for segment in segments]))
+                    .values(state="archived")
+                )
+                session.commit()
+
+            with_busy_retry(attempt, on_retry=session.rollback)
+            result.rows += len(rows)
+            result.segments += len(segments)
+            result.freed_pages += incremental_vacuum(session, settings.archive_vacuum_pages)
+            chunk += 1
+    if result.rows:
+        logger.info(
+            "Archived %s %s rows into %s segments (%s pages freed)",
+            result.rows,
+            rule.table,
+            result.segments,
+            result.freed_pages,
+        )
+    return result
+
+
+def run_retention() -> list[ArchiveResult]:
+    """Apply every configured retention rule; the scheduler's ``retention`` job."""
+
+    return [archive_table(rule) for rule in retention_rules()]
+
+
+def archive_horizon(session: Session, table: str) -> Optional[datetime]:
+    """``created_at`` of the newest archived row of ``table``, if any."""
+
+    return session.scalar(
+        select(ArchiveSegment.last_created_at)
+        .where(ArchiveSegment.table_name == table, ArchiveSegment.state == "archived")
+        .order_by(ArchiveSegment.last_created_at.desc())
+        .limit(1)
+    )
+
+
+def _segments(session: Session, table: str, since: Optional[datetime], until: Optional[datetime]) -> list[ArchiveSegment]:
+    stmt = select(ArchiveSegment).where(ArchiveSegment.table_name == table, ArchiveSegment.state == "archived")
+    if since is not None:
+        stmt = stmt.where(ArchiveSegment.last_created_at >= _as_utc(since))
+    if until is not None:
+        stmt = stmt.where(ArchiveSegment.first_created_at < _as_utc(until))
+    return list(session.scalars(stmt.order_by(ArchiveSegment.first_created_at, ArchiveSegment.id)))
+
+
+def iter_archive(table: str, since: Optional[datetime] = None, until: Optional[datetime] = None) -> Iterator[bytes]:
+    """Yield archived rows of ``table`` created in ``[since, until)`` as JSON lines, oldest segment first."""
+
+    with get_read_sessionmaker()() as session:
+        segments = _segments(session, table, since, until)
+    archive_dir = get_settings().archive_dir
+    lower = _as_utc(since) if since is not None else None
+    upper = _as_utc(until) if until is not None else None
+    for segment in segments:
+        inside = (lower is None or _as_utc(segment.first_created_at) >= lower) and (
+            upper is None or _as_utc(segment.last_created_at) < upper
+        )
+        with gzip.open(archive_dir / segment.path, "rb") as lines:
+            for line in lines:
+                if not inside:
+                    created_at = _as_utc(datetime.fromisoformat(orjson.loads(line)["created_at"]))
+                    if (lower is not None and created_at < lower) or (upper is not None and created_at >= upper):
+                        continue
+                yield line if line.endswith(b"\n") else line + b"\n"
+
+
+def install_retention(connection: Connection) -> None:
+    """Create the archive manifest and stop archived rituals from leaving the rollups."""
+
+    ArchiveSegment.__table__.create(bind=connection, checkfirst=True)
+    for index in ArchiveSegment.__table__.indexes:
+        index.create(bind=connection, checkfirst=True)
+    if connection.dialect.name == "sqlite":
+        connection.exec_driver_sql("DROP TRIGGER IF EXISTS ritual_rollups_ad")
+        connection.exec_driver_sql(ROLLUP_DELETE_TRIGGER)
+
+
+def enable_incremental_vacuum(engine: Engine | None = None) -> None:
+    """Switch an existing database to ``auto_vacuum=INCREMENTAL``; rewrites the whole file once."""
+
+    engine = engine or get_engine()
+    with engine.connect() as connection:
+        connection = connection.execution_options(isolation_level="AUTOCOMMIT")
+        connection.exec_driver_sql("PRAGMA auto_vacuum=INCREMENTAL")
+        connection.exec_driver_sql("VACUUM")
+
+
+__all__ = [
+    "ARCHIVE_MODELS",
+    "ArchiveResult",
+    "RetentionRule",
+    "archive_horizon",
+    "archive_table",
+    "enable_incremental_vacuum",
+    "expired_predicate",
+    "incremental_vacuum",
+    "install_retention",
+    "iter_archive",
+    "retention_rules",
+    "run_retention",
+]
@@ -0,0 +1,116 @@
+"""Incremental ritual analytics rollups.
+
+Triggers on ``ritual_logs`` add (or subtract) one to the matching hour and
+day rows of ``ritual_rollups`` in the same transaction as each insert or
+delete, so the rollups are always consistent with the raw log and a stats
+query reads one row per bucket instead of scanning the log.
+
+Rows removed by retention archiving (see :mod:`app.db.retention`) are the
+exception: they stay counted, so stats keep covering archived history.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Literal
+
+from sqlalchemy import Select, func, select
+from sqlalchemy.engine import Connection
+
+from app.models.ritual_rollup import RitualRollup
+
+Bucket = Literal["hour", "day"]
+
+# ``created_at`` is stored as ``YYYY-MM-DD HH:MM:SS.ffffff`` UTC text, so
+# bucket starts are prefixes of it padded back to a full timestamp.
+BUCKET_STARTS: dict[str, str] = {
+    "hour": "substr({row}.created_at, 1, 13) || ':00:00'",
+    "day": "substr({row}.created_at, 1, 10) || ' 00:00:00'",
+}
+BUCKET_FORMATS: dict[str, str] = {"second": "%Y-%m-%d %H:%M:%S", "hour": "%Y-%m-%d %H:00:00", "day": "%Y-%m-%d 00:00:00"}
+
+
+def _adjust(row: str, delta: int) -> str:
+    statements = []
+    for bucket, start in BUCKET_STARTS.items():
+        statements.append(
+            "INSERT INTO ritual_rollups (bucket, agent_id, bucket_start, event_type, emotion, count) "
+            f"VALUES ('{bucket}', coalesce({row}.agent_id, ''), {start.format(row=row)}, {row}.event_type, "
+            f"coalesce({row}.emotion, ''), {delta}) "
+            "ON CONFLICT (bucket, agent_id, bucket_start, event_type, emotion) "
+            f"DO UPDATE SET count = count + {delta};"
+        )
+    return " ".join(statements)
+
+
+# Deletes made while an archive segment is being committed are not subtracted.
+ROLLUP_DELETE_TRIGGER = (
+    "CREATE TRIGGER IF NOT EXISTS ritual_rollups_ad AFTER DELETE ON ritual_logs "
+    "WHEN NOT EXISTS (SELECT 1 FROM archive_segments WHERE state = 'archiving') "
+    f"BEGIN {_adjust('old', -1)} END"
+)
+
+ROLLUP_TRIGGERS = (
+    f"CREATE TRIGGER IF NOT EXISTS ritual_rollups_ai AFTER INSERT ON ritual_logs BEGIN {_adjust('new', 1)} END",
+    ROLLUP_DELETE_TRIGGER,
+    "CREATE TRIGGER IF NOT EXISTS ritual_rollups_au AFTER UPDATE OF agent_id, event_type, emotion, created_at "
+    f"ON ritual_logs BEGIN {_adjust('old', -1)} {_adjust('new', 1)} END",
+)
+
+
+def install_rollups(connection: Connection) -> None:
+    """Create the rollup triggers and backfill rollups for existing rituals."""
+
+    if connection.dialect.name != "sqlite":
+        return
+    RitualRollup.__table__.create(bind=connection, checkfirst=True)
+    for index in RitualRollup.__table__.indexes:
+        index.create(bind=connection, checkfirst=True)
+    for statement in ROLLUP_TRIGGERS:
+        connection.exec_driver_sql(statement)
+    rebuild_rollups(connection)
+
+
+def rebuild_rollups(connection: Connection) -> None:
+    """Recount every rollup from ``ritual_logs``; counts of archived rituals are dropped."""
+
+    connection.exec_driver_sql("DELETE FROM ritual_rollups")
+    for bucket, start in BUCKET_STARTS.items():
+        bucket_start = start.format(row="ritual_logs")
+        connection.exec_driver_sql(
+            "INSERT INTO ritual_rollups (bucket, agent_id, bucket_start, event_type, emotion, count) "
+            f"SELECT '{bucket}', coalesce(agent_id, ''), {bucket_start}, event_type, coalesce(emotion, ''), count(*) "
+            f"FROM ritual_logs GROUP BY 2, 3, 4, 5"
+        )
+
+
+def bucket_floor(value: datetime, bucket: str) -> str:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.strftime(BUCKET_FORMATS[bucket])
+
+
+def stats_statement(bucket: Bucket, agent_id: str | None, since: datetime | None, until: datetime | None) -> Select:
+    """Counts per bucket, event type and emotion, oldest bucket first.
+
+    With ``agent_id`` the query is a primary-key range scan; without it the
+    per-agent rows of each bucket are summed.
+    """
+
+    rollup = RitualRollup
+    count = rollup.count if agent_id is not None else func.sum(rollup.count)
+    stmt = select(rollup.bucket_start, rollup.event_type, rollup.emotion, count.label("count")).where(
+        rollup.bucket == bucket
+    )
+    if agent_id is not None:
+        stmt = stmt.where(rollup.agent_id == agent_id)
+    else:
+        stmt = stmt.group_by(rollup.bucket_start, rollup.event_type, rollup.emotion)
+    if since is not None:
+        stmt = stmt.where(rollup.bucket_start >= bucket_floor(since, bucket))
+    if until is not None:
+        stmt = stmt.where(rollup.bucket_start < bucket_floor(until, "second"))
+    return stmt.where(rollup.count != 0).order_by(rollup.bucket_start, rollup.event_type, rollup.emotion)
+
+
+__all__ = ["Bucket", "ROLLUP_DELETE_TRIGGER", "bucket_floor", "install_rollups", "rebuild_rollups", "stats_statement"]
@@ -0,0 +1,191 @@
+"""SQLite FTS5 full-text search over rituals, posts and vault records.
+
+Each source table has an FTS5 table whose rowid equals the source rowid and
+which carries the id of the matched item in an unindexed ``ref_id`` column.
+Triggers on the source tables keep the index in step with every insert,
+update and delete. Text inside JSON columns is flattened with ``json_tree``
+so every string leaf of ``Post.content`` and ``VaultPost.content`` is
+searchable. Vault posts are indexed one row per post, alongside one row per
+record holding its theme so records without posts are found too; the two are
+grouped back into one hit per record at query time.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterable, Sequence
+
+from sqlalchemy import Select, column, literal, select, table, text, union_all
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql.expression import func
+
+
+@dataclass(frozen=True)
+class SearchSource:
+    kind: str
+    source: str
+    fts: str
+    # Column name -> SQL expression over the source row, with ``{row}`` as the row alias.
+    columns: dict[str, str]
+    ref: str = "{row}.id"
+
+
+def _json_text(expression: str) -> str:
+    # Text that is not valid JSON (e.g. ``NaN`` written by the stdlib encoder) is indexed as is.
+    leaves = f"(SELECT group_concat(value, ' ') FROM json_tree({expression}) WHERE type = 'text')"
+    return f"CASE WHEN json_valid({expression}) THEN {leaves} ELSE {expression} END"
+
+
+SEARCH_SOURCES: tuple[SearchSource, ...] = (
+    SearchSource(
+        "ritual",
+        "ritual_logs",
+        "ritual_logs_fts",
+        {"event_type": "{row}.event_type", "text": "{row}.text", "context": "{row}.context"},
+    ),
+    SearchSource("post", "posts", "posts_fts", {"theme": "{row}.theme", "body": _json_text("{row}.content")}),
+    SearchSource("vault", "vault_records", "vault_themes_fts", {"theme": "{row}.theme"}),
+    SearchSource(
+        "vault",
+        "vault_posts",
+        "vault_posts_fts",
+        {"theme": "(SELECT theme FROM vault_records WHERE id = {row}.record_id)", "body": _json_text("{row}.content")},
+        ref="{row}.record_id",
+    ),
+)
+
+SEARCH_KINDS = tuple(dict.fromkeys(source.kind for source in SEARCH_SOURCES))
+
+
+def _values(source: SearchSource, row: str) -> str:
+    return ", ".join(expression.format(row=row) for expression in source.columns.values())
+
+
+def search_ddl(source: SearchSource) -> list[str]:
+    names = ", ".join(source.columns)
+    insert = (
+        f"INSERT INTO {source.fts}(rowid, ref_id, {names}) "
+        f"VALUES (new.rowid, {source.ref.format(row='new')}, {_values(source, 'new')});"
+    )
+    delete = f"DELETE FROM {source.fts} WHERE rowid = old.rowid;"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {source.fts} USING fts5("
+        f"ref_id UNINDEXED, {names}, tokenize = 'unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER IF NOT EXISTS {source.fts}_ai AFTER INSERT ON {source.source} BEGIN {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS {source.fts}_ad AFTER DELETE ON {source.source} BEGIN {delete} END",
+        f"CREATE TRIGGER IF NOT EXISTS {source.fts}_au AFTER UPDATE ON {source.source} BEGIN {delete} {insert} END",
+    ]
+
+
+def install_search(connection: Connection, *fts_tables: str) -> None:
+    """Create the FTS tables and triggers and index any rows that predate them.
+
+    Only the named FTS tables when some are given, otherwise all of them.
+    """
+
+    if connection.dialect.name != "sqlite":
+        return
+    sources = _sources(fts_tables)
+    for source in sources:
+        for statement in search_ddl(source):
+            connection.exec_driver_sql(statement)
+    _rebuild(connection, sources)
+
+
+def _sources(fts_tables: Iterable[str]) -> tuple[SearchSource, ...]:
+    names = set(fts_tables)
+    return tuple(source for source in SEARCH_SOURCES if not names or source.fts in names)
+
+
+def rebuild_search(connection: Connection) -> dict[str, int]:
+    """Re-index every source table from scratch; returns the row count per source table."""
+
+    return _rebuild(connection, SEARCH_SOURCES)
+
+
+def _rebuild(connection: Connection, sources: Iterable[SearchSource]) -> dict[str, int]:
+    counts: dict[str, int] = {}
+    for source in sources:
+        names = ", ".join(source.columns)
+        connection.exec_driver_sql(f"DELETE FROM {source.fts}")
+        result = connection.exec_driver_sql(
+            f"INSERT INTO {source.fts}(rowid, ref_id, {names}) "
+            f"SELECT row.rowid, {source.ref.format(row='row')}, {_values(source, 'row')} FROM {source.source} AS row"
+        )
+        connection.exec_driver_sql(f"INSERT INTO {source.fts}({source.fts}) VALUES ('optimize')")
+        counts[source.source] = result.rowcount
+    return counts
+
+
+def match_expression(query: str) -> str:
+    """Turn free text into an FTS5 query: every token must match, ``word*`` is a prefix match.
+
+    Tokens are quoted so operators and punctuation typed by users cannot
+    produce FTS5 syntax errors.
+    """
+
+    terms = []
+    for token in query.split():
+        prefix = token.endswith("*")
+        token = token.rstrip("*")
+        if token:
+            terms.append('"' + token.replace('"', '""') + '"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+
+def _matches(source: SearchSource) -> Select:
+    fts = table(source.fts, column("ref_id"), column("rank"))
+    return (
+        select(
+            literal(source.kind).label("type"),
+            fts.c.ref_id.label("id"),
+            func.bm25(text(source.fts)).label("score"),
+            func.snippet(text(source.fts), -1, "[", "]", "…", 12).label("snippet"),
+        )
+        .select_from(fts)
+        .where(text(f"{source.fts} MATCH :match"))
+    )
+
+
+def search_statement(match: str, kinds: Iterable[str], limit: int, offset: int) -> Select:
+    """Best matches first across the requested kinds, ranked by bm25."""
+
+    selects = []
+    for kind in SEARCH_KINDS:
+        if kind not in kinds:
+            continue
+        matches = [_matches(source) for source in SEARCH_SOURCES if source.kind == kind]
+        if len(matches) == 1:
+            selects.append(matches[0])
+            continue
+        # Several rows can share a ``ref_id``; keep only the best match of each.
+        # A compound subquery is never flattened into the aggregate, where
+        # FTS5 auxiliary functions are not allowed. The bare ``snippet``
+        # column comes from the row with the ``min`` score.
+        best = union_all(*matches).subquery()
+        selects.append(
+            select(best.c.type, best.c.id, func.min(best.c.score).label("score"), best.c.snippet).group_by(best.c.id)
+        )
+    combined = union_all(*selects).subquery()
+    return (
+        select(combined)
+        .order_by(combined.c.score, combined.c.type, combined.c.id)
+        .limit(limit)
+        .offset(offset)
+        .params(match=match)
+    )
+
+
+def search_kinds(requested: Sequence[str] | None) -> tuple[str, ...]:
+    return tuple(requested) if requested else SEARCH_KINDS
+
+
+__all__ = [
+    "SEARCH_KINDS",
+    "SEARCH_SOURCES",
+    "install_search",
+    "match_expression",
+    "rebuild_search",
+    "search_kinds",
+    "search_statement",
+]
@@ -1,47 +1,148 @@
 from __future__ import annotations
 
 import logging
+import random
+import threading
+import time
 from contextlib import contextmanager
 from pathlib import Path
-from typing import Iterator
+from typing import Any, Callable, Iterator, Optional, TypeVar
 from urllib.parse import urlparse
 
-from sqlalchemy import create_engine
+import orjson
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import Session, sessionmaker
 
-from app.config import get_settings
+from app.config import Settings, get_settings
+from app.db.changes import get_change_tracker, install_change_tracking
+from app.db.metrics import install_query_metrics
+from app.db.slow_queries import install_slow_query_log
 
 logger = logging.getLogger(__name__)
 
-_engine = None
+T = TypeVar("T")
+
+_engine: Optional[Engine] = None
+_read_engine: Optional[Engine] = None
 _SessionLocal: sessionmaker[Session] | None = None
+_ReadSessionLocal: sessionmaker[Session] | None = None
+_engine_lock = threading.Lock()
+
+
+def _json_serializer(value: Any) -> str:
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+
+
+# JSON columns are encoded and decoded with orjson on every engine.
+JSON_ENGINE_OPTIONS: dict[str, Any] = {"json_serializer": _json_serializer, "json_deserializer": orjson.loads}
+
+
+def is_sqlite_url(url: str) -> bool:
+    # Handle variations like 'sqlite', 'sqlite3', 'sqlite+pysqlite', etc.
+    return urlparse(url).scheme.lower().startswith("sqlite")
+
+
+def sqlite_pragmas(settings: Settings, *, read_only: bool = False) -> list[str]:
+    """Return the PRAGMA statements applied to every new SQLite connection."""
+
+    pragmas = [
+        f"PRAGMA busy_timeout={settings.sqlite_busy_timeout_ms}",
+        f"PRAGMA synchronous={settings.sqlite_synchronous}",
+        f"PRAGMA cache_size={-settings.sqlite_cache_size_kib}",
+        f"PRAGMA mmap_size={settings.sqlite_mmap_size}",
+        f"PRAGMA temp_store={settings.sqlite_temp_store}",
+    ]
+    if read_only:
+        # The journal mode is stored in the database file, so readers inherit
+        # it from the writer instead of racing it for a write lock.
+        pragmas.append("PRAGMA query_only=ON")
+    else:
+        pragmas.insert(0, f"PRAGMA journal_mode={settings.sqlite_journal_mode}")
+        # Only takes effect on a new, empty database; ``agent-spark compact``
+        # converts existing ones. Retention archiving then frees pages
+        # incrementally instead of leaving the file at its high-water mark.
+        pragmas.insert(0, "PRAGMA auto_vacuum=INCREMENTAL")
+    return pragmas
+
+
+def install_sqlite_pragmas(engine: Engine, pragmas: list[str]) -> None:
+    @event.listens_for(engine, "connect")
+    def _apply_pragmas(dbapi_connection: Any, _connection_record: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+
+def install_instrumentation(settings: Settings, writer: Engine, reader: Engine, prefix: str = "") -> None:
+    """Attach query metrics and the slow-query log to a writer/reader engine pair."""
+
+    engines = {f"{prefix}writer": writer}
+    if reader is not writer:
+        engines[f"{prefix}reader"] = reader
+    for role, engine in engines.items():
+        if settings.metrics_enabled:
+            install_query_metrics(engine, role)
+        if settings.slow_query_ms > 0:
+            install_slow_query_log(engine, role, settings.slow_query_ms, explain=settings.slow_query_explain)
 
 
 def _ensure_engine():
-    global _engine, _SessionLocal
-    if _engine is None:
-        settings = get_settings()
-        db_path = Path(settings.db_path)
-        db_path.parent.mkdir(parents=True, exist_ok=True)
-        # Note: SQLite doesn't use connection pooling, but we configure it
-        # for potential future migration to a client-server database
-        engine_kwargs = {
-            "connect_args": {"check_same_thread": False},
-            "future": True,
-        }
-        # Only add pooling config if not using SQLite (check scheme robustly)
-        # Handle variations like 'sqlite', 'sqlite3', 'sqlite:///', etc.
-        db_scheme = urlparse(settings.database_url).scheme.lower()
-        if not db_scheme.startswith("sqlite"):
-            engine_kwargs.update({
-                "pool_size": 10,
-                "max_overflow": 20,
-                "pool_pre_ping": True,
-                "pool_recycle": 3600,
-            })
-        _engine = create_engine(settings.database_url, **engine_kwargs)
-        _SessionLocal = sessionmaker(bind=_engine, autoflush=False, autocommit=False, future=True)
-        logger.debug("Database engine initialised at %s", db_path)
+    global _engine, _read_engine, _SessionLocal, _ReadSessionLocal
+    if _ReadSessionLocal is not None:
+        return
+    # Requests on several threads may be the first to need the engines.
+    with _engine_lock:
+        if _ReadSessionLocal is None:
+            settings = get_settings()
+            db_path = Path(settings.db_path)
+            db_path.parent.mkdir(parents=True, exist_ok=True)
+            if is_sqlite_url(settings.database_url):
+                connect_args = {"check_same_thread": False}
+                # SQLite allows a single writer at a time, so the writer engine
+                # holds exactly one connection and callers queue on the pool
+                # instead of on the database lock. Reads go through a separate
+                # pool of query-only connections that WAL lets run concurrently.
+                _engine = create_engine(
+                    settings.database_url,
+                    connect_args=connect_args,
+                    pool_size=1,
+                    max_overflow=0,
+                    future=True,
+                    **JSON_ENGINE_OPTIONS,
+                )
+                _read_engine = create_engine(
+                    settings.database_url,
+                    connect_args=connect_args,
+                    pool_size=settings.db_read_pool_size,
+                    max_overflow=0,
+                    future=True,
+                    **JSON_ENGINE_OPTIONS,
+                )
+                install_sqlite_pragmas(_engine, sqlite_pragmas(settings))
+                install_sqlite_pragmas(_read_engine, sqlite_pragmas(settings, read_only=True))
+            else:
+                _engine = create_engine(
+                    settings.database_url,
+                    pool_size=10,
+                    max_overflow=20,
+                    pool_pre_ping=True,
+                    pool_recycle=3600,
+                    future=True,
+                    **JSON_ENGINE_OPTIONS,
+                )
+                _read_engine = _engine
+            install_change_tracking(_engine)
+            if is_sqlite_url(settings.database_url):
+                get_change_tracker().share(db_path, settings.change_epoch)
+            install_instrumentation(settings, _engine, _read_engine)
+            _SessionLocal = sessionmaker(bind=_engine, autoflush=False, autocommit=False, future=True)
+            _ReadSessionLocal = sessionmaker(bind=_read_engine, autoflush=False, autocommit=False, future=True)
+            logger.debug("Database engine initialised at %s", db_path)
 
 
 def get_engine():
@@ -50,14 +151,69 @@ def get_engine():
     return _engine
 
 
+def get_read_engine():
+    _ensure_engine()
+    assert _read_engine is not None
+    return _read_engine
+
+
 def get_sessionmaker() -> sessionmaker[Session]:
     _ensure_engine()
     assert _SessionLocal is not None
     return _SessionLocal
 
 
+def get_read_sessionmaker() -> sessionmaker[Session]:
+    _ensure_engine()
+    assert _ReadSessionLocal is not None
+    return _ReadSessionLocal
+
+
+def is_busy_error(exc: BaseException) -> bool:
+    if not isinstance(exc, OperationalError):
+        return False
+    message = str(exc.orig).lower()
+    return "database is locked" in message or "database is busy" in message
+
+
+def busy_retry_delay(settings: Settings, attempt: int) -> float:
+    """Full-jitter exponential backoff, in seconds, before retry number ``attempt + 1``."""
+
+    return random.uniform(0, settings.db_busy_retry_base_ms * (2**attempt)) / 1000
+
+
+def with_busy_retry(operation: Callable[[], T], *, on_retry: Callable[[], None] | None = None) -> T:
+    """Run ``operation``, retrying with full-jitter backoff while SQLite reports SQLITE_BUSY.
+
+    ``busy_timeout`` already makes SQLite wait for the lock, but some conflicts
+    (e.g. a read transaction upgrading to a write) fail immediately; those are
+    retried here. ``on_retry`` runs before each new attempt to reset state.
+    """
+
+    settings = get_settings()
+    for attempt in range(settings.db_busy_retries + 1):
+        try:
+            return operation()
+        except OperationalError as exc:
+            if attempt >= settings.db_busy_retries or not is_busy_error(exc):
+                raise
+            delay = busy_retry_delay(settings, attempt)
+            logger.warning("Database busy; retrying in %.3fs (attempt %s)", delay, attempt + 1)
+            if on_retry is not None:
+                on_retry()
+            time.sleep(delay)
+    raise AssertionError("unreachable")
+
+
 @contextmanager
 def session_scope() -> Iterator[Session]:
+    """Commit on success and roll back on error, SQLITE_BUSY included.
+
+    The body cannot be replayed from here, so a busy commit is not retried;
+    callers that need retries wrap their whole unit of work in
+    :func:`with_busy_retry` with ``on_retry=session.rollback``.
+    """
+
     SessionLocal = get_sessionmaker()
     session = SessionLocal()
     try:
@@ -71,11 +227,31 @@ def session_scope() -> Iterator[Session]:
 
 
 def reset_engine() -> None:
-    global _engine, _SessionLocal
+    global _engine, _read_engine, _SessionLocal, _ReadSessionLocal
+    if _read_engine is not None and _read_engine is not _engine:
+        _read_engine.dispose()
     if _engine is not None:
         _engine.dispose()
     _engine = None
+    _read_engine = None
     _SessionLocal = None
+    _ReadSessionLocal = None
+    get_change_tracker().unshare()
 
 
-__all__ = ["get_engine", "get_sessionmaker", "session_scope", "reset_engine"]
+__all__ = [
+    "JSON_ENGINE_OPTIONS",
+    "busy_retry_delay",
+    "get_engine",
+    "get_read_engine",
+    "get_read_sessionmaker",
+    "get_sessionmaker",
+    "install_instrumentation",
+    "install_sqlite_pragmas",
+    "is_busy_error",
+    "is_sqlite_url",
+    "reset_engine",
+    "session_scope",
+    "sqlite_pragmas",
+    "with_busy_retry",
+]
@@ -0,0 +1,143 @@
+"""Log statements slower than ``slow_query_ms`` with their plan and originating route.
+
+Each slow statement is logged once it finishes, with its bound parameters
+(truncated), the route of the request that issued it (see
+:mod:`app.utils.request_context`) and SQLite's ``EXPLAIN QUERY PLAN``. The
+plan is taken on a separate read-only connection, so it never waits behind or
+disturbs the transaction that ran the statement, and is cached per SQL string
+so a statement that is slow on every request is explained once.
+
+Only slow statements pay for the logging; the rest cost two ``perf_counter``
+calls.
+"""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.db.metrics import statement_kind
+from app.utils.metrics import REGISTRY
+from app.utils.request_context import current_route
+
+logger = logging.getLogger(__name__)
+
+_STARTED = "_slow_query_started"
+_EXPLAINABLE = frozenset({"SELECT", "INSERT", "UPDATE", "DELETE", "WITH"})
+
+SLOW_QUERIES = REGISTRY.counter(
+    "agent_spark_db_slow_queries_total",
+    "Statements slower than the slow-query threshold, by engine and statement verb.",
+    ("engine", "statement"),
+)
+
+
+def format_parameters(parameters: Any, executemany: bool, limit: int = 500) -> str:
+    if executemany and isinstance(parameters, (list, tuple)) and parameters:
+        text = f"{parameters[0]!r} (+{len(parameters) - 1} more sets)"
+    else:
+        text = repr(parameters)
+    return text if len(text) <= limit else text[:limit] + "..."
+
+
+class SlowQueryLog:
+    def __init__(
+        self, role: str, threshold_ms: float, db_path: Optional[Path], *, explain: bool = True, plan_cache_size: int = 256
+    ) -> None:
+        self.role = role
+        self.threshold = threshold_ms / 1000
+        self.db_path = db_path
+        self.explain_plans = explain and db_path is not None
+        self._plans: OrderedDict[str, list[str]] = OrderedDict()
+        self._plan_cache_size = plan_cache_size
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+
+    def _side_connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            assert self.db_path is not None
+            uri = self.db_path.resolve().as_uri() + "?mode=ro"
+            self._connection = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        return self._connection
+
+    def explain(self, statement: str, parameters: Any) -> list[str]:
+        """``EXPLAIN QUERY PLAN`` detail lines for ``statement``, from the cache when possible."""
+
+        with self._lock:
+            plan = self._plans.get(statement)
+            if plan is not None:
+                self._plans.move_to_end(statement)
+                return plan
+            try:
+                rows = self._side_connection().execute(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+                plan = [row[-1] for row in rows]
+            except sqlite3.Error as exc:
+                return [f"(plan unavailable: {exc})"]
+            self._plans[statement] = plan
+            if len(self._plans) > self._plan_cache_size:
+                self._plans.popitem(last=False)
+            return plan
+
+    def record(self, statement: str, parameters: Any, executemany: bool, elapsed: float) -> None:
+        kind = statement_kind(statement)
+        SLOW_QUERIES.inc(self.role, kind)
+        plan: list[str] = []
+        if self.explain_plans and kind in _EXPLAINABLE:
+            first = parameters[0] if executemany and parameters else parameters
+            plan = self.explain(statement, first if first is not None else ())
+        logger.warning(
+            "Slow query: %.1f ms on %s engine, route %s\n  %s\n  parameters: %s%s",
+            elapsed * 1000,
+            self.role,
+            current_route() or "(none)",
+            " ".join(statement.split()),
+            format_parameters(parameters, executemany),
+            "".join(f"\n  plan: {line}" for line in plan),
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+            self._plans.clear()
+
+
+def install_slow_query_log(engine: Engine, role: str, threshold_ms: float, *, explain: bool = True) -> SlowQueryLog:
+    database = engine.url.database if engine.dialect.name == "sqlite" else None
+    db_path = Path(database) if database and database != ":memory:" else None
+    log = SlowQueryLog(role, threshold_ms, db_path, explain=explain)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+        if context is not None:
+            setattr(context, _STARTED, time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+        started = getattr(context, _STARTED, None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        if elapsed >= log.threshold:
+            try:
+                log.record(statement, parameters, executemany, elapsed)
+            except Exception:  # noqa: BLE001 - logging must never fail the query
+                logger.exception("Could not log slow query")
+
+    @event.listens_for(engine, "engine_disposed")
+    def _disposed(_engine: Engine) -> None:
+        log.close()
+
+    return log
+
+
+__all__ = ["SlowQueryLog", "format_parameters", "install_slow_query_log"]
@@ -0,0 +1,239 @@
+"""Vault posts stored one row per post in ``vault_posts``.
+
+Posts are keyed by ``(record_id, seq)`` with ``seq`` counting from 0 in
+append order, so appending is a single-row insert and a record's first N
+posts or its post count are read from the primary-key index without
+decoding the rest. Application code still builds vault rows with a
+``posts`` list; :func:`split_vault_rows` turns them into the two tables'
+rows right before they are written.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from datetime import datetime
+from typing import Any, Iterable, Mapping, Optional, Sequence
+
+from sqlalchemy import DateTime, Insert, String, func, insert, literal, select, type_coerce
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.db.async_session import async_with_busy_retry, async_write_related, get_async_sessionmaker
+from app.db.search import install_search
+from app.db.session import get_sessionmaker, with_busy_retry
+from app.db.writer import write_related
+from app.engine.events import get_event_bus
+from app.models.vault import VaultPost, VaultRecord
+from app.utils.clock import utc_now
+
+logger = logging.getLogger(__name__)
+
+# Search objects that indexed the old ``vault_records.posts`` column.
+_LEGACY_SEARCH_DDL = (
+    "DROP TRIGGER IF EXISTS vault_records_fts_ai",
+    "DROP TRIGGER IF EXISTS vault_records_fts_ad",
+    "DROP TRIGGER IF EXISTS vault_records_fts_au",
+    "DROP TABLE IF EXISTS vault_records_fts",
+)
+
+
+def post_list(value: Any) -> list[Any]:
+    """A record's posts for a ``posts`` value: a list as is, ``None`` as none, anything else as one post."""
+
+    if value is None:
+        return []
+    return list(value) if isinstance(value, (list, tuple)) else [value]
+
+
+def vault_post_rows(record_id: str, posts: Iterable[Any], created_at: datetime) -> list[dict[str, Any]]:
+    return [
+        {"record_id": record_id, "seq": seq, "content": content, "created_at": created_at}
+        for seq, content in enumerate(posts)
+    ]
+
+
+def split_vault_rows(rows: Iterable[Mapping[str, Any]]) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    """Split vault rows carrying a ``posts`` list into ``vault_records`` and ``vault_posts`` rows."""
+
+    records: list[dict[str, Any]] = []
+    posts: list[dict[str, Any]] = []
+    for row in rows:
+        record = dict(row)
+        posts.extend(vault_post_rows(record["id"], post_list(record.pop("posts", None)), record["created_at"]))
+        records.append(record)
+    return records, posts
+
+
+def write_vault_rows(rows: Sequence[Mapping[str, Any]]) -> int:
+    """Insert records and their posts in one transaction through the write coalescer."""
+
+    records, posts = split_vault_rows(rows)
+    write_related([(VaultRecord, records), (VaultPost, posts)])
+    return len(records)
+
+
+async def async_write_vault_rows(rows: Sequence[Mapping[str, Any]]) -> int:
+    records, posts = split_vault_rows(rows)
+    await async_write_related([(VaultRecord, records), (VaultPost, posts)])
+    return len(records)
+
+
+def append_statement(record_id: str, content: Any, created_at: datetime) -> Insert:
+    """Insert ``content`` as the record's next post; inserts nothing if the record does not exist.
+
+    The next ``seq`` is computed inside the statement from the primary-key
+    index, so the single writer connection never hands out one twice.
+    """
+
+    next_seq = (
+        select(func.coalesce(func.max(VaultPost.seq) + 1, 0))
+        .where(VaultPost.record_id == VaultRecord.id)
+        .scalar_subquery()
+    )
+    source = select(
+        VaultRecord.id,
+        next_seq,
+        literal(content, VaultPost.content.type),
+        literal(created_at, DateTime(timezone=True)),
+    ).where(VaultRecord.id == record_id)
+    return (
+        insert(VaultPost)
+        .from_select(["record_id", "seq", "content", "created_at"], source)
+        .returning(VaultPost.seq)
+    )
+
+
+def append_vault_post(record_id: str, content: Any) -> Optional[dict[str, Any]]:
+    """Append ``content`` to a record and publish it; ``None`` if the record does not exist."""
+
+    created_at = utc_now()
+    statement = append_statement(record_id, content, created_at)
+
+    def attempt() -> Optional[int]:
+        with get_sessionmaker()() as session:
+            seq = session.scalar(statement)
+            session.commit()
+            return seq
+
+    seq = with_busy_retry(attempt)
+    if seq is None:
+        return None
+    return _published({"record_id": record_id, "seq": seq, "content": content, "created_at": created_at})
+
+
+async def async_append_vault_post(record_id: str, content: Any) -> Optional[dict[str, Any]]:
+    created_at = utc_now()
+    statement = append_statement(record_id, content, created_at)
+
+    async def attempt() -> Optional[int]:
+        async with get_async_sessionmaker()() as session:
+            seq = await session.scalar(statement)
+            await session.commit()
+            return seq
+
+    seq = await async_with_busy_retry(attempt)
+    if seq is None:
+        return None
+    return _published({"record_id": record_id, "seq": seq, "content": content, "created_at": created_at})
+
+
+def _published(row: dict[str, Any]) -> dict[str, Any]:
+    get_event_bus().publish_rows(VaultPost.__tablename__, [row])
+    return row
+
+
+def posts_column(limit: Optional[int] = None) -> ColumnElement[str]:
+    """A record's posts as JSON array text in ``seq`` order, optionally only the first ``limit``.
+
+    The aggregate walks the primary-key index, which yields posts in ``seq``
+    order; ``seq`` is dense, so "first N" is ``seq < N``.
+    """
+
+    if limit == 0:
+        return type_coerce(literal("[]"), String).label("posts")
+    aggregate = select(func.json_group_array(func.json(VaultPost.content))).where(VaultPost.record_id == VaultRecord.id)
+    if limit is not None:
+        aggregate = aggregate.where(VaultPost.seq < limit)
+    return type_coerce(aggregate.scalar_subquery(), String).label("posts")
+
+
+def post_count_column() -> ColumnElement[int]:
+    return (
+        select(func.count())
+        .select_from(VaultPost)
+        .where(VaultPost.record_id == VaultRecord.id)
+        .scalar_subquery()
+        .label("post_count")
+    )
+
+
+def _irregular_posts(value: str) -> tuple[list[Any], bool]:
+    """Posts for a ``posts`` value that is not a JSON array; ``True`` when it was not JSON at all."""
+
+    try:
+        decoded = json.loads(value)  # the stdlib accepts the NaN/Infinity it used to write
+    except ValueError:
+        return [value], True
+    return post_list(decoded), False
+
+
+def explode_vault_posts(connection: Connection) -> None:
+    """Move every ``vault_records.posts`` array into ``vault_posts`` and drop the column.
+
+    Valid arrays are moved in SQL. Anything else is handled row by row so that
+    nothing is lost with the column: non-array JSON becomes a single post,
+    arrays SQLite cannot parse are decoded in Python, and text that is not
+    JSON at all is kept as one string post. Each such record is logged.
+    """
+
+    VaultPost.__table__.create(bind=connection, checkfirst=True)
+    columns = {row[1] for row in connection.exec_driver_sql('PRAGMA table_info("vault_records")')}
+    if "posts" in columns:
+        # Values are stored as JSON text; ``json_quote`` re-encodes scalars and
+        # strings, which ``json_each`` returns as plain SQL values.
+        connection.exec_driver_sql(
+            "INSERT OR IGNORE INTO vault_posts (record_id, seq, content, created_at) "
+            "SELECT r.id, j.key, CAST(json_quote(j.value) AS TEXT), r.created_at "
+            "FROM vault_records AS r, json_each(CASE WHEN json_valid(r.posts) "
+            "THEN CASE json_type(r.posts) WHEN 'array' THEN r.posts END END) AS j"
+        )
+        irregular = connection.exec_driver_sql(
+            "SELECT id, CAST(posts AS TEXT), created_at FROM vault_records WHERE posts IS NOT NULL "
+            "AND CASE WHEN json_valid(posts) THEN json_type(posts) NOT IN ('array', 'null') ELSE 1 END"
+        ).all()
+        unreadable = []
+        for record_id, value, created_at in irregular:
+            posts, raw = _irregular_posts(value)
+            if raw:
+                unreadable.append(record_id)
+            if posts:
+                stored = datetime.fromisoformat(created_at) if isinstance(created_at, str) else created_at
+                connection.execute(insert(VaultPost).prefix_with("OR IGNORE"), vault_post_rows(record_id, posts, stored))
+        if irregular:
+            logger.warning(
+                "Moved posts of %s vault records whose posts column was not a JSON array; "
+                "%s were not JSON and are kept as one text post each: %s",
+                len(irregular),
+                len(unreadable),
+                ", ".join(unreadable[:20]) + (" ..." if len(unreadable) > 20 else ""),
+            )
+        for statement in _LEGACY_SEARCH_DDL:
+            connection.exec_driver_sql(statement)
+        connection.exec_driver_sql('ALTER TABLE "vault_records" DROP COLUMN "posts"')
+    install_search(connection)
+
+
+__all__ = [
+    "append_statement",
+    "append_vault_post",
+    "async_append_vault_post",
+    "async_write_vault_rows",
+    "explode_vault_posts",
+    "post_count_column",
+    "post_list",
+    "posts_column",
+    "split_vault_rows",
+    "vault_post_rows",
+    "write_vault_rows",
+]
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import logging
+import threading
+from concurrent.futures import Future
+from graphlib import TopologicalSorter
+from typing import Any, Iterable, Mapping, Sequence
+
+from sqlalchemy import insert
+
+from app.config import get_settings
+from app.db.base import Base
+from app.db.session import get_sessionmaker, with_busy_retry
+from app.engine.events import get_event_bus
+from app.utils.batching import MicroBatcher
+
+logger = logging.getLogger(__name__)
+
+Rows = Sequence[Mapping[str, Any]]
+WriteRequest = tuple[type[Base], Rows]
+# Requests that must commit together, e.g. records and their child rows.
+WriteJob = tuple[WriteRequest, ...]
+
+
+def parents_first(models: Iterable[type[Base]]) -> list[type[Base]]:
+    """Order ``models`` so tables referenced by another's foreign keys come first.
+
+    Only the foreign keys' target names are read, so tables outside the batch
+    need not be imported (``Base.metadata.sorted_tables`` resolves them all).
+    """
+
+    by_name = {model.__table__.name: model for model in models}
+    graph = {
+        name: {key.target_fullname.partition(".")[0] for key in model.__table__.foreign_keys} & (by_name.keys() - {name})
+        for name, model in by_name.items()
+    }
+    return [by_name[name] for name in TopologicalSorter(graph).static_order()]
+
+
+def _insert_requests(requests: Sequence[WriteRequest]) -> None:
+    """Insert every request's rows in one transaction, one executemany per table, parents first."""
+
+    grouped: dict[type[Base], list[Mapping[str, Any]]] = {}
+    for model, rows in requests:
+        if rows:
+            grouped.setdefault(model, []).extend(rows)
+
+    def attempt() -> None:
+        with get_sessionmaker()() as session:
+            for model in parents_first(grouped):
+                session.execute(insert(model), grouped[model])
+            session.commit()
+
+    with_busy_retry(attempt)
+
+
+def _job_rows(job: WriteJob) -> int:
+    return sum(len(rows) for _, rows in job)
+
+
+def _commit_batch(jobs: list[WriteJob]) -> list[int | BaseException]:
+    try:
+        _insert_requests([request for job in jobs for request in job])
+        return [_job_rows(job) for job in jobs]
+    except Exception:  # noqa: BLE001
+        if len(jobs) == 1:
+            raise
+        logger.warning("Group commit of %s writes failed; retrying them individually", len(jobs))
+
+    results: list[int | BaseException] = []
+    for job in jobs:
+        try:
+            _insert_requests(job)
+            results.append(_job_rows(job))
+        except Exception as exc:  # noqa: BLE001
+            results.append(exc)
+    return results
+
+
+class WriteCoalescer:
+    """Group-commit inserts from concurrent requests into shared transactions.
+
+    Callers pass fully populated rows (primary keys and timestamps generated
+    client-side), so nothing has to be read back after the commit. Concurrent
+    submissions are gathered for a short window and written with one
+    ``executemany`` per table and a single commit; if that transaction fails
+    the batch is replayed one request at a time so each caller only sees its
+    own error.
+    """
+
+    def __init__(self, *, enabled: bool, max_batch_size: int, window_ms: float) -> None:
+        self.enabled = enabled
+        self._batcher: MicroBatcher[WriteJob, int] = MicroBatcher(
+            _commit_batch, name="write-coalescer", max_batch_size=max_batch_size, window_ms=window_ms
+        )
+
+    def submit(self, model: type[Base], rows: Rows) -> Future[int]:
+        """Queue ``rows`` for insertion into ``model``'s table; resolves to the row count."""
+
+        return self.submit_related([(model, rows)])
+
+    def submit_related(self, requests: Sequence[WriteRequest]) -> Future[int]:
+        """Queue inserts into several tables that must land in the same transaction."""
+
+        job = tuple(requests)
+        if self.enabled:
+            return self._batcher.submit(job)
+        future: Future[int] = Future()
+        try:
+            _insert_requests(job)
+            future.set_result(_job_rows(job))
+        except Exception as exc:  # noqa: BLE001
+            future.set_exception(exc)
+        return future
+
+    def stats(self) -> dict[str, Any]:
+        return {"enabled": self.enabled, **self._batcher.stats()}
+
+    def close(self) -> None:
+        self._batcher.close()
+
+
+_coalescer: WriteCoalescer | None = None
+_coalescer_lock = threading.Lock()
+
+
+def get_write_coalescer() -> WriteCoalescer:
+    global _coalescer
+    if _coalescer is None:
+        with _coalescer_lock:
+            if _coalescer is None:
+                settings = get_settings()
+                _coalescer = WriteCoalescer(
+                    enabled=settings.write_coalescer_enabled,
+                    max_batch_size=settings.write_batch_max_size,
+                    window_ms=settings.write_batch_window_ms,
+                )
+    return _coalescer
+
+
+def write_rows(model: type[Base], rows: Rows) -> int:
+    """Insert ``rows`` through the coalescer, block until they are committed and publish them."""
+
+    return write_related([(model, rows)])
+
+
+def write_related(requests: Sequence[WriteRequest]) -> int:
+    """Insert rows for several tables atomically, block until committed and publish them."""
+
+    count = get_write_coalescer().submit_related(requests).result()
+    bus = get_event_bus()
+    for model, rows in requests:
+        bus.publish_rows(model.__tablename__, rows)
+    return count
+
+
+def shutdown_write_coalescer() -> None:
+    global _coalescer
+    if _coalescer is not None:
+        _coalescer.close()
+        _coalescer = None
+
+
+__all__ = [
+    "WriteCoalescer",
+    "get_write_coalescer",
+    "parents_first",
+    "shutdown_write_coalescer",
+    "write_related",
+    "write_rows",
+]
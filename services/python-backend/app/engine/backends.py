@@ -0,0 +1,86 @@
+"""Registry of generator backends.
+
+A backend is a module-level callable that takes a list of
+:class:`~app.engine.generator.GenerateRequest` and returns one post payload
+per request, in order. Backends are registered by import path
+(``"package.module:callable"``) rather than by object so that worker
+processes can resolve them without inheriting the parent's state; extra
+backends can also be configured with ``AGENT_SPARK_GENERATOR_BACKENDS``.
+"""
+
+from __future__ import annotations
+
+import importlib
+import threading
+from functools import lru_cache
+from typing import Any, Callable, Sequence
+
+from app.config import get_settings
+from app.engine.generator import GenerateRequest
+
+BatchBackend = Callable[[Sequence[GenerateRequest]], Sequence[dict[str, Any]]]
+
+BUILTIN_BACKENDS: dict[str, str] = {"threadlight": "app.engine.generator:threadlight_batch"}
+
+
+class GeneratorError(RuntimeError):
+    """A backend failed, returned malformed output or could not be reached."""
+
+
+class UnknownBackendError(GeneratorError, KeyError):
+    pass
+
+
+_registered: dict[str, str] = {}
+_registry_lock = threading.Lock()
+
+
+def register_backend(name: str, target: str) -> None:
+    """Make the callable at ``target`` (``"module:callable"``) available as ``name``."""
+
+    module, _, attribute = target.partition(":")
+    if not module or not attribute:
+        raise ValueError(f"Backend target must look like 'module:callable', got {target!r}")
+    with _registry_lock:
+        _registered[name] = target
+
+
+def backend_targets() -> dict[str, str]:
+    with _registry_lock:
+        registered = dict(_registered)
+    return {**BUILTIN_BACKENDS, **get_settings().generator_backends, **registered}
+
+
+def backend_target(name: str) -> str:
+    try:
+        return backend_targets()[name]
+    except KeyError:
+        raise UnknownBackendError(name) from None
+
+
+@lru_cache()
+def load_backend(target: str) -> BatchBackend:
+    module, _, attribute = target.partition(":")
+    return getattr(importlib.import_module(module), attribute)
+
+
+def run_backend(target: str, requests: Sequence[GenerateRequest]) -> list[dict[str, Any]]:
+    """Call the backend at ``target``; runs in pool workers as well as in-process."""
+
+    results = list(load_backend(target)(requests))
+    if len(results) != len(requests):
+        raise GeneratorError(f"{target} returned {len(results)} results for {len(requests)} requests")
+    return results
+
+
+__all__ = [
+    "BUILTIN_BACKENDS",
+    "BatchBackend",
+    "GeneratorError",
+    "UnknownBackendError",
+    "backend_target",
+    "backend_targets",
+    "load_backend",
+    "register_backend",
+    "run_backend",
+]
@@ -0,0 +1,311 @@
+"""In-process pub/sub bus for the live ``/events`` and ``/ws`` feeds.
+
+Publishers may run on any thread (sync routes run in the threadpool, the
+scheduler on its own thread); each subscriber belongs to an event loop and
+receives events through a bounded ``asyncio.Queue`` fed with
+``call_soon_threadsafe``. A subscriber that falls behind has its queue
+replaced by a single ``resync`` event telling the client to refetch, so one
+slow consumer costs bounded memory and never blocks publishers.
+
+Recent events are kept in a replay buffer so reconnecting clients can resume
+from ``Last-Event-ID``. Event ids carry a per-process epoch; ids from another
+process or from before a restart trigger a ``resync`` instead.
+
+Under ``runserver --workers`` each worker has its own bus, so :meth:`EventBus.share`
+starts an :class:`EventRelay`: events published locally are appended to the
+``shared_events`` table, and rows from other workers are re-published on this
+bus when SQLite's ``PRAGMA data_version`` says another connection committed.
+Clients of every worker see every event, including those of scheduled jobs
+on the leader, within one relay interval. A relay that falls behind the
+pruned rows sends ``resync``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import secrets
+import sqlite3
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterable, Mapping, Optional
+
+import orjson
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+RESYNC = "resync"
+# Rows kept in ``shared_events``; a relay further behind than this resyncs.
+RELAY_KEEP = 4096
+
+# Table name -> event type prefix for rows inserted through the write paths.
+TABLE_EVENTS: dict[str, str] = {
+    "agents": "agent",
+    "posts": "post",
+    "ritual_logs": "ritual",
+    "vault_records": "vault",
+    "vault_posts": "vault_post",
+}
+
+
+@dataclass(frozen=True)
+class Event:
+    id: str
+    type: str
+    data: Any = None
+
+    def json(self) -> bytes:
+        message: dict[str, Any] = {"id": self.id, "type": self.type}
+        if self.data is not None:
+            message["data"] = self.data
+        return orjson.dumps(message)
+
+    def sse(self) -> bytes:
+        return b"id: %s\nevent: %s\ndata: %s\n\n" % (self.id.encode(), self.type.encode(), self.json())
+
+
+@dataclass(eq=False)
+class Subscription:
+    loop: asyncio.AbstractEventLoop
+    queue: asyncio.Queue[Event]
+    resyncs: int = field(default=0)
+
+    def offer(self, event: Event) -> None:
+        """Queue ``event``; runs on the subscriber's loop."""
+
+        if self.queue.full():
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.resyncs += 1
+            event = Event(event.id, RESYNC)
+        self.queue.put_nowait(event)
+
+    async def get(self) -> Event:
+        return await self.queue.get()
+
+
+class EventBus:
+    def __init__(self, queue_size: int = 256, replay_size: int = 1024) -> None:
+        self.epoch = secrets.token_hex(4)
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._sequence = 0
+        self._replay: deque[Event] = deque(maxlen=replay_size)
+        self._subscribers: set[Subscription] = set()
+        self._published = 0
+        self._relay: Optional[EventRelay] = None
+
+    def _next_id(self) -> str:
+        self._sequence += 1
+        return f"{self.epoch}-{self._sequence}"
+
+    def share(self, db_path: Path, interval: float, busy_timeout: float = 5.0) -> None:
+        """Relay events with the other processes using ``db_path`` from now on."""
+
+        with self._lock:
+            if self._relay is not None:
+                return
+            self._relay = EventRelay(self, db_path, interval, busy_timeout)
+        self._relay.start()
+
+    def unshare(self) -> None:
+        with self._lock:
+            relay, self._relay = self._relay, None
+        if relay is not None:
+            relay.stop()
+
+    def publish(self, event_type: str, data: Any = None, *, relay: bool = True) -> Event:
+        """Deliver an event to this bus's subscribers and, if shared, to the other processes."""
+
+        with self._lock:
+            event = Event(self._next_id(), event_type, data)
+            self._replay.append(event)
+            self._published += 1
+            subscribers = list(self._subscribers)
+            relaying = self._relay if relay else None
+        if relaying is not None:
+            relaying.send(event)
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, event)
+            except RuntimeError:
+                # The subscriber's loop has closed; it is removed on unsubscribe.
+                pass
+        return event
+
+    def publish_rows(self, table: str, rows: Iterable[Mapping[str, Any]]) -> None:
+        prefix = TABLE_EVENTS.get(table)
+        if prefix is None:
+            return
+        for row in rows:
+            self.publish(f"{prefix}.created", dict(row))
+
+    def _sequence_of(self, event_id: str) -> Optional[int]:
+        epoch, _, sequence = event_id.partition("-")
+        if epoch != self.epoch or not sequence.isdigit():
+            return None
+        return int(sequence)
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> Subscription:
+        """Register a subscriber on the running loop, replaying events after ``last_event_id``."""
+
+        subscription = Subscription(asyncio.get_running_loop(), asyncio.Queue(self.queue_size))
+        with self._lock:
+            self._subscribers.add(subscription)
+            if last_event_id:
+                after = self._sequence_of(last_event_id)
+                oldest = self._sequence - len(self._replay) + 1
+                if after is None or after > self._sequence or after < oldest - 1:
+                    # Unknown id, or events after it have left the replay buffer.
+                    subscription.offer(Event(f"{self.epoch}-{self._sequence}", RESYNC))
+                else:
+                    for event in list(self._replay)[after - oldest + 1 :]:
+                        subscription.offer(event)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "subscribers": len(self._subscribers),
+                "published": self._published,
+                "replay": len(self._replay),
+                "resyncs": sum(subscription.resyncs for subscription in self._subscribers),
+                "relayed": self._relay.relayed if self._relay is not None else None,
+            }
+
+
+class EventRelay:
+    """Copy events between the buses of processes sharing one SQLite database.
+
+    One thread per process owns a plain ``sqlite3`` connection (outside the
+    engines, so relay rows bump no change versions). Every ``interval`` it
+    appends the events published here since the last pass in one transaction,
+    prunes all but the newest :data:`RELAY_KEEP` rows, and, when
+    ``data_version`` moved, publishes rows other processes added.
+    """
+
+    def __init__(self, bus: EventBus, db_path: Path, interval: float, busy_timeout: float = 5.0) -> None:
+        self.bus = bus
+        self.db_path = db_path
+        self.interval = interval
+        self.busy_timeout = busy_timeout
+        self.relayed = 0
+        self._outbox: list[Event] = []
+        self._outbox_lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._data_version: Optional[int] = None
+        self._last_id: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def send(self, event: Event) -> None:
+        with self._outbox_lock:
+            self._outbox.append(event)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.db_path, timeout=self.busy_timeout, check_same_thread=False)
+            if self._last_id is None:
+                # Start from now: earlier events were for clients of earlier processes.
+                self._last_id = self._connection.execute("SELECT COALESCE(MAX(id), 0) FROM shared_events").fetchone()[0]
+        return self._connection
+
+    def _flush(self, connection: sqlite3.Connection) -> None:
+        with self._outbox_lock:
+            events, self._outbox = self._outbox, []
+        if not events:
+            return
+        now = time.time()
+        rows = [
+            (self.bus.epoch, event.type, None if event.data is None else orjson.dumps(event.data).decode(), now)
+            for event in events
+        ]
+        try:
+            with connection:
+                connection.executemany(
+                    "INSERT INTO shared_events (origin, type, data, created_at) VALUES (?, ?, ?, ?)", rows
+                )
+                connection.execute(
+                    "DELETE FROM shared_events WHERE id <= (SELECT MAX(id) FROM shared_events) - ?", (RELAY_KEEP,)
+                )
+        except sqlite3.Error:
+            with self._outbox_lock:
+                self._outbox[:0] = events
+            raise
+
+    def _poll(self, connection: sqlite3.Connection) -> None:
+        data_version = connection.execute("PRAGMA data_version").fetchone()[0]
+        if data_version == self._data_version:
+            return
+        self._data_version = data_version
+        assert self._last_id is not None
+        oldest = connection.execute("SELECT MIN(id) FROM shared_events").fetchone()[0]
+        rows = connection.execute(
+            "SELECT id, origin, type, data FROM shared_events WHERE id > ? ORDER BY id", (self._last_id,)
+        ).fetchall()
+        if oldest is not None and oldest > self._last_id + 1:
+            # Rows this process never read have been pruned.
+            self.bus.publish(RESYNC, relay=False)
+        for row_id, origin, event_type, data in rows:
+            self._last_id = row_id
+            if origin != self.bus.epoch:
+                self.bus.publish(event_type, None if data is None else orjson.loads(data), relay=False)
+                self.relayed += 1
+
+    def tick(self) -> None:
+        """Write pending local events and publish new ones from other processes."""
+
+        try:
+            connection = self._connect()
+            self._flush(connection)
+            self._poll(connection)
+        except sqlite3.Error:
+            logger.exception("Could not relay events through %s", self.db_path)
+            self._close()
+
+    def _close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+        self._connection = None
+        self._data_version = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.tick()
+        self.tick()
+        self._close()
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="event-relay", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.busy_timeout + self.interval + 1)
+
+
+_bus: EventBus | None = None
+_bus_lock = threading.Lock()
+
+
+def get_event_bus() -> EventBus:
+    global _bus
+    if _bus is None:
+        with _bus_lock:
+            if _bus is None:
+                settings = get_settings()
+                _bus = EventBus(settings.events_queue_size, settings.events_replay_size)
+    return _bus
+
+
+__all__ = ["Event", "EventBus", "EventRelay", "RELAY_KEEP", "RESYNC", "Subscription", "TABLE_EVENTS", "get_event_bus"]
@@ -2,7 +2,12 @@ from __future__ import annotations
 
 import random
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, NamedTuple, Optional, Sequence
+
+
+class GenerateRequest(NamedTuple):
+    theme: str
+    prompt: Optional[str] = None
 
 
 def render_threadlight(theme: str, prompt: str | None = None) -> dict[str, Any]:
@@ -17,4 +22,8 @@ def render_threadlight(theme: str, prompt: str | None = None) -> dict[str, Any]:
     }
 
 
-__all__ = ["render_threadlight"]
+def threadlight_batch(requests: Sequence[GenerateRequest]) -> list[dict[str, Any]]:
+    return [render_threadlight(request.theme, prompt=request.prompt) for request in requests]
+
+
+__all__ = ["GenerateRequest", "render_threadlight", "threadlight_batch"]
@@ -1,49 +1,159 @@
+"""Background jobs, run by exactly one process.
+
+Every process calls :func:`get_scheduler`, but jobs only run in the process
+holding the scheduler :class:`~app.utils.locking.LeaderLease`; the others
+stand by and take over within one heartbeat if the leader exits. Jobs live in
+a SQLAlchemy job store in the application database, so a new leader resumes
+the existing schedule, and runs missed while no leader was up are coalesced
+into one.
+"""
+
 from __future__ import annotations
 
 import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any
+from uuid import uuid4
 
+from apscheduler.events import (
+    EVENT_JOB_ERROR,
+    EVENT_JOB_EXECUTED,
+    EVENT_JOB_MISSED,
+    EVENT_JOB_SUBMITTED,
+    JobEvent,
+    JobExecutionEvent,
+    JobSubmissionEvent,
+)
+from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
 from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.schedulers.base import SchedulerNotRunningError
+from apscheduler.schedulers.base import STATE_STOPPED, SchedulerNotRunningError
 
 from app.config import get_settings
-from app.db.session import session_scope
-from app.engine.generator import render_threadlight
-from app.models.vault import VaultRecord
+from app.db.vault_posts import write_vault_rows
+from app.engine.generator import GenerateRequest
+from app.engine.workers import get_generator_engine
+from app.utils.clock import utc_now
+from app.utils.locking import LeaderLease
+from app.utils.metrics import REGISTRY
 
 logger = logging.getLogger(__name__)
 
 _scheduler: BackgroundScheduler | None = None
+_lease: LeaderLease | None = None
+
+JOB_SECONDS = REGISTRY.histogram(
+    "agent_spark_scheduler_job_duration_seconds",
+    "Run time of scheduled jobs, from submission to the executor until they return.",
+    ("job",),
+    (0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0),
+)
+JOB_RUNS = REGISTRY.counter(
+    "agent_spark_scheduler_job_runs_total", "Scheduled job runs by outcome (ok, error, missed).", ("job", "outcome")
+)
+_job_started: dict[tuple[str, datetime], float] = {}
+_job_started_lock = threading.Lock()
+
+
+def _record_job_event(event: JobEvent) -> None:
+    if isinstance(event, JobSubmissionEvent):
+        now = time.perf_counter()
+        with _job_started_lock:
+            for run_time in event.scheduled_run_times:
+                _job_started[(event.job_id, run_time)] = now
+        return
+    if event.code == EVENT_JOB_MISSED:
+        JOB_RUNS.inc(event.job_id, "missed")
+        return
+    if isinstance(event, JobExecutionEvent):
+        with _job_started_lock:
+            started = _job_started.pop((event.job_id, event.scheduled_run_time), None)
+        if started is not None:
+            JOB_SECONDS.observe(time.perf_counter() - started, event.job_id)
+        JOB_RUNS.inc(event.job_id, "error" if event.exception is not None else "ok")
 
 
 def _scheduled_generate() -> None:
-    with session_scope() as session:
-        payload = render_threadlight("scheduled")
-        record = VaultRecord(theme=payload["theme"], posts=[payload])
-        session.add(record)
-        logger.info("Scheduled generator stored record %s", record.id)
+    # Through the batcher, so the call counts against the pool's capacity like any other.
+    [payload] = get_generator_engine().submit(get_settings().generator_backend, [GenerateRequest("scheduled")]).result()
+    row = {"id": str(uuid4()), "theme": payload["theme"], "posts": [payload], "created_at": utc_now()}
+    # ``write_vault_rows`` commits through the write coalescer and publishes the new record.
+    write_vault_rows([row])
+    logger.info("Scheduled generator stored record %s", row["id"])
+
+
+def _start_jobs() -> None:
+    assert _scheduler is not None
+    _scheduler.add_job(
+        f"{__name__}:_scheduled_generate", "interval", minutes=15, id="threadlight", replace_existing=True
+    )
+    _scheduler.add_job(
+        "app.db.retention:run_retention",
+        "interval",
+        minutes=get_settings().retention_interval_minutes,
+        id="retention",
+        replace_existing=True,
+    )
+    _scheduler.start()
+    logger.info("Background scheduler started")
+
+
+def _stop_jobs() -> None:
+    if _scheduler is not None and _scheduler.state != STATE_STOPPED:
+        try:
+            _scheduler.shutdown(wait=False)
+        except SchedulerNotRunningError:
+            pass
+        logger.info("Background scheduler stopped")
 
 
 def get_scheduler() -> BackgroundScheduler:
-    global _scheduler
+    global _scheduler, _lease
     if _scheduler is None:
         settings = get_settings()
-        _scheduler = BackgroundScheduler(timezone="UTC")
-        _scheduler.add_job(_scheduled_generate, "interval", minutes=15, id="threadlight")
+        _scheduler = BackgroundScheduler(
+            jobstores={"default": SQLAlchemyJobStore(url=settings.database_url)},
+            job_defaults={"coalesce": True, "max_instances": 1, "misfire_grace_time": settings.scheduler_misfire_grace_seconds},
+            timezone="UTC",
+        )
+        if settings.metrics_enabled:
+            _scheduler.add_listener(
+                _record_job_event, EVENT_JOB_SUBMITTED | EVENT_JOB_EXECUTED | EVENT_JOB_ERROR | EVENT_JOB_MISSED
+            )
         if settings.scheduler_enabled:
-            _scheduler.start()
-            logger.info("Background scheduler started")
+            _lease = LeaderLease(
+                settings.scheduler_lease_file,
+                heartbeat_seconds=settings.scheduler_heartbeat_seconds,
+                on_acquire=_start_jobs,
+                on_release=_stop_jobs,
+            )
+            _lease.start()
+            if not _lease.is_leader:
+                logger.info("Another process holds the scheduler lease; standing by")
     return _scheduler
 
 
+def scheduler_status() -> dict[str, Any]:
+    settings = get_settings()
+    status: dict[str, Any] = {"enabled": settings.scheduler_enabled, "is_leader": False, "leader": None, "jobs": []}
+    if _lease is not None:
+        status.update(_lease.status())
+    if _scheduler is not None and _scheduler.running:
+        status["jobs"] = [
+            {"id": job.id, "next_run_time": job.next_run_time.isoformat() if job.next_run_time else None}
+            for job in _scheduler.get_jobs()
+        ]
+    return status
+
+
 def shutdown_scheduler() -> None:
-    global _scheduler
-    if _scheduler:
-        try:
-            _scheduler.shutdown(wait=False)
-        except SchedulerNotRunningError:
-            pass
-        _scheduler = None
-        logger.info("Background scheduler stopped")
+    global _scheduler, _lease
+    if _lease is not None:
+        _lease.stop()
+        _lease = None
+    _stop_jobs()
+    _scheduler = None
 
 
-__all__ = ["get_scheduler", "shutdown_scheduler"]
+__all__ = ["get_scheduler", "scheduler_status", "shutdown_scheduler"]
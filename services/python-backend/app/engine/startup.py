@@ -0,0 +1,64 @@
+"""Startup work that finishes after the server starts accepting requests.
+
+In fast-start mode the lifespan hands slow, optional work (the legacy vault
+import, booting the scheduler) to :class:`StartupTasks` instead of running it
+before the first request. ``GET /ready`` answers 503 until every task has
+finished, so load balancers and orchestrators route traffic only to
+instances whose data is complete, while ``/health`` reports liveness from the
+first moment.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTasks:
+    def __init__(self) -> None:
+        self.stop = threading.Event()
+        self._tasks: dict[str, asyncio.Task[None]] = {}
+        self._seconds: dict[str, float] = {}
+        self._failed: dict[str, str] = {}
+
+    def start(self, name: str, func: Callable[[], Any]) -> None:
+        """Run ``func`` on a worker thread; ``/ready`` waits for it."""
+
+        async def run() -> None:
+            started = time.perf_counter()
+            try:
+                await asyncio.to_thread(func)
+            except Exception as exc:  # noqa: BLE001 - reported by /ready
+                logger.exception("Startup task %s failed", name)
+                self._failed[name] = f"{type(exc).__name__}: {exc}"
+            self._seconds[name] = round(time.perf_counter() - started, 3)
+
+        self._tasks[name] = asyncio.create_task(run(), name=f"startup:{name}")
+
+    @property
+    def ready(self) -> bool:
+        return not self._failed and all(task.done() for task in self._tasks.values())
+
+    def status(self) -> dict[str, Any]:
+        pending = [name for name, task in self._tasks.items() if not task.done()]
+        state = "failed" if self._failed else "starting" if pending else "ready"
+        return {"status": state, "pending": pending, "failed": dict(self._failed), "seconds": dict(self._seconds)}
+
+    async def shutdown(self) -> None:
+        """Ask tasks to stop at their next checkpoint and wait for them.
+
+        Worker threads cannot be cancelled, so this waits rather than leaving
+        them running against engines that are about to be disposed.
+        """
+
+        self.stop.set()
+        if self._tasks:
+            await asyncio.gather(*self._tasks.values())
+
+
+__all__ = ["StartupTasks"]
@@ -0,0 +1,205 @@
+"""Run generator backends off the API threadpool.
+
+:class:`GeneratorEngine` micro-batches generation requests and hands each
+batch to its backend in one call, inside a ``spawn`` process pool so CPU-bound
+backends neither hold the GIL of the API process nor block its threadpool.
+Callers get a :class:`~concurrent.futures.Future`, which async routes await
+with :func:`asyncio.wrap_future`.
+
+Every backend call is bounded by ``timeout_seconds``. All calls go through
+the batcher, whose thread count equals the pool size, so a call never waits
+in the pool's queue and the timeout measures the backend alone. A worker
+process cannot be interrupted mid-call, so on timeout the pool's workers are
+killed (by the pids they report at startup) and the pool is rebuilt; calls
+that were running in it at the time fail with :class:`GeneratorError`.
+With ``workers=0`` backends run on the batcher threads instead, which suits
+light backends and tests but cannot enforce timeouts.
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import signal
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.queues import SimpleQueue
+from typing import Any, Sequence
+
+from app.config import get_settings
+from app.engine.backends import GeneratorError, backend_target, run_backend
+from app.engine.generator import GenerateRequest
+from app.utils.batching import MicroBatcher
+
+logger = logging.getLogger(__name__)
+
+Posts = list[dict[str, Any]]
+GenerateJob = tuple[str, tuple[GenerateRequest, ...]]
+
+
+class GeneratorTimeout(GeneratorError, TimeoutError):
+    pass
+
+
+def _report_pid(pids: SimpleQueue) -> None:
+    pids.put(os.getpid())
+
+
+class GeneratorEngine:
+    def __init__(self, *, workers: int, timeout_seconds: float, max_batch_size: int, window_ms: float) -> None:
+        self.workers = workers
+        self.timeout_seconds = timeout_seconds
+        self._executor: ProcessPoolExecutor | None = None
+        self._pids: SimpleQueue | None = None
+        self._lock = threading.Lock()
+        self._counters = {"calls": 0, "requests": 0, "failures": 0, "timeouts": 0, "restarts": 0}
+        self._batcher: MicroBatcher[GenerateJob, Posts] = MicroBatcher(
+            self._run_jobs,
+            name="generator",
+            max_batch_size=max_batch_size,
+            window_ms=window_ms,
+            threads=max(1, workers),
+        )
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                context = multiprocessing.get_context("spawn")
+                self._pids = context.SimpleQueue()
+                self._executor = ProcessPoolExecutor(
+                    self.workers, mp_context=context, initializer=_report_pid, initargs=(self._pids,)
+                )
+            return self._executor
+
+    def _discard_pool(self, executor: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._executor is not executor:
+                return
+            pids, self._executor, self._pids = self._pids, None, None
+            self._counters["restarts"] += 1
+        # ProcessPoolExecutor cannot stop a busy worker itself; its workers reported their pids.
+        while pids is not None and not pids.empty():
+            try:
+                os.kill(pids.get(), signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _count(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[counter] += amount
+
+    def run(self, backend: str, requests: Sequence[GenerateRequest]) -> Posts:
+        """Blocking form of :meth:`submit`."""
+
+        return self.submit(backend, requests).result()
+
+    def _call(self, backend: str, requests: Sequence[GenerateRequest]) -> Posts:
+        """Generate one post per request with a single backend call; runs on a batcher thread."""
+
+        target = backend_target(backend)
+        self._count("calls")
+        self._count("requests", len(requests))
+        if self.workers == 0:
+            try:
+                return run_backend(target, requests)
+            except Exception as exc:
+                self._count("failures")
+                if isinstance(exc, GeneratorError):
+                    raise
+                raise GeneratorError(f"Generator backend {backend!r} failed: {exc}") from exc
+
+        executor = self._pool()
+        try:
+            return executor.submit(run_backend, target, list(requests)).result(timeout=self.timeout_seconds)
+        except FutureTimeoutError:
+            self._count("timeouts")
+            self._discard_pool(executor)
+            raise GeneratorTimeout(f"Generator backend {backend!r} timed out after {self.timeout_seconds}s") from None
+        except BrokenProcessPool as exc:
+            self._count("failures")
+            self._discard_pool(executor)
+            raise GeneratorError(f"Generator worker for {backend!r} exited") from exc
+        except GeneratorError:
+            self._count("failures")
+            raise
+        except Exception as exc:
+            self._count("failures")
+            raise GeneratorError(f"Generator backend {backend!r} failed: {exc}") from exc
+
+    def submit(self, backend: str, requests: Sequence[GenerateRequest]) -> Future[Posts]:
+        """Queue ``requests``; concurrent submissions for one backend share a backend call."""
+
+        backend_target(backend)
+        return self._batcher.submit((backend, tuple(requests)))
+
+    def _run_jobs(self, jobs: list[GenerateJob]) -> list[Posts | BaseException]:
+        by_backend: dict[str, list[int]] = {}
+        for index, (backend, _) in enumerate(jobs):
+            by_backend.setdefault(backend, []).append(index)
+
+        results: list[Posts | BaseException] = [[] for _ in jobs]
+        for backend, indexes in by_backend.items():
+            requests = [request for index in indexes for request in jobs[index][1]]
+            try:
+                posts = self._call(backend, requests)
+            except GeneratorError as exc:
+                for index in indexes:
+                    results[index] = exc
+                continue
+            offset = 0
+            for index in indexes:
+                size = len(jobs[index][1])
+                results[index] = posts[offset : offset + size]
+                offset += size
+        return results
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+        return {"workers": self.workers, "timeout_seconds": self.timeout_seconds, **counters, **self._batcher.stats()}
+
+    def close(self) -> None:
+        self._batcher.close()
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._pids = None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+_engine: GeneratorEngine | None = None
+_engine_lock = threading.Lock()
+
+
+def get_generator_engine() -> GeneratorEngine:
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                settings = get_settings()
+                _engine = GeneratorEngine(
+                    workers=settings.generator_workers,
+                    timeout_seconds=settings.generator_timeout_seconds,
+                    max_batch_size=settings.generator_batch_max_size,
+                    window_ms=settings.generator_batch_window_ms,
+                )
+    return _engine
+
+
+def shutdown_generator_engine() -> None:
+    global _engine
+    if _engine is not None:
+        _engine.close()
+        _engine = None
+
+
+__all__ = [
+    "GeneratorEngine",
+    "GeneratorTimeout",
+    "get_generator_engine",
+    "shutdown_generator_engine",
+]
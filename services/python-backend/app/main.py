@@ -1,61 +1,200 @@
+"""The FastAPI application and its lifespan.
+
+``app`` is built on first access (``uvicorn app.main:app`` or ``from app.main
+import app``) rather than at import, so tests, the CLI and tooling that call
+:func:`create_app` themselves pay for neither router imports nor a second
+app. The scheduler and legacy import modules are imported only when used.
+
+With ``fast_start`` the legacy vault import and the scheduler boot run in the
+background after startup and ``GET /ready`` answers 503 until they finish;
+otherwise both complete before the first request, as before. Schema work is
+a single version check when the stored version is current.
+"""
+
 from __future__ import annotations
 
 import logging
+import threading
 from contextlib import asynccontextmanager
+from typing import Any
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
-from app.api import agents, generate, posts, rituals, vault
+from app.api.conditional import CONDITIONAL_ROUTES, ConditionalGetMiddleware
+from app.api.pagination import NEXT_CURSOR_HEADER
+from app.api.response_cache import CACHE_STATUS_HEADER, ResponseCache, ResponseCacheMiddleware
 from app.config import Settings, get_settings
-from app.db.legacy import migrate_legacy_vault
+from app.db.async_session import dispose_async_engine
+from app.db.changes import get_change_tracker
 from app.db.migrate import run_migrations
-from app.db.session import session_scope
-from app.engine.scheduler import get_scheduler, shutdown_scheduler
+from app.db.session import get_engine, is_sqlite_url, session_scope
+from app.db.writer import get_write_coalescer, shutdown_write_coalescer
+from app.engine.events import get_event_bus
+from app.engine.startup import StartupTasks
+from app.engine.workers import get_generator_engine, shutdown_generator_engine
+from app.utils.request_context import RequestContextMiddleware
 
 logger = logging.getLogger(__name__)
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    run_migrations()
+def import_legacy_vault(stop: threading.Event | None = None) -> None:
+    from app.db.legacy import migrate_legacy_vault
+
     with session_scope() as session:
-        if migrated := migrate_legacy_vault(session):
+        if migrate_legacy_vault(session, stop):
             logger.info("Legacy vault migrated on startup")
+
+
+def start_scheduler() -> None:
+    from app.engine.scheduler import get_scheduler
+
     get_scheduler()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    settings = get_settings()
+    startup = app.state.startup = StartupTasks()
+    # Under ``runserver --workers`` the supervisor has already done both;
+    # the worker only opens its own engines.
+    if settings.skip_startup_tasks:
+        get_engine()
+    else:
+        run_migrations()
+        if settings.fast_start:
+            startup.start("legacy_import", lambda: import_legacy_vault(startup.stop))
+        else:
+            import_legacy_vault()
+    if settings.events_relay and is_sqlite_url(settings.database_url):
+        get_event_bus().share(
+            settings.db_path, settings.events_relay_interval_seconds, settings.sqlite_busy_timeout_ms / 1000
+        )
+    if settings.scheduler_enabled:
+        if settings.fast_start:
+            startup.start("scheduler", start_scheduler)
+        else:
+            start_scheduler()
+    cache: ResponseCache | None = getattr(app.state, "response_cache", None)
+    if cache is not None:
+        get_change_tracker().add_listener(cache.invalidate)
     try:
         yield
     finally:
-        shutdown_scheduler()
+        if cache is not None:
+            get_change_tracker().remove_listener(cache.invalidate)
+        await startup.shutdown()
+        if settings.scheduler_enabled:
+            from app.engine.scheduler import shutdown_scheduler
+
+            shutdown_scheduler()
+        shutdown_generator_engine()
+        shutdown_write_coalescer()
+        # After the last writes, so their events still reach the other workers.
+        get_event_bus().unshare()
+        await dispose_async_engine()
 
 
 def create_app(settings: Settings | None = None) -> FastAPI:
     if settings is None:
         settings = get_settings()
 
+    unknown = sorted(set(settings.response_cache_routes) - CONDITIONAL_ROUTES.keys())
+    if unknown:
+        raise ValueError(
+            f"AGENT_SPARK_RESPONSE_CACHE_ROUTES has routes without change tracking: {', '.join(unknown)} "
+            f"(cacheable: {', '.join(CONDITIONAL_ROUTES)})"
+        )
+
     app = FastAPI(title="Agent Spark", version="1.0.0", lifespan=lifespan)
 
+    # Middleware added first runs innermost: the cache sits in front of the
+    # handlers, conditional GETs in front of the cache, CORS in front of both
+    # so 304 responses carry CORS headers too, then metrics so they time
+    # everything a client waits for. The request context wraps it all.
+    app.state.response_cache = ResponseCache(settings.response_cache_max_bytes, settings.response_cache_ttl_seconds)
+    if settings.response_cache_routes and settings.response_cache_max_bytes:
+        app.add_middleware(
+            ResponseCacheMiddleware, cache=app.state.response_cache, routes=settings.response_cache_routes
+        )
+    app.add_middleware(ConditionalGetMiddleware)
     app.add_middleware(
         CORSMiddleware,
         allow_origins=["*"],
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER, CACHE_STATUS_HEADER, "ETag", "Last-Modified"],
     )
-
-    app.include_router(agents.router)
-    app.include_router(rituals.router)
-    app.include_router(generate.router)
-    app.include_router(posts.router)
-    app.include_router(vault.router)
+    if settings.metrics_enabled:
+        from app.api.metrics import MetricsMiddleware
+
+        app.add_middleware(MetricsMiddleware)
+    app.add_middleware(RequestContextMiddleware)
+
+    # Import only the router flavour in use.
+    if settings.db_async:
+        from app.api import aio as routers
+    else:
+        from app import api as routers
+    from app.api import archive as archive_routes
+    from app.api import events as event_routes
+
+    app.include_router(routers.agents.router)
+    app.include_router(routers.rituals.router)
+    app.include_router(routers.generate.router)
+    app.include_router(routers.posts.router)
+    app.include_router(routers.vault.router)
+    app.include_router(routers.search.router)
+    app.include_router(event_routes.router)
+    app.include_router(archive_routes.router)
+    if settings.metrics_enabled:
+        from app.api import metrics as metric_routes
+
+        app.include_router(metric_routes.router)
 
     @app.get("/health")
     def healthcheck() -> dict[str, str]:
         return {"status": "ok"}
 
+    @app.get("/ready")
+    def readiness() -> ORJSONResponse:
+        startup: StartupTasks | None = getattr(app.state, "startup", None)
+        if startup is None:
+            return ORJSONResponse({"status": "starting", "pending": [], "failed": {}, "seconds": {}}, status_code=503)
+        return ORJSONResponse(startup.status(), status_code=200 if startup.ready else 503)
+
+    @app.get("/health/writes")
+    def write_stats() -> dict[str, Any]:
+        return get_write_coalescer().stats()
+
+    @app.get("/health/generator")
+    def generator_stats() -> dict[str, Any]:
+        return get_generator_engine().stats()
+
+    @app.get("/scheduler/status")
+    def scheduler_state() -> dict[str, Any]:
+        from app.engine.scheduler import scheduler_status
+
+        return scheduler_status()
+
+    @app.get("/health/events")
+    def event_stats() -> dict[str, Any]:
+        return get_event_bus().stats()
+
+    @app.get("/health/cache")
+    def cache_stats() -> dict[str, Any]:
+        return app.state.response_cache.stats()
+
     return app
 
 
-app = create_app()
+def __getattr__(name: str) -> Any:
+    if name == "app":
+        # Cached as a real module attribute, so this runs once.
+        globals()["app"] = application = create_app()
+        return application
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 __all__ = ["app", "create_app"]
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from sqlalchemy import DateTime, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class ArchiveSegment(Base):
+    """One compressed JSONL file of rows moved out of ``table_name`` by retention.
+
+    ``state`` is ``archiving`` only inside the transaction that deletes the
+    segment's rows (see :mod:`app.db.retention`), and ``archived`` once
+    committed; segment files without a committed row here are orphans.
+    """
+
+    __tablename__ = "archive_segments"
+    __table_args__ = (
+        Index("ix_archive_segments_table_name_last_created_at", "table_name", "last_created_at"),
+        Index("ix_archive_segments_state", "state"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    table_name: Mapped[str] = mapped_column(String(64), nullable=False)
+    partition: Mapped[str] = mapped_column(String(10), nullable=False)
+    path: Mapped[str] = mapped_column(String(1024), nullable=False, unique=True)
+    rows: Mapped[int] = mapped_column(Integer, nullable=False)
+    first_created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    last_created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    state: Mapped[str] = mapped_column(String(16), nullable=False, default="archiving")
+    archived_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False
+    )
+
+
+__all__ = ["ArchiveSegment"]
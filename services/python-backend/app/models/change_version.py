@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+from sqlalchemy import Float, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class ChangeVersion(Base):
+    """Write counter per table, shared by every server process (see :mod:`app.db.changes`)."""
+
+    __tablename__ = "change_versions"
+
+    table_name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    modified_at: Mapped[float] = mapped_column(Float, nullable=False)
+
+
+__all__ = ["ChangeVersion"]
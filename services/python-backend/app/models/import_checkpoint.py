@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import BigInteger, DateTime, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class ImportCheckpoint(Base):
+    """Progress of a chunked legacy import, committed with each chunk it describes.
+
+    ``quarantined_as`` is set when the file turned out to be corrupt after some
+    chunks were committed: the repaired file is resumed by record count, since
+    repairing it invalidates the byte offset.
+    """
+
+    __tablename__ = "import_checkpoints"
+
+    source: Mapped[str] = mapped_column(String(1024), primary_key=True)
+    byte_offset: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    records: Mapped[int] = mapped_column(Integer, nullable=False)
+    source_size: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    source_mtime_ns: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    quarantined_as: Mapped[Optional[str]] = mapped_column(String(1024), nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False
+    )
+
+
+__all__ = ["ImportCheckpoint"]
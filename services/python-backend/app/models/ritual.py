@@ -4,7 +4,7 @@ from datetime import datetime, timezone
 from typing import Optional
 from uuid import uuid4
 
-from sqlalchemy import DateTime, ForeignKey, String, Text
+from sqlalchemy import DateTime, ForeignKey, Index, String, Text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.base import Base
@@ -12,6 +12,12 @@ from app.db.base import Base
 
 class RitualLog(Base):
     __tablename__ = "ritual_logs"
+    __table_args__ = (
+        Index("ix_ritual_logs_created_at_id", "created_at", "id"),
+        Index("ix_ritual_logs_agent_id_event_type_created_at", "agent_id", "event_type", "created_at"),
+        Index("ix_ritual_logs_event_type_created_at", "event_type", "created_at"),
+        Index("ix_ritual_logs_emotion_created_at", "emotion", "created_at"),
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid4()))
     agent_id: Mapped[Optional[str]] = mapped_column(String(36), ForeignKey("agents.id"), nullable=True)
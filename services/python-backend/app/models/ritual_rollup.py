@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from sqlalchemy import Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class RitualRollup(Base):
+    """Ritual counts per agent, time bucket, event type and emotion.
+
+    Rows are maintained by triggers on ``ritual_logs`` (see
+    :mod:`app.db.rollups`), never written by the application. Missing agents
+    and emotions are stored as ``''`` so they take part in the primary key.
+    """
+
+    __tablename__ = "ritual_rollups"
+    # Serves bucket ranges summed across agents; the primary key serves per-agent ranges.
+    __table_args__ = (Index("ix_ritual_rollups_bucket_bucket_start", "bucket", "bucket_start"),)
+
+    bucket: Mapped[str] = mapped_column(String(8), primary_key=True)
+    agent_id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    bucket_start: Mapped[str] = mapped_column(String(19), primary_key=True)
+    event_type: Mapped[str] = mapped_column(String(100), primary_key=True)
+    emotion: Mapped[str] = mapped_column(String(100), primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+__all__ = ["RitualRollup"]
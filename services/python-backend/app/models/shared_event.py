@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from typing import Optional
+
+from sqlalchemy import Float, Integer, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class SharedEvent(Base):
+    """Recent live-feed events, relayed between server processes (see :mod:`app.engine.events`).
+
+    ``origin`` is the publishing bus's epoch, so a process skips its own rows.
+    Only the newest rows are kept; older ones are pruned as new ones arrive.
+    """
+
+    __tablename__ = "shared_events"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    origin: Mapped[str] = mapped_column(String(16), nullable=False)
+    type: Mapped[str] = mapped_column(String(64), nullable=False)
+    data: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[float] = mapped_column(Float, nullable=False)
+
+
+__all__ = ["SharedEvent"]
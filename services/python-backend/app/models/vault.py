@@ -4,21 +4,45 @@ from datetime import datetime, timezone
 from typing import Any
 from uuid import uuid4
 
-from sqlalchemy import DateTime, JSON, String
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, JSON, String
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
 
 
 class VaultRecord(Base):
     __tablename__ = "vault_records"
+    __table_args__ = (
+        Index("ix_vault_records_created_at_id", "created_at", "id"),
+        Index("ix_vault_records_theme_created_at", "theme", "created_at"),
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid4()))
     theme: Mapped[str] = mapped_column(String(255), nullable=False)
-    posts: Mapped[list[dict[str, Any]]] = mapped_column(JSON, default=list)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False
     )
 
+    posts: Mapped[list["VaultPost"]] = relationship(
+        back_populates="record", order_by="VaultPost.seq", cascade="all, delete-orphan"
+    )
+
+
+class VaultPost(Base):
+    """One post of a vault record; ``seq`` numbers a record's posts from 0 in append order."""
+
+    __tablename__ = "vault_posts"
+
+    record_id: Mapped[str] = mapped_column(
+        String(36), ForeignKey("vault_records.id", ondelete="CASCADE"), primary_key=True
+    )
+    seq: Mapped[int] = mapped_column(Integer, primary_key=True)
+    content: Mapped[Any] = mapped_column(JSON, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False
+    )
+
+    record: Mapped[VaultRecord] = relationship(back_populates="posts")
+
 
-__all__ = ["VaultRecord"]
+__all__ = ["VaultPost", "VaultRecord"]
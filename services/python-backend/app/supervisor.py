@@ -0,0 +1,180 @@
+"""Multi-process serving for ``agent-spark runserver --workers N``.
+
+The parent binds the listening socket, brings the schema up to date and
+imports any legacy vault once, then disposes its engines and spawns the
+workers. Workers are fresh interpreters (uvicorn's spawn context, not
+``fork``), so each one opens its own SQLite connections and no connection or
+lock ever crosses a process boundary. Workers run with
+``AGENT_SPARK_SKIP_STARTUP_TASKS`` so they do not repeat the parent's startup
+work, and with one change epoch (see :mod:`app.db.changes`) so ETags and
+cached responses agree across workers. In WAL mode their readers run in
+parallel; writes still take SQLite's single writer lock in turn, retried on
+``SQLITE_BUSY``. Only the worker holding the scheduler lease runs jobs.
+Live ``/events`` and ``/ws`` feeds are relayed between workers through the
+``shared_events`` table (see :mod:`app.engine.events`), so every client sees
+every worker's events; event ids are per worker, so a client that reconnects
+to a different worker receives ``resync``.
+
+Signals sent to the parent:
+
+* ``SIGTERM``/``SIGINT`` drain: workers stop accepting, finish in-flight
+  requests for up to ``graceful_timeout`` seconds, run their shutdown hooks
+  and exit; stragglers are killed.
+* ``SIGHUP`` reloads: pending migrations are applied by a fresh interpreter
+  (so the new code's migrations are seen), then each worker is replaced by a
+  new one, which must be serving before the old one drains. The socket stays
+  open throughout, so no connection is refused.
+
+A worker that exits unexpectedly is replaced.
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing.synchronize
+import os
+import secrets
+import signal
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from multiprocessing.context import SpawnProcess
+from socket import socket
+from typing import Optional
+
+import uvicorn
+from uvicorn._subprocess import get_subprocess, spawn
+
+logger = logging.getLogger(__name__)
+
+WORKER_START_TIMEOUT = 60.0
+RESPAWN_DELAY = 1.0
+
+
+def prepare_workers_environment() -> None:
+    """Run the once-per-deployment startup work here, then configure the workers to skip it."""
+
+    from app.config import get_settings
+    from app.db.migrate import run_migrations
+    from app.db.session import reset_engine
+    from app.main import import_legacy_vault
+
+    run_migrations()
+    import_legacy_vault()
+    # Workers open their own connections; nothing from this process is inherited.
+    reset_engine()
+    os.environ["AGENT_SPARK_SKIP_STARTUP_TASKS"] = "true"
+    os.environ["AGENT_SPARK_EVENTS_RELAY"] = "true"
+    # A new epoch per deployment: tags issued before this start never match.
+    os.environ["AGENT_SPARK_CHANGE_EPOCH"] = secrets.token_hex(4)
+    get_settings.cache_clear()
+
+
+class _WorkerServer(uvicorn.Server):
+    def __init__(self, config: uvicorn.Config, started: multiprocessing.synchronize.Event) -> None:
+        super().__init__(config)
+        self._started_event = started
+
+    async def startup(self, sockets: Optional[list[socket]] = None) -> None:
+        await super().startup(sockets)
+        if self.started:
+            self._started_event.set()
+
+
+@dataclass
+class _Worker:
+    process: SpawnProcess
+    started: multiprocessing.synchronize.Event
+
+
+class Supervisor:
+    def __init__(self, config: uvicorn.Config, workers: int, graceful_timeout: float) -> None:
+        self.config = config
+        self.workers = workers
+        self.graceful_timeout = graceful_timeout
+        self._sockets: list[socket] = []
+        self._workers: list[_Worker] = []
+        self._stop = threading.Event()
+        self._reload = threading.Event()
+        self._wake = threading.Event()
+
+    def _spawn(self) -> _Worker:
+        started = spawn.Event()
+        server = _WorkerServer(self.config, started)
+        process = get_subprocess(config=self.config, target=server.run, sockets=self._sockets)
+        process.start()
+        logger.info("Started worker %s", process.pid)
+        return _Worker(process, started)
+
+    def _wait_started(self, worker: _Worker) -> bool:
+        deadline = time.monotonic() + WORKER_START_TIMEOUT
+        while time.monotonic() < deadline and worker.process.is_alive():
+            if worker.started.wait(0.1):
+                return True
+        return False
+
+    def _drain(self, workers: list[_Worker]) -> None:
+        for worker in workers:
+            if worker.process.is_alive():
+                worker.process.terminate()
+        deadline = time.monotonic() + self.graceful_timeout + 5
+        for worker in workers:
+            worker.process.join(max(deadline - time.monotonic(), 0))
+            if worker.process.is_alive():
+                logger.warning("Worker %s did not drain in time; killing it", worker.process.pid)
+                worker.process.kill()
+                worker.process.join()
+
+    def _reload_workers(self) -> None:
+        logger.info("Reloading: applying migrations")
+        result = subprocess.run([sys.executable, "-m", "app.cli", "migrate", "apply"], check=False)
+        if result.returncode != 0:
+            logger.error("Migrations failed (exit %s); keeping the current workers", result.returncode)
+            return
+        for index, old in enumerate(list(self._workers)):
+            new = self._spawn()
+            if not self._wait_started(new):
+                logger.error("Replacement worker %s failed to start; keeping the current workers", new.process.pid)
+                self._drain([new])
+                return
+            self._workers[index] = new
+            self._drain([old])
+        logger.info("Reload complete")
+
+    def _replace_exited(self) -> None:
+        for index, worker in enumerate(self._workers):
+            if not worker.process.is_alive() and not self._stop.is_set():
+                logger.warning("Worker %s exited with code %s; replacing it", worker.process.pid, worker.process.exitcode)
+                time.sleep(RESPAWN_DELAY)
+                self._workers[index] = self._spawn()
+
+    def _on_signal(self, signum: int, _frame: object) -> None:
+        (self._reload if signum == signal.SIGHUP else self._stop).set()
+        self._wake.set()
+
+    def run(self) -> None:
+        self._sockets = [self.config.bind_socket()]
+        for signum in (signal.SIGINT, signal.SIGTERM, signal.SIGHUP):
+            signal.signal(signum, self._on_signal)
+        logger.info("Supervisor %s serving on %s:%s with %s workers", os.getpid(), self.config.host, self.config.port, self.workers)
+        self._workers = [self._spawn() for _ in range(self.workers)]
+        try:
+            while not self._stop.is_set():
+                self._wake.wait(0.5)
+                self._wake.clear()
+                if self._stop.is_set():
+                    break
+                if self._reload.is_set():
+                    self._reload.clear()
+                    self._reload_workers()
+                self._replace_exited()
+        finally:
+            logger.info("Draining %s workers", len(self._workers))
+            self._drain(self._workers)
+            for sock in self._sockets:
+                sock.close()
+
+
+__all__ = ["Supervisor", "prepare_workers_environment"]
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Generic, Sequence, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+_STOP = object()
+
+
+def _percentile(samples: Sequence[float], fraction: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class MicroBatcher(Generic[T, R]):
+    """Collect items submitted from many threads and hand them to ``handler`` in batches.
+
+    A single daemon thread waits for the first item, keeps gathering for up to
+    ``window_ms`` or until ``max_batch_size`` items are queued, then calls
+    ``handler`` with the batch. The handler returns one result per item, in
+    order; a result that is an exception is raised to that item's submitter
+    only. If the handler itself raises, every item in the batch fails with it.
+    With ``threads`` above one, that many workers each gather and run their
+    own batches, so up to ``threads`` handler calls are in flight at once.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[list[T]], Sequence[R | BaseException]],
+        *,
+        name: str,
+        max_batch_size: int,
+        window_ms: float,
+        threads: int = 1,
+        latency_samples: int = 2048,
+    ) -> None:
+        self._handler = handler
+        self._name = name
+        self._max_batch_size = max_batch_size
+        self._window = window_ms / 1000
+        self._thread_count = max(1, threads)
+        self._queue: queue.Queue[Any] = queue.Queue()
+        self._threads: list[threading.Thread] = []
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._items = 0
+        self._max_seen = 0
+        self._latencies: deque[float] = deque(maxlen=latency_samples)
+
+    def submit(self, item: T) -> Future[R]:
+        future: Future[R] = Future()
+        self._ensure_started()
+        self._queue.put((item, future, time.perf_counter()))
+        return future
+
+    def _ensure_started(self) -> None:
+        if self._threads:
+            return
+        with self._start_lock:
+            if not self._threads:
+                threads = [
+                    threading.Thread(target=self._run, name=f"{self._name}-{index}", daemon=True)
+                    for index in range(self._thread_count)
+                ]
+                for thread in threads:
+                    thread.start()
+                self._threads = threads
+
+    def _collect(self, first: Any) -> tuple[list[Any], bool]:
+        batch = [first]
+        deadline = time.perf_counter() + self._window
+        while len(batch) < self._max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is _STOP:
+                return batch, True
+            batch.append(entry)
+        return batch, False
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is _STOP:
+                break
+            batch, stopping = self._collect(first)
+            self._process(batch)
+
+    def _process(self, batch: list[Any]) -> None:
+        items = [item for item, _, _ in batch]
+        try:
+            results: Sequence[Any] = self._handler(items)
+        except BaseException as exc:  # noqa: BLE001
+            logger.exception("%s batch of %s failed", self._name, len(items))
+            results = [exc] * len(items)
+
+        finished = time.perf_counter()
+        for (_, future, submitted), result in zip(batch, results):
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+        with self._stats_lock:
+            self._batches += 1
+            self._items += len(batch)
+            self._max_seen = max(self._max_seen, len(batch))
+            self._latencies.extend(finished - submitted for _, _, submitted in batch)
+
+    def stats(self) -> dict[str, Any]:
+        with self._stats_lock:
+            latencies = list(self._latencies)
+            batches, items, max_seen = self._batches, self._items, self._max_seen
+        return {
+            "batches": batches,
+            "items": items,
+            "mean_batch_size": round(items / batches, 2) if batches else 0.0,
+            "max_batch_size": max_seen,
+            "latency_ms": {
+                "p50": round(_percentile(latencies, 0.50) * 1000, 3),
+                "p95": round(_percentile(latencies, 0.95) * 1000, 3),
+                "p99": round(_percentile(latencies, 0.99) * 1000, 3),
+            },
+        }
+
+    def close(self, timeout: float | None = 5.0) -> None:
+        """Process everything already queued, then stop the worker threads."""
+
+        threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put(_STOP)
+        for thread in threads:
+            thread.join(timeout)
+
+
+__all__ = ["MicroBatcher"]
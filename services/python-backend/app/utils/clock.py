@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+
+def utc_now() -> datetime:
+    """The current UTC time as SQLite stores it and reads it back: naive.
+
+    Rows built in Python use this so a record created by a POST serialises
+    exactly as it does when it is read back by a list or detail endpoint.
+    """
+
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+__all__ = ["utc_now"]
@@ -0,0 +1,111 @@
+"""Cold-start import report, built on ``python -X importtime``.
+
+The target is imported in a fresh interpreter so nothing is already cached
+in ``sys.modules``; the child reports how long the import and the attribute
+lookup (``app.main:app`` builds the app) took, and its ``-X importtime``
+trace is folded into the slowest modules and the packages that cost the most.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Optional
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+_CHILD = """
+import json, sys, time
+module, _, attribute = sys.argv[1].partition(":")
+started = time.perf_counter()
+__import__(module)  # importlib.import_module would keep the target itself out of the trace
+loaded = sys.modules[module]
+imported = time.perf_counter()
+if attribute:
+    getattr(loaded, attribute)
+built = time.perf_counter()
+print(json.dumps({"import": imported - started, "build": built - imported, "modules": len(sys.modules)}))
+"""
+
+
+@dataclass(frozen=True)
+class ImportTiming:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+@dataclass(frozen=True)
+class ImportReport:
+    target: str
+    wall_seconds: float
+    import_seconds: float
+    build_seconds: float
+    module_count: int
+    timings: tuple[ImportTiming, ...]
+
+    def slowest(self, count: int, prefix: Optional[str] = None) -> list[ImportTiming]:
+        timings = [timing for timing in self.timings if prefix is None or timing.module.startswith(prefix)]
+        return sorted(timings, key=lambda timing: timing.cumulative_us, reverse=True)[:count]
+
+    def packages(self) -> dict[str, int]:
+        """Self time per top-level package, in microseconds, most expensive first."""
+
+        totals: dict[str, int] = defaultdict(int)
+        for timing in self.timings:
+            totals[timing.module.partition(".")[0]] += timing.self_us
+        return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+
+def parse_importtime(trace: str) -> list[ImportTiming]:
+    timings = []
+    for line in trace.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            timings.append(ImportTiming(module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return timings
+
+
+def measure_imports(target: str = "app.main:app", python: str = sys.executable) -> ImportReport:
+    """Import ``module[:attribute]`` in a new interpreter and report where the time went."""
+
+    started = time.perf_counter()
+    result = subprocess.run([python, "-X", "importtime", "-c", _CHILD, target], capture_output=True, text=True, check=False)
+    wall = time.perf_counter() - started
+    if result.returncode != 0:
+        raise RuntimeError(f"importing {target} failed:\n{result.stderr[-2000:]}")
+    summary = json.loads(result.stdout.strip().splitlines()[-1])
+    return ImportReport(
+        target=target,
+        wall_seconds=wall,
+        import_seconds=summary["import"],
+        build_seconds=summary["build"],
+        module_count=summary["modules"],
+        timings=tuple(parse_importtime(result.stderr)),
+    )
+
+
+def format_importtime_report(report: ImportReport, top: int = 15) -> str:
+    lines = [
+        f"{report.target}: interpreter {report.wall_seconds * 1000:.0f} ms, import {report.import_seconds * 1000:.0f} ms, "
+        f"build {report.build_seconds * 1000:.0f} ms, {report.module_count} modules",
+        "",
+        "packages by self time:",
+    ]
+    for package, self_us in list(report.packages().items())[:top]:
+        lines.append(f"  {self_us / 1000:8.1f} ms  {package}")
+    for title, prefix in (("slowest modules (cumulative):", None), ("slowest app modules (cumulative):", "app.")):
+        lines.extend(["", title])
+        for timing in report.slowest(top, prefix):
+            lines.append(f"  {timing.cumulative_us / 1000:8.1f} ms  {timing.module}")
+    return "\n".join(lines)
+
+
+__all__ = ["ImportReport", "ImportTiming", "format_importtime_report", "measure_imports", "parse_importtime"]
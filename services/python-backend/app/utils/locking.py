@@ -1,11 +1,21 @@
 from __future__ import annotations
 
+import json
+import logging
+import os
+import socket
+import threading
+import time
 from contextlib import contextmanager
 from pathlib import Path
-from typing import Iterator
+from typing import Any, Callable, Iterator, Optional
 
 import portalocker
 
+from app.utils.atomic import atomic_write
+
+logger = logging.getLogger(__name__)
+
 
 @contextmanager
 def exclusive_lock(path: Path, timeout: float = 5.0) -> Iterator[None]:
@@ -15,4 +25,106 @@ def exclusive_lock(path: Path, timeout: float = 5.0) -> Iterator[None]:
         yield
 
 
-__all__ = ["exclusive_lock"]
+class LeaderLease:
+    """Elect one leader among processes sharing ``path`` and keep the lease fresh.
+
+    Leadership is an exclusive OS lock on ``<path>.lock``. The OS releases it
+    when the leader exits or crashes, so the next heartbeat of a standby
+    process takes over. The leader rewrites ``path`` with its identity on every
+    heartbeat; other processes read it to report who leads and whether that
+    leader is still renewing.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        heartbeat_seconds: float,
+        on_acquire: Callable[[], None] | None = None,
+        on_release: Callable[[], None] | None = None,
+    ) -> None:
+        self.path = Path(path)
+        self.heartbeat_seconds = heartbeat_seconds
+        self.identity = f"{socket.gethostname()}:{os.getpid()}"
+        self._on_acquire = on_acquire
+        self._on_release = on_release
+        self._lock: Optional[portalocker.Lock] = None
+        self._acquired_at: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._mutex = threading.Lock()
+
+    @property
+    def is_leader(self) -> bool:
+        return self._lock is not None
+
+    def _write_info(self) -> None:
+        info = {"holder": self.identity, "pid": os.getpid(), "acquired_at": self._acquired_at, "renewed_at": time.time()}
+        atomic_write(self.path, json.dumps(info))
+
+    def renew(self) -> bool:
+        """Acquire the lease if it is free, refresh it if held; returns whether this process leads."""
+
+        with self._mutex:
+            if self._lock is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                lock = portalocker.Lock(self.path.with_suffix(self.path.suffix + ".lock"), timeout=0, fail_when_locked=True)
+                try:
+                    lock.acquire()
+                except portalocker.exceptions.LockException:
+                    return False
+                self._lock = lock
+                self._acquired_at = time.time()
+                self._write_info()
+                logger.info("Acquired leader lease %s as %s", self.path, self.identity)
+                if self._on_acquire is not None:
+                    self._on_acquire()
+                return True
+            self._write_info()
+            return True
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.heartbeat_seconds):
+            try:
+                self.renew()
+            except Exception:  # noqa: BLE001
+                logger.exception("Leader lease heartbeat failed")
+
+    def start(self) -> None:
+        self.renew()
+        self._thread = threading.Thread(target=self._run, name="leader-lease", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.heartbeat_seconds + 1)
+        with self._mutex:
+            if self._lock is None:
+                return
+            try:
+                if self._on_release is not None:
+                    self._on_release()
+            finally:
+                # Removed while still locked: once released, the file is the next leader's.
+                self.path.unlink(missing_ok=True)
+                self._lock.release()
+                self._lock = None
+                logger.info("Released leader lease %s", self.path)
+
+    def status(self) -> dict[str, Any]:
+        return {"is_leader": self.is_leader, "identity": self.identity, "leader": read_lease(self.path, self.heartbeat_seconds)}
+
+
+def read_lease(path: Path, heartbeat_seconds: float) -> Optional[dict[str, Any]]:
+    """Return the current leader's lease info, flagged ``stale`` after three missed heartbeats."""
+
+    try:
+        info = json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    info["stale"] = time.time() - info.get("renewed_at", 0) > 3 * heartbeat_seconds
+    return info
+
+
+__all__ = ["LeaderLease", "exclusive_lock", "read_lease"]
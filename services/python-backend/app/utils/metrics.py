@@ -0,0 +1,189 @@
+"""Minimal in-process metrics rendered in the Prometheus text format.
+
+Counters, gauges and histograms with a fixed label set, cheap enough to
+update on every request and query: an update is a dict lookup, a lock and an
+integer add (plus a ``bisect`` for histograms). Values are per process; each
+worker of a multi-process server exposes its own. Collect hooks registered
+with :meth:`Registry.on_collect` run just before rendering, for gauges that
+are sampled rather than updated, such as pool sizes.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+from bisect import bisect_left
+from typing import Callable, Iterator, Sequence
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_INF_BOUND = 'le="+Inf"'
+
+# Seconds; spans sub-millisecond cache hits to multi-second exports.
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children: dict[tuple[str, ...], list[float]] = {}
+
+    def _child(self, values: tuple[str, ...]) -> list[float]:
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _new_child(self) -> list[float]:
+        return [0.0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._children.clear()
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            children = [(values, list(child)) for values, child in self._children.items()]
+        for values, child in sorted(children):
+            yield f"{self.name}{_labels(self.labelnames, values)} {_format_value(child[0])}"
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.kind}"
+        yield from self.samples()
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        child = self._child(labels)
+        with self._lock:
+            child[0] += amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, *labels: str) -> None:
+        child = self._child(labels)
+        with self._lock:
+            child[0] = value
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        child = self._child(labels)
+        with self._lock:
+            child[0] += amount
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram; each child is ``[sum, count, *bucket_counts]``."""
+
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> list[float]:
+        return [0.0] * (len(self.buckets) + 2)
+
+    def observe(self, value: float, *labels: str) -> None:
+        child = self._child(labels)
+        index = bisect_left(self.buckets, value) + 2
+        with self._lock:
+            child[0] += value
+            child[1] += 1
+            if index < len(child):
+                child[index] += 1
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            children = [(values, list(child)) for values, child in self._children.items()]
+        for values, child in sorted(children):
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, child[2:]):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_labels(self.labelnames, values, le)} {_format_value(cumulative)}"
+            yield f"{self.name}_bucket{_labels(self.labelnames, values, _INF_BOUND)} {_format_value(child[1])}"
+            yield f"{self.name}_sum{_labels(self.labelnames, values)} {_format_value(child[0])}"
+            yield f"{self.name}_count{_labels(self.labelnames, values)} {_format_value(child[1])}"
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+        self._hooks: dict[str, Callable[[], None]] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.setdefault(metric.name, metric)
+        if existing is not metric:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))  # type: ignore[return-value]
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))  # type: ignore[return-value]
+
+    def histogram(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))  # type: ignore[return-value]
+
+    def on_collect(self, name: str, hook: Callable[[], None]) -> None:
+        """Run ``hook`` before each render; a later hook with the same ``name`` replaces it."""
+
+        with self._lock:
+            self._hooks[name] = hook
+
+    def render(self) -> str:
+        with self._lock:
+            hooks = list(self._hooks.values())
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        for hook in hooks:
+            hook()
+        lines = [line for metric in metrics for line in metric.render()]
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+__all__ = ["CONTENT_TYPE", "DEFAULT_BUCKETS", "REGISTRY", "Counter", "Gauge", "Histogram", "Registry"]
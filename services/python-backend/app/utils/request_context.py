@@ -0,0 +1,79 @@
+"""The HTTP request being handled, for code far below the route (logging, metrics).
+
+:class:`RequestContextMiddleware` stores the ASGI scope in a context
+variable. Starlette's router later records the matched endpoint in that same
+scope, so :func:`route_template` can name the route (``/vault/{record_id}/posts``)
+from anywhere in the request, including sync endpoints running on the
+threadpool, which copy the context. Work handed to other threads, such as
+the write coalescer, runs outside any request.
+"""
+
+from __future__ import annotations
+
+from contextvars import ContextVar
+from typing import Any, Optional
+from weakref import WeakKeyDictionary
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+UNMATCHED = "unmatched"
+
+_current_scope: ContextVar[Optional[Scope]] = ContextVar("agent_spark_request_scope", default=None)
+_route_tables: WeakKeyDictionary[Any, tuple[dict[Any, str], frozenset[str]]] = WeakKeyDictionary()
+
+
+def _tables(app: Any) -> tuple[dict[Any, str], frozenset[str]]:
+    tables = _route_tables.get(app)
+    if tables is None:
+        endpoints: dict[Any, str] = {}
+        static: set[str] = set()
+        for route in app.routes:
+            path = getattr(route, "path", None)
+            if path is None:
+                continue
+            endpoint = getattr(route, "endpoint", None)
+            if endpoint is not None:
+                endpoints.setdefault(endpoint, path)
+            if "{" not in path:
+                static.add(path)
+        tables = _route_tables[app] = (endpoints, frozenset(static))
+    return tables
+
+
+def route_template(scope: Scope) -> str:
+    """The path template of the route handling ``scope``, or ``unmatched``."""
+
+    endpoints, static = _tables(scope["app"])
+    endpoint = scope.get("endpoint")
+    if endpoint is not None and endpoint in endpoints:
+        return endpoints[endpoint]
+    # Answered by a middleware before routing (cache hit, 304).
+    path = scope["path"]
+    return path if path in static else UNMATCHED
+
+
+def current_route() -> Optional[str]:
+    """``"METHOD /template"`` of the request being handled, if any."""
+
+    scope = _current_scope.get()
+    if scope is None:
+        return None
+    return f"{scope.get('method', scope['type'].upper())} {route_template(scope)}"
+
+
+class RequestContextMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+        token = _current_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_scope.reset(token)
+
+
+__all__ = ["UNMATCHED", "RequestContextMiddleware", "current_route", "route_template"]
@@ -0,0 +1,6 @@
+"""Performance benchmarks for the Python backend.
+
+Run ``python -m benchmarks --help`` from ``services/python-backend``. The
+modules here are deliberately not named ``test_*`` so pytest never collects
+them; see ``benchmarks/README.md``.
+"""
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import sys
+from pathlib import Path
+
+from benchmarks.compare import format_comparison
+from benchmarks.datagen import SIZES, DatasetSpec, ensure_dataset, generate_dataset, parse_size
+from benchmarks.harness import Measurement, environment, format_table, load_results, write_results
+from benchmarks.jobs import bench_legacy_import, bench_scheduled_generate
+from benchmarks.routes import run_routes, select_routes
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+logging.getLogger("app").setLevel(logging.WARNING)
+logger = logging.getLogger("benchmarks")
+
+BENCH_DIR = Path(__file__).resolve().parent
+
+
+def _levels(value: str) -> list[int]:
+    levels = [int(level) for level in value.split(",") if level.strip()]
+    if not levels or min(levels) < 1:
+        raise argparse.ArgumentTypeError("concurrency must be a comma-separated list of positive integers")
+    return levels
+
+
+def _size_label(rows: int) -> str:
+    return next((label for label, count in SIZES.items() if count == rows), str(rows))
+
+
+def _spec(args: argparse.Namespace) -> DatasetSpec:
+    return DatasetSpec(rows=parse_size(args.size), seed=args.seed, span_days=args.span_days)
+
+
+def _db_path(args: argparse.Namespace, spec: DatasetSpec) -> Path:
+    return args.db or BENCH_DIR / "data" / f"bench-{_size_label(spec.rows)}-s{spec.seed}.sqlite"
+
+
+def _progress(table: str, done: int, total: int) -> None:
+    if done == total or done % 100_000 == 0:
+        logger.info("%s: %s/%s rows", table, done, total)
+
+
+def cmd_seed(args: argparse.Namespace) -> None:
+    spec = _spec(args)
+    path = _db_path(args, spec)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if args.force:
+        dataset = generate_dataset(path, spec, chunk_size=args.chunk_size, progress=_progress)
+    else:
+        dataset = ensure_dataset(path, spec, chunk_size=args.chunk_size, progress=_progress)
+    logger.info("Dataset ready at %s: %s", dataset.path, dataset.counts)
+
+
+def cmd_run(args: argparse.Namespace) -> None:
+    spec = _spec(args)
+    path = _db_path(args, spec)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    dataset = ensure_dataset(path, spec, chunk_size=args.chunk_size, progress=_progress)
+    overrides = dict(args.set or [])
+    if args.no_response_cache:
+        overrides["response_cache_max_bytes"] = "0"
+    if args.db_async:
+        overrides["db_async"] = "true"
+
+    measurements: list[Measurement] = []
+    if "routes" in args.only:
+        routes = select_routes(args.route)
+        measurements += asyncio.run(
+            run_routes(
+                path,
+                anchor=spec.anchor,
+                routes=routes,
+                concurrency=args.concurrency,
+                requests=args.requests,
+                duration=args.duration,
+                warmup=args.warmup,
+                seed=args.seed,
+                workdir=args.workdir,
+                overrides=overrides,
+                on_result=lambda m: logger.info("%s @%s: %.1f ops/s, p95 %.2f ms", m.name, m.concurrency, m.throughput, m.latency_ms["p95"]),
+            )
+        )
+    if "jobs" in args.only:
+        measurements.append(
+            bench_legacy_import(args.legacy_records, repeats=args.repeats, seed=args.seed, workdir=args.workdir, overrides=overrides)
+        )
+        measurements += bench_scheduled_generate(
+            path, runs=args.generate_runs, concurrency=args.concurrency, workdir=args.workdir, overrides=overrides
+        )
+
+    print(format_table(measurements))
+    commit = (environment()["commit"] or "unknown")[:10]
+    output = args.output or BENCH_DIR / "results" / f"{commit}-{_size_label(spec.rows)}.json"
+    options = {
+        "only": args.only,
+        "routes": args.route or "all",
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "duration": args.duration,
+        "warmup": args.warmup,
+        "legacy_records": args.legacy_records,
+        "repeats": args.repeats,
+        "generate_runs": args.generate_runs,
+        "overrides": overrides,
+    }
+    write_results(output, measurements, dataset=dataset.describe(), options=options)
+    logger.info("Results written to %s", output)
+
+
+def cmd_compare(args: argparse.Namespace) -> None:
+    report, regressions = format_comparison(load_results(args.old), load_results(args.new), args.threshold)
+    print(report)
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+
+def _setting(value: str) -> tuple[str, str]:
+    name, sep, setting = value.partition("=")
+    if not sep or not name:
+        raise argparse.ArgumentTypeError("expected NAME=VALUE")
+    return name, setting
+
+
+def _dataset_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--size", default="10k", help=f"Rows per table: {', '.join(SIZES)} or a number (default: 10k)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--span-days", type=float, default=365.0, help="Time span the rows are spread over")
+    parser.add_argument("--db", type=Path, help="Dataset path (default: benchmarks/data/bench-<size>-s<seed>.sqlite)")
+    parser.add_argument("--chunk-size", type=int, default=10_000, help="Rows per insert transaction while seeding")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    seed = sub.add_parser("seed", help="Generate (or reuse) a synthetic dataset")
+    _dataset_arguments(seed)
+    seed.add_argument("--force", action="store_true", help="Regenerate even if a matching dataset exists")
+    seed.set_defaults(func=cmd_seed)
+
+    run = sub.add_parser("run", help="Benchmark routes and background jobs and write a results file")
+    _dataset_arguments(run)
+    run.add_argument("--only", nargs="+", choices=["routes", "jobs"], default=["routes", "jobs"])
+    run.add_argument("--route", action="append", help="Only routes whose name contains this text (repeatable)")
+    run.add_argument("--concurrency", type=_levels, default=[1, 16], help="Comma-separated levels (default: 1,16)")
+    run.add_argument("--requests", type=int, default=200, help="Requests per route and level (default: 200)")
+    run.add_argument("--duration", type=float, help="Stop each route and level after this many seconds")
+    run.add_argument("--warmup", type=int, default=10, help="Unmeasured requests per route and level")
+    run.add_argument("--legacy-records", type=int, default=10_000, help="Records in the legacy vault file")
+    run.add_argument("--repeats", type=int, default=3, help="Legacy import repetitions")
+    run.add_argument("--generate-runs", type=int, default=100, help="Scheduled generator calls per level")
+    run.add_argument("--no-response-cache", action="store_true", help="Disable the response cache")
+    run.add_argument("--async", dest="db_async", action="store_true", help="Serve the async (aiosqlite) routers")
+    run.add_argument("--set", type=_setting, action="append", metavar="NAME=VALUE", help="Extra AGENT_SPARK_* setting")
+    run.add_argument("--workdir", type=Path, help="Where working copies of the dataset are made")
+    run.add_argument("--output", type=Path, help="Results file (default: benchmarks/results/<commit>-<size>.json)")
+    run.set_defaults(func=cmd_run)
+
+    compare = sub.add_parser("compare", help="Compare two results files")
+    compare.add_argument("old", type=Path)
+    compare.add_argument("new", type=Path)
+    compare.add_argument("--threshold", type=float, default=10.0, help="Percent change counted as a regression")
+    compare.add_argument("--fail-on-regression", action="store_true", help="Exit with status 1 on any regression")
+    compare.set_defaults(func=cmd_compare)
+
+    return parser
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Compare two benchmark result files, e.g. from the base and head commits of a change."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Optional
+
+# Metric -> True when a larger value is better.
+METRICS = {"throughput": True, "p50": False, "p95": False, "p99": False}
+
+
+@dataclass
+class Change:
+    key: str
+    metric: str
+    old: float
+    new: float
+
+    @property
+    def percent(self) -> Optional[float]:
+        if self.old == 0:
+            return None
+        return (self.new - self.old) / self.old * 100
+
+    def regressed(self, threshold: float) -> bool:
+        percent = self.percent
+        if percent is None:
+            return False
+        return -percent > threshold if METRICS[self.metric] else percent > threshold
+
+
+def _index(document: dict[str, Any]) -> dict[str, dict[str, Any]]:
+    return {f"{result['name']} @{result['concurrency']}": result for result in document["results"]}
+
+
+def _metric(result: dict[str, Any], metric: str) -> float:
+    return result["throughput"] if metric == "throughput" else result["latency_ms"][metric]
+
+
+def compare(old: dict[str, Any], new: dict[str, Any]) -> tuple[list[Change], list[str], list[str]]:
+    """Per-metric changes for benchmarks in both files, plus keys only in ``old`` / only in ``new``."""
+
+    before, after = _index(old), _index(new)
+    changes = [
+        Change(key, metric, _metric(before[key], metric), _metric(after[key], metric))
+        for key in before
+        if key in after
+        for metric in METRICS
+    ]
+    return changes, sorted(set(before) - set(after)), sorted(set(after) - set(before))
+
+
+def _label(document: dict[str, Any]) -> str:
+    environment = document.get("environment") or {}
+    commit = (environment.get("commit") or "unknown")[:10]
+    return commit + ("+dirty" if environment.get("dirty") else "")
+
+
+def format_comparison(old: dict[str, Any], new: dict[str, Any], threshold: float) -> tuple[str, list[Change]]:
+    changes, removed, added = compare(old, new)
+    regressions = [change for change in changes if change.regressed(threshold)]
+    lines = [f"{_label(old)} -> {_label(new)} (regression threshold {threshold:g}%)"]
+    if (old.get("dataset") or {}).get("counts") != (new.get("dataset") or {}).get("counts"):
+        lines.append("warning: the two runs used different datasets")
+    header = f"{'benchmark':<48} {'metric':<10} {'old':>10} {'new':>10} {'change':>9}"
+    lines += [header, "-" * len(header)]
+    for change in changes:
+        percent = change.percent
+        marker = "  <-- regression" if change in regressions else ""
+        shown = "n/a" if percent is None else f"{percent:+.1f}%"
+        lines.append(f"{change.key:<48} {change.metric:<10} {change.old:>10.2f} {change.new:>10.2f} {shown:>9}{marker}")
+    lines += [f"only in old: {key}" for key in removed]
+    lines += [f"only in new: {key}" for key in added]
+    lines.append(f"{len(regressions)} regression(s)")
+    return "\n".join(lines), regressions
+
+
+__all__ = ["METRICS", "Change", "compare", "format_comparison"]
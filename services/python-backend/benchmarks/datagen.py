@@ -0,0 +1,281 @@
+"""Seeded synthetic dataset for the benchmarks.
+
+``generate_dataset`` fills ``agents``, ``posts``, ``ritual_logs`` and
+``vault_records`` (with their ``vault_posts``) through the migrated schema, so
+search, rollup and change-tracking triggers fire exactly as they do for real
+writes. The same seed, size and anchor always produce the same rows.
+Timestamps rise with insertion order, spread over ``span_days`` before a
+fixed anchor, like data that accumulated over time; time-window benchmarks
+are relative to the anchor, not the clock.
+
+A manifest is written next to the database (``<db>.json``);
+:func:`ensure_dataset` reuses a database whose manifest matches the request
+instead of regenerating it, which matters at the ``10m`` size.
+"""
+
+from __future__ import annotations
+
+import logging
+import random
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+from uuid import UUID
+
+import orjson
+from sqlalchemy import insert
+from sqlalchemy.engine import Connection
+
+from app.db.migrate import current_version, run_migrations
+from app.db.session import get_engine, reset_engine
+from app.models.agent import Agent
+from app.models.post import Post
+from app.models.ritual import RitualLog
+from app.models.vault import VaultPost, VaultRecord
+from benchmarks.harness import configure, remove_database
+
+logger = logging.getLogger(__name__)
+
+SIZES = {"10k": 10_000, "1m": 1_000_000, "10m": 10_000_000}
+DATASET_FORMAT = 1
+
+THEMES = ("dawn", "dusk", "ember", "tide", "lantern", "thread", "hollow", "signal", "bloom", "static")
+EVENT_TYPES = ("wake", "reflect", "dream", "sync", "rest", "spark")
+EMOTIONS = ("calm", "joy", "grief", "awe", "fear", "longing")
+WORDS = (
+    "quiet light river stone ember signal memory thread window garden static bloom voice ash orbit lantern "
+    "harbor tide echo hollow morning ritual spark circuit dust mirror field wire moss salt vessel"
+).split()
+
+Rows = list[dict[str, Any]]
+
+
+def parse_size(value: str) -> int:
+    """``10k``/``1m``/``10m`` or a plain row count."""
+
+    label = value.strip().lower()
+    if label in SIZES:
+        return SIZES[label]
+    count = int(label.replace("_", ""))
+    if count < 1:
+        raise ValueError("Dataset size must be at least 1 row")
+    return count
+
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    rows: int
+    seed: int = 1
+    anchor: datetime = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    span_days: float = 365.0
+    posts_per_record: int = 2
+
+    @property
+    def agents(self) -> int:
+        return max(10, self.rows // 100)
+
+
+@dataclass
+class Dataset:
+    path: Path
+    spec: DatasetSpec
+    counts: dict[str, int]
+    schema_version: int
+    seconds: float
+
+    def describe(self) -> dict[str, Any]:
+        return {
+            "format": DATASET_FORMAT,
+            "path": str(self.path),
+            **asdict(self.spec),
+            "anchor": self.spec.anchor.isoformat(),
+            "counts": self.counts,
+            "schema_version": self.schema_version,
+            "generate_seconds": round(self.seconds, 3),
+        }
+
+
+def manifest_path(db_path: Path) -> Path:
+    return db_path.with_name(db_path.name + ".json")
+
+
+class _Generator:
+    def __init__(self, spec: DatasetSpec) -> None:
+        self.spec = spec
+        self.rng = random.Random(spec.seed)
+        self.start = spec.anchor - timedelta(days=spec.span_days)
+        self.agent_ids: list[str] = []
+
+    def uuid(self) -> str:
+        return str(UUID(int=self.rng.getrandbits(128), version=4))
+
+    def words(self, low: int, high: int) -> str:
+        return " ".join(self.rng.choices(WORDS, k=self.rng.randint(low, high)))
+
+    def created_at(self, index: int, total: int) -> datetime:
+        fraction = (index + self.rng.random()) / total
+        return self.start + timedelta(days=self.spec.span_days * fraction)
+
+    def agent_id(self) -> Optional[str]:
+        return None if self.rng.random() < 0.1 else self.rng.choice(self.agent_ids)
+
+    def agents(self, start: int, stop: int) -> Rows:
+        rows = []
+        for index in range(start, stop):
+            agent_id = self.uuid()
+            self.agent_ids.append(agent_id)
+            rows.append(
+                {
+                    "id": agent_id,
+                    "name": f"agent-{index:07d}",
+                    "traits": {"temperament": self.rng.choice(EMOTIONS), "focus": self.rng.choice(THEMES)},
+                    "created_at": self.created_at(index, self.spec.agents),
+                }
+            )
+        return rows
+
+    def posts(self, start: int, stop: int) -> Rows:
+        return [
+            {
+                "id": self.uuid(),
+                "agent_id": self.agent_id(),
+                "theme": self.rng.choice(THEMES),
+                "content": {"body": self.words(6, 30), "mood": self.rng.choice(EMOTIONS)},
+                "created_at": self.created_at(index, self.spec.rows),
+            }
+            for index in range(start, stop)
+        ]
+
+    def ritual_logs(self, start: int, stop: int) -> Rows:
+        rows = []
+        for index in range(start, stop):
+            rows.append(
+                {
+                    "id": self.uuid(),
+                    "agent_id": self.agent_id(),
+                    "event_type": self.rng.choice(EVENT_TYPES),
+                    "emotion": self.rng.choice(EMOTIONS) if self.rng.random() < 0.8 else None,
+                    "context": self.words(2, 8) if self.rng.random() < 0.5 else None,
+                    "text": self.words(4, 24),
+                    "created_at": self.created_at(index, self.spec.rows),
+                }
+            )
+        return rows
+
+    def vault(self, start: int, stop: int) -> tuple[Rows, Rows]:
+        records: Rows = []
+        posts: Rows = []
+        for index in range(start, stop):
+            record_id = self.uuid()
+            theme = self.rng.choice(THEMES)
+            created_at = self.created_at(index, self.spec.rows)
+            records.append({"id": record_id, "theme": theme, "created_at": created_at})
+            count = self.rng.randint(1, max(1, 2 * self.spec.posts_per_record - 1))
+            posts.extend(
+                {
+                    "record_id": record_id,
+                    "seq": seq,
+                    "content": {"theme": theme, "title": self.words(2, 4), "body": self.words(10, 40)},
+                    "created_at": created_at,
+                }
+                for seq in range(count)
+            )
+        return records, posts
+
+
+def _chunks(total: int, size: int) -> Iterator[tuple[int, int]]:
+    for start in range(0, total, size):
+        yield start, min(total, start + size)
+
+
+def _insert(connection: Connection, model: Any, rows: Rows) -> int:
+    if rows:
+        with connection.begin():
+            connection.execute(insert(model.__table__), rows)
+    return len(rows)
+
+
+def generate_dataset(
+    db_path: Path,
+    spec: DatasetSpec,
+    *,
+    chunk_size: int = 10_000,
+    progress: Optional[Callable[[str, int, int], None]] = None,
+) -> Dataset:
+    """Create a fresh database at ``db_path`` filled according to ``spec``."""
+
+    configure(db_path, db_path.parent)
+    remove_database(db_path)
+    manifest_path(db_path).unlink(missing_ok=True)
+    run_migrations()
+
+    generator = _Generator(spec)
+    counts = dict.fromkeys(("agents", "posts", "ritual_logs", "vault_records", "vault_posts"), 0)
+    started = time.perf_counter()
+    engine = get_engine()
+    with engine.connect() as connection:
+        for table, total, build in (
+            ("agents", spec.agents, generator.agents),
+            ("posts", spec.rows, generator.posts),
+            ("ritual_logs", spec.rows, generator.ritual_logs),
+            ("vault_records", spec.rows, None),
+        ):
+            for start, stop in _chunks(total, chunk_size):
+                if build is None:
+                    records, posts = generator.vault(start, stop)
+                    counts["vault_records"] += _insert(connection, VaultRecord, records)
+                    counts["vault_posts"] += _insert(connection, VaultPost, posts)
+                else:
+                    model = {"agents": Agent, "posts": Post, "ritual_logs": RitualLog}[table]
+                    counts[table] += _insert(connection, model, build(start, stop))
+                if progress is not None:
+                    progress(table, stop, total)
+        connection.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+    version, _ = current_version(engine)
+    reset_engine()
+
+    dataset = Dataset(db_path, spec, counts, version, time.perf_counter() - started)
+    manifest_path(db_path).write_bytes(orjson.dumps(dataset.describe(), option=orjson.OPT_INDENT_2))
+    return dataset
+
+
+def load_dataset(db_path: Path) -> Optional[Dataset]:
+    try:
+        manifest = orjson.loads(manifest_path(db_path).read_bytes())
+    except (FileNotFoundError, orjson.JSONDecodeError):
+        return None
+    if manifest.get("format", DATASET_FORMAT) != DATASET_FORMAT or not db_path.exists():
+        return None
+    spec = DatasetSpec(
+        rows=manifest["rows"],
+        seed=manifest["seed"],
+        anchor=datetime.fromisoformat(manifest["anchor"]),
+        span_days=manifest["span_days"],
+        posts_per_record=manifest["posts_per_record"],
+    )
+    return Dataset(db_path, spec, manifest["counts"], manifest["schema_version"], manifest["generate_seconds"])
+
+
+def ensure_dataset(db_path: Path, spec: DatasetSpec, **kwargs: Any) -> Dataset:
+    """Reuse the dataset at ``db_path`` if it was generated from ``spec``, otherwise regenerate it."""
+
+    existing = load_dataset(db_path)
+    if existing is not None and existing.spec == spec:
+        logger.info("Reusing dataset %s (%s rows per table)", db_path, spec.rows)
+        return existing
+    logger.info("Generating dataset %s (%s rows per table, seed %s)", db_path, spec.rows, spec.seed)
+    return generate_dataset(db_path, spec, **kwargs)
+
+
+__all__ = [
+    "SIZES",
+    "Dataset",
+    "DatasetSpec",
+    "ensure_dataset",
+    "generate_dataset",
+    "load_dataset",
+    "manifest_path",
+    "parse_size",
+]
@@ -0,0 +1,185 @@
+"""Shared plumbing: pointing the app at a benchmark database and recording results."""
+
+from __future__ import annotations
+
+import math
+import os
+import platform
+import sqlite3
+import subprocess
+import sys
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from importlib import metadata
+from pathlib import Path
+from typing import Any, Optional, Sequence
+
+import orjson
+
+from app.config import get_settings
+from app.db.session import reset_engine
+
+RESULTS_FORMAT = 1
+_PACKAGES = ("fastapi", "starlette", "sqlalchemy", "pydantic", "httpx", "orjson", "aiosqlite")
+
+
+def configure(db_path: Path, data_dir: Path, **overrides: Any) -> None:
+    """Point settings at ``db_path`` the way the test fixtures do; ``overrides`` become env vars."""
+
+    get_settings.cache_clear()
+    reset_engine()
+    os.environ["AGENT_SPARK_DB_PATH"] = str(db_path)
+    os.environ["AGENT_SPARK_DATA_DIR"] = str(data_dir)
+    os.environ["AGENT_SPARK_LEGACY_VAULT_PATH"] = str(data_dir / "vault.json")
+    os.environ["AGENT_SPARK_DEV_MODE"] = "true"
+    os.environ["AGENT_SPARK_SCHEDULER_ENABLED"] = "false"
+    for name, value in overrides.items():
+        os.environ[f"AGENT_SPARK_{name.upper()}"] = value if isinstance(value, str) else orjson.dumps(value).decode()
+
+
+def remove_database(db_path: Path) -> None:
+    for suffix in ("", "-wal", "-shm", "-journal"):
+        db_path.with_name(db_path.name + suffix).unlink(missing_ok=True)
+
+
+def percentile(sorted_values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+@dataclass
+class Measurement:
+    """One benchmark's outcome; ``name`` plus ``concurrency`` identify it across runs."""
+
+    name: str
+    kind: str
+    concurrency: int
+    operations: int
+    errors: int
+    seconds: float
+    throughput: float
+    latency_ms: dict[str, float]
+    extra: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def key(self) -> str:
+        return f"{self.name} @{self.concurrency}"
+
+
+def summarize(
+    name: str,
+    kind: str,
+    latencies: Sequence[float],
+    *,
+    seconds: float,
+    errors: int = 0,
+    concurrency: int = 1,
+    **extra: Any,
+) -> Measurement:
+    """Build a :class:`Measurement` from per-operation latencies in seconds."""
+
+    ordered = sorted(latencies)
+    millis = {
+        "mean": sum(ordered) / len(ordered) * 1000 if ordered else 0.0,
+        "p50": percentile(ordered, 50) * 1000,
+        "p95": percentile(ordered, 95) * 1000,
+        "p99": percentile(ordered, 99) * 1000,
+        "max": (ordered[-1] if ordered else 0.0) * 1000,
+    }
+    return Measurement(
+        name=name,
+        kind=kind,
+        concurrency=concurrency,
+        operations=len(ordered),
+        errors=errors,
+        seconds=seconds,
+        throughput=len(ordered) / seconds if seconds > 0 else 0.0,
+        latency_ms={key: round(value, 3) for key, value in millis.items()},
+        extra=extra,
+    )
+
+
+def _git(*args: str) -> Optional[str]:
+    try:
+        completed = subprocess.run(
+            ["git", *args], cwd=Path(__file__).parent, capture_output=True, text=True, check=True, timeout=10
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return completed.stdout.strip()
+
+
+def _version(package: str) -> Optional[str]:
+    try:
+        return metadata.version(package)
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def environment() -> dict[str, Any]:
+    return {
+        "commit": _git("rev-parse", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--", ".")),
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "sqlite": sqlite3.sqlite_version,
+        "packages": {package: _version(package) for package in _PACKAGES},
+    }
+
+
+def write_results(
+    path: Path,
+    measurements: Sequence[Measurement],
+    *,
+    dataset: Optional[dict[str, Any]] = None,
+    options: Optional[dict[str, Any]] = None,
+) -> dict[str, Any]:
+    document = {
+        "format": RESULTS_FORMAT,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "environment": environment(),
+        "dataset": dataset,
+        "options": options or {},
+        "results": [asdict(measurement) for measurement in measurements],
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(orjson.dumps(document, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS, default=str))
+    return document
+
+
+def load_results(path: Path) -> dict[str, Any]:
+    document = orjson.loads(path.read_bytes())
+    if document.get("format") != RESULTS_FORMAT:
+        raise ValueError(f"{path} is not a benchmark results file (format {document.get('format')!r})")
+    return document
+
+
+def format_table(measurements: Sequence[Measurement]) -> str:
+    header = f"{'benchmark':<44} {'conc':>4} {'ops':>7} {'err':>5} {'ops/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+    lines = [header, "-" * len(header)]
+    for m in measurements:
+        lines.append(
+            f"{m.name:<44} {m.concurrency:>4} {m.operations:>7} {m.errors:>5} {m.throughput:>10.1f} "
+            f"{m.latency_ms['p50']:>9.2f} {m.latency_ms['p95']:>9.2f} {m.latency_ms['p99']:>9.2f}"
+        )
+    return "\n".join(lines)
+
+
+__all__ = [
+    "Measurement",
+    "configure",
+    "environment",
+    "format_table",
+    "load_results",
+    "percentile",
+    "remove_database",
+    "summarize",
+    "write_results",
+]
@@ -0,0 +1,136 @@
+"""Benchmarks for the background paths: the legacy vault import and the scheduled generator."""
+
+from __future__ import annotations
+
+import random
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Optional, Sequence
+
+import orjson
+
+from app.config import get_settings
+from app.db.legacy import migrate_legacy_vault
+from app.db.migrate import run_migrations
+from app.db.session import reset_engine, session_scope
+from app.db.writer import shutdown_write_coalescer
+from app.engine.scheduler import _scheduled_generate
+from app.engine.workers import shutdown_generator_engine
+from benchmarks.datagen import THEMES, WORDS
+from benchmarks.harness import Measurement, configure, summarize
+
+
+def write_legacy_vault(path: Path, records: int, *, seed: int = 1, posts_per_record: int = 2) -> int:
+    """Write a legacy ``vault.json`` list of ``records`` records; returns its size in bytes."""
+
+    rng = random.Random(seed)
+    with path.open("wb") as handle:
+        handle.write(b"[")
+        for index in range(records):
+            posts = [
+                {"title": " ".join(rng.choices(WORDS, k=3)), "body": " ".join(rng.choices(WORDS, k=rng.randint(10, 40)))}
+                for _ in range(rng.randint(1, max(1, 2 * posts_per_record - 1)))
+            ]
+            if index:
+                handle.write(b",\n")
+            handle.write(orjson.dumps({"theme": rng.choice(THEMES), "posts": posts}))
+        handle.write(b"]\n")
+    return path.stat().st_size
+
+
+def bench_legacy_import(
+    records: int,
+    *,
+    repeats: int = 3,
+    seed: int = 1,
+    workdir: Optional[Path] = None,
+    overrides: Optional[dict[str, Any]] = None,
+) -> Measurement:
+    """Time ``migrate_legacy_vault`` importing ``records`` records into an empty database, ``repeats`` times."""
+
+    latencies: list[float] = []
+    size = 0
+    for _ in range(repeats):
+        with tempfile.TemporaryDirectory(prefix="agent-spark-bench-", dir=workdir) as scratch:
+            root = Path(scratch)
+            configure(root / "legacy.sqlite", root, **(overrides or {}))
+            run_migrations()
+            size = write_legacy_vault(get_settings().legacy_vault_path, records, seed=seed)
+            started = time.perf_counter()
+            with session_scope() as session:
+                if not migrate_legacy_vault(session):
+                    raise RuntimeError("Legacy import did not run")
+            latencies.append(time.perf_counter() - started)
+            shutdown_write_coalescer()
+            reset_engine()
+    best = min(latencies)
+    return summarize(
+        "migrate_legacy_vault",
+        "job",
+        latencies,
+        seconds=sum(latencies),
+        records=records,
+        file_bytes=size,
+        records_per_second=round(records / best, 1),
+        chunk_size=get_settings().legacy_import_chunk_size,
+    )
+
+
+def bench_scheduled_generate(
+    db_path: Optional[Path],
+    *,
+    runs: int = 200,
+    concurrency: Sequence[int] = (1,),
+    warmup: int = 2,
+    workdir: Optional[Path] = None,
+    overrides: Optional[dict[str, Any]] = None,
+) -> list[Measurement]:
+    """Time ``_scheduled_generate`` end to end: the generator pool round trip plus the vault write.
+
+    Runs against a copy of ``db_path`` (or an empty database). Concurrency
+    above 1 calls the job from several threads at once, which is what
+    overlapping schedules or several replicas would do.
+    """
+
+    measurements = []
+    with tempfile.TemporaryDirectory(prefix="agent-spark-bench-", dir=workdir) as scratch:
+        root = Path(scratch)
+        working_db = root / (db_path.name if db_path else "scheduled.sqlite")
+        if db_path is not None:
+            shutil.copyfile(db_path, working_db)
+        configure(working_db, root, **(overrides or {}))
+        run_migrations()
+        try:
+            for _ in range(warmup):
+                _scheduled_generate()
+
+            def timed(_: int) -> float:
+                sent = time.perf_counter()
+                _scheduled_generate()
+                return time.perf_counter() - sent
+
+            for level in concurrency:
+                started = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=level) as pool:
+                    latencies = list(pool.map(timed, range(runs)))
+                measurements.append(
+                    summarize(
+                        "_scheduled_generate",
+                        "job",
+                        latencies,
+                        seconds=time.perf_counter() - started,
+                        concurrency=level,
+                        generator_workers=get_settings().generator_workers,
+                    )
+                )
+        finally:
+            shutdown_generator_engine()
+            shutdown_write_coalescer()
+            reset_engine()
+    return measurements
+
+
+__all__ = ["bench_legacy_import", "bench_scheduled_generate", "write_legacy_vault"]
@@ -0,0 +1,297 @@
+"""HTTP route benchmarks, driven in-process through ``httpx.ASGITransport``.
+
+Each :class:`Route` builds one request at a time from a seeded RNG and a
+:class:`Context` sampled from the dataset (agent and vault ids, page
+cursors, the dataset anchor), so every run issues the same request mix.
+Requests go through the full middleware stack: CORS, conditional GETs and
+the response cache all count, as they would for a real client. Pass
+``response_cache_max_bytes=0`` as an override to measure the handlers alone.
+
+``/events`` and ``/ws`` are long-lived streams with no per-request latency
+and are not covered here.
+
+Writes land in a copy of the dataset, so the source database can be reused.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import shutil
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, NamedTuple, Optional, Sequence
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import select
+
+from app.api.pagination import NEXT_CURSOR_HEADER
+from app.db.session import get_read_sessionmaker
+from app.main import create_app, lifespan as app_lifespan
+from app.models.agent import Agent
+from app.models.vault import VaultRecord
+from benchmarks.datagen import EMOTIONS, EVENT_TYPES, THEMES, WORDS
+from benchmarks.harness import Measurement, configure, summarize
+
+logger = logging.getLogger(__name__)
+
+
+class Request(NamedTuple):
+    path: str
+    params: Optional[dict[str, Any]] = None
+    json: Any = None
+
+
+@dataclass
+class Context:
+    anchor: datetime
+    agent_ids: list[str] = field(default_factory=list)
+    vault_ids: list[str] = field(default_factory=list)
+    cursors: dict[str, str] = field(default_factory=dict)
+
+    def since(self, **delta: float) -> str:
+        return (self.anchor - timedelta(**delta)).isoformat()
+
+
+@dataclass(frozen=True)
+class Route:
+    name: str
+    method: str
+    build: Callable[[Context, random.Random], Request]
+    ok: tuple[int, ...] = (200,)
+    # Caps the request count for routes whose cost grows with the dataset.
+    max_requests: Optional[int] = None
+
+
+def _get(name: str, build: Callable[[Context, random.Random], Request]) -> Route:
+    return Route(name, "GET", build)
+
+
+def _post(name: str, build: Callable[[Context, random.Random], Request]) -> Route:
+    return Route(name, "POST", build, ok=(201, 207))
+
+
+def _page(path: str) -> Callable[[Context, random.Random], Request]:
+    return lambda ctx, rng: Request(path, {"cursor": ctx.cursors[path]} if path in ctx.cursors else None)
+
+
+def _words(rng: random.Random, count: int) -> str:
+    return " ".join(rng.choices(WORDS, k=count))
+
+
+def _agent(ctx: Context, rng: random.Random) -> Optional[str]:
+    return rng.choice(ctx.agent_ids) if ctx.agent_ids else None
+
+
+def _ritual(ctx: Context, rng: random.Random) -> dict[str, Any]:
+    return {
+        "agent_id": _agent(ctx, rng),
+        "event_type": rng.choice(EVENT_TYPES),
+        "emotion": rng.choice(EMOTIONS),
+        "text": _words(rng, 12),
+    }
+
+
+def _quickpost(ctx: Context, rng: random.Random) -> dict[str, Any]:
+    return {"theme": rng.choice(THEMES), "agent_id": _agent(ctx, rng), "content": {"body": _words(rng, 16)}}
+
+
+ROUTES: tuple[Route, ...] = (
+    _get("GET /health", lambda ctx, rng: Request("/health")),
+    _get("GET /health/writes", lambda ctx, rng: Request("/health/writes")),
+    _get("GET /health/events", lambda ctx, rng: Request("/health/events")),
+    _get("GET /health/cache", lambda ctx, rng: Request("/health/cache")),
+    _get("GET /health/generator", lambda ctx, rng: Request("/health/generator")),
+    _get("GET /scheduler/status", lambda ctx, rng: Request("/scheduler/status")),
+    _get("GET /agents", lambda ctx, rng: Request("/agents")),
+    _get("GET /agents?cursor", _page("/agents")),
+    _get("GET /posts", lambda ctx, rng: Request("/posts")),
+    _get("GET /posts?cursor", _page("/posts")),
+    _get("GET /posts?agent_id", lambda ctx, rng: Request("/posts", {"agent_id": _agent(ctx, rng)})),
+    _get("GET /posts?theme", lambda ctx, rng: Request("/posts", {"theme": rng.choice(THEMES)})),
+    _get("GET /posts?since", lambda ctx, rng: Request("/posts", {"since": ctx.since(days=rng.randint(1, 30))})),
+    _get("GET /rituals", lambda ctx, rng: Request("/rituals")),
+    _get("GET /rituals?cursor", _page("/rituals")),
+    _get(
+        "GET /rituals?event_type&emotion",
+        lambda ctx, rng: Request("/rituals", {"event_type": rng.choice(EVENT_TYPES), "emotion": rng.choice(EMOTIONS)}),
+    ),
+    _get("GET /rituals?agent_id", lambda ctx, rng: Request("/rituals", {"agent_id": _agent(ctx, rng)})),
+    _get(
+        "GET /rituals/stats?bucket=hour",
+        lambda ctx, rng: Request("/rituals/stats", {"bucket": "hour", "since": ctx.since(days=1)}),
+    ),
+    _get(
+        "GET /rituals/stats?bucket=day",
+        lambda ctx, rng: Request("/rituals/stats", {"bucket": "day", "since": ctx.since(days=30)}),
+    ),
+    _get("GET /vault", lambda ctx, rng: Request("/vault")),
+    _get("GET /vault?cursor", _page("/vault")),
+    _get("GET /vault?theme", lambda ctx, rng: Request("/vault", {"theme": rng.choice(THEMES)})),
+    _get("GET /vault?posts_limit&post_count", lambda ctx, rng: Request("/vault", {"posts_limit": 1, "post_count": True})),
+    # Exports stream the whole vault, so they run a few times only.
+    Route("GET /vault/export?format=json", "GET", lambda ctx, rng: Request("/vault/export", {"format": "json"}), max_requests=5),
+    Route(
+        "GET /vault/export?format=ndjson",
+        "GET",
+        lambda ctx, rng: Request("/vault/export", {"format": "ndjson"}),
+        max_requests=5,
+    ),
+    _get("GET /search", lambda ctx, rng: Request("/search", {"q": _words(rng, 2)})),
+    _get("GET /search?prefix", lambda ctx, rng: Request("/search", {"q": rng.choice(WORDS)[:3] + "*"})),
+    _get("GET /search?type=post", lambda ctx, rng: Request("/search", {"q": rng.choice(WORDS), "type": "post"})),
+    _get("GET /archive", lambda ctx, rng: Request("/archive")),
+    _get("GET /archive/ritual_logs", lambda ctx, rng: Request("/archive/ritual_logs", {"since": ctx.since(days=30)})),
+    _post("POST /agents", lambda ctx, rng: Request("/agents", json={"name": f"bench-{rng.getrandbits(32):08x}"})),
+    _post(
+        "POST /agents/batch",
+        lambda ctx, rng: Request("/agents/batch", json=[{"name": f"bench-{rng.getrandbits(32):08x}"} for _ in range(25)]),
+    ),
+    _post("POST /rituals", lambda ctx, rng: Request("/rituals", json=_ritual(ctx, rng))),
+    _post("POST /rituals/batch", lambda ctx, rng: Request("/rituals/batch", json=[_ritual(ctx, rng) for _ in range(25)])),
+    _post("POST /quickpost", lambda ctx, rng: Request("/quickpost", json=_quickpost(ctx, rng))),
+    _post(
+        "POST /quickpost/batch", lambda ctx, rng: Request("/quickpost/batch", json=[_quickpost(ctx, rng) for _ in range(25)])
+    ),
+    _post("POST /generate", lambda ctx, rng: Request("/generate", json={"theme": rng.choice(THEMES)})),
+    _post(
+        "POST /generate/batch",
+        lambda ctx, rng: Request("/generate/batch", json=[{"theme": rng.choice(THEMES)} for _ in range(10)]),
+    ),
+    _post(
+        "POST /vault/{id}/posts",
+        lambda ctx, rng: Request(f"/vault/{rng.choice(ctx.vault_ids)}/posts", json={"body": _words(rng, 20)}),
+    ),
+)
+
+
+def select_routes(patterns: Optional[Sequence[str]]) -> list[Route]:
+    """Routes whose name contains any of ``patterns`` (all routes when empty)."""
+
+    if not patterns:
+        return list(ROUTES)
+    selected = [route for route in ROUTES if any(pattern in route.name for pattern in patterns)]
+    if not selected:
+        raise ValueError(f"No benchmark route matches {', '.join(patterns)}")
+    return selected
+
+
+async def load_context(client: AsyncClient, anchor: datetime, sample: int = 200) -> Context:
+    with get_read_sessionmaker()() as session:
+        agent_ids = list(session.scalars(select(Agent.id).order_by(Agent.created_at.desc()).limit(sample)))
+        vault_ids = list(session.scalars(select(VaultRecord.id).order_by(VaultRecord.created_at.desc()).limit(sample)))
+    context = Context(anchor, agent_ids, vault_ids)
+    for path in ("/agents", "/posts", "/rituals", "/vault"):
+        cursor = (await client.get(path)).headers.get(NEXT_CURSOR_HEADER)
+        if cursor:
+            context.cursors[path] = cursor
+    return context
+
+
+async def measure_route(
+    client: AsyncClient,
+    route: Route,
+    context: Context,
+    *,
+    concurrency: int,
+    requests: int,
+    duration: Optional[float] = None,
+    warmup: int = 0,
+    seed: int = 1,
+) -> Measurement:
+    """Issue ``requests`` requests (or as many as fit in ``duration`` seconds) from ``concurrency`` workers."""
+
+    rng = random.Random(f"{seed}:{route.name}")
+    if route.max_requests is not None:
+        requests, warmup = min(requests, route.max_requests), min(warmup, 1)
+    for _ in range(warmup):
+        request = route.build(context, rng)
+        await client.request(route.method, request.path, params=request.params, json=request.json)
+
+    latencies: list[float] = []
+    errors = 0
+    issued = 0
+    statuses: dict[int, int] = {}
+    started = time.perf_counter()
+    deadline = started + duration if duration else None
+
+    async def worker() -> None:
+        nonlocal errors, issued
+        while issued < requests and (deadline is None or time.perf_counter() < deadline):
+            issued += 1
+            request = route.build(context, rng)
+            sent = time.perf_counter()
+            try:
+                response = await client.request(route.method, request.path, params=request.params, json=request.json)
+            except Exception:  # noqa: BLE001 - a failed request is a data point, not a crash
+                logger.exception("%s failed", route.name)
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - sent)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            if response.status_code not in route.ok:
+                errors += 1
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(
+        route.name,
+        "route",
+        latencies,
+        seconds=time.perf_counter() - started,
+        errors=errors,
+        concurrency=concurrency,
+        statuses={str(code): count for code, count in sorted(statuses.items())},
+    )
+
+
+async def run_routes(
+    db_path: Path,
+    *,
+    anchor: Optional[datetime] = None,
+    routes: Optional[Sequence[Route]] = None,
+    concurrency: Sequence[int] = (1, 16),
+    requests: int = 200,
+    duration: Optional[float] = None,
+    warmup: int = 10,
+    seed: int = 1,
+    workdir: Optional[Path] = None,
+    overrides: Optional[dict[str, Any]] = None,
+    on_result: Optional[Callable[[Measurement], None]] = None,
+) -> list[Measurement]:
+    """Benchmark ``routes`` at each concurrency level against a copy of ``db_path``."""
+
+    with tempfile.TemporaryDirectory(prefix="agent-spark-bench-", dir=workdir) as scratch:
+        working_db = Path(scratch) / db_path.name
+        shutil.copyfile(db_path, working_db)
+        configure(working_db, Path(scratch), **(overrides or {}))
+        app = create_app()
+        measurements = []
+        async with app_lifespan(app):
+            async with AsyncClient(transport=ASGITransport(app=app), base_url="http://benchmark") as client:
+                context = await load_context(client, anchor or datetime.now(timezone.utc))
+                for route in routes or ROUTES:
+                    if "{id}" in route.name and not context.vault_ids:
+                        logger.warning("Skipping %s: the dataset has no vault records", route.name)
+                        continue
+                    for level in concurrency:
+                        measurement = await measure_route(
+                            client,
+                            route,
+                            context,
+                            concurrency=level,
+                            requests=requests,
+                            duration=duration,
+                            warmup=warmup,
+                            seed=seed,
+                        )
+                        measurements.append(measurement)
+                        if on_result is not None:
+                            on_result(measurement)
+        return measurements
+
+
+__all__ = ["ROUTES", "Context", "Request", "Route", "load_context", "measure_route", "run_routes", "select_routes"]
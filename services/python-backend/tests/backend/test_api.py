@@ -1,15 +1,21 @@
 from __future__ import annotations
 
+import json
 import os
+import sqlite3
 from pathlib import Path
 
+import orjson
 import pytest
 import pytest_asyncio
 from httpx import ASGITransport, AsyncClient
+from sqlalchemy import select, text
 
 from app.config import get_settings
-from app.db.session import reset_engine
+from app.api.posts import PostRead
+from app.db.session import get_engine, get_read_sessionmaker, reset_engine
 from app.main import create_app, lifespan as app_lifespan
+from app.models.post import Post
 
 
 @pytest_asyncio.fixture()
@@ -59,6 +65,7 @@ async def test_agent_crud(test_client: AsyncClient):
     items = list_response.json()
     assert len(items) == 1
     assert items[0]["id"] == agent["id"]
+    assert items[0]["created_at"] == agent["created_at"]
 
 
 @pytest.mark.asyncio()
@@ -70,7 +77,7 @@ async def test_generate_and_vault_export(test_client: AsyncClient):
 
     vault_resp = await test_client.get("/vault")
     assert vault_resp.status_code == 200
-    assert len(vault_resp.json()) == 1
+    assert [item["created_at"] for item in vault_resp.json()] == [record["created_at"]]
 
     export_resp = await test_client.get("/vault/export")
     assert export_resp.status_code == 200
@@ -90,7 +97,7 @@ async def test_ritual_logging(test_client: AsyncClient):
 
     list_resp = await test_client.get("/rituals")
     assert list_resp.status_code == 200
-    assert len(list_resp.json()) == 1
+    assert [item["created_at"] for item in list_resp.json()] == [ritual["created_at"]]
 
 
 @pytest.mark.asyncio()
@@ -135,3 +142,288 @@ async def test_api_key_required_when_dev_mode_disabled(test_client_with_auth: As
         headers={"X-API-Key": "wrong"},
     )
     assert wrong_key_response.status_code == 401
+
+
+@pytest.mark.asyncio()
+async def test_posts_keyset_pagination(test_client: AsyncClient):
+    for idx in range(7):
+        response = await test_client.post("/quickpost", json={"theme": "page", "content": {"index": idx}})
+        assert response.status_code == 201
+
+    seen: list[str] = []
+    cursor = None
+    pages = 0
+    while True:
+        params = {"limit": 3}
+        if cursor:
+            params["cursor"] = cursor
+        response = await test_client.get("/posts", params=params)
+        assert response.status_code == 200
+        items = response.json()
+        assert len(items) <= 3
+        seen.extend(item["id"] for item in items)
+        pages += 1
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    assert pages == 3
+    assert len(seen) == len(set(seen)) == 7
+
+    invalid = await test_client.get("/posts", params={"cursor": "not-a-cursor"})
+    assert invalid.status_code == 400
+
+
+@pytest.mark.asyncio()
+async def test_vault_export_ndjson_streams_every_record(test_client: AsyncClient):
+    for theme in ("dawn", "dusk", "noon"):
+        response = await test_client.post("/generate", json={"theme": theme})
+        assert response.status_code == 201
+
+    export_resp = await test_client.get("/vault/export", params={"format": "ndjson"})
+    assert export_resp.status_code == 200
+    assert export_resp.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in export_resp.text.splitlines()]
+    assert [line["theme"] for line in lines] == ["noon", "dusk", "dawn"]
+
+    json_resp = await test_client.get("/vault/export")
+    assert [record["theme"] for record in json_resp.json()["records"]] == ["noon", "dusk", "dawn"]
+
+
+@pytest.mark.asyncio()
+async def test_batch_endpoints_report_per_item_results(test_client: AsyncClient):
+    posts = [{"theme": "sync", "content": {"index": idx}} for idx in range(3)]
+    posts.insert(1, {"content": {"missing": "theme"}})
+    posts.extend(["not an object", None])
+    response = await test_client.post("/quickpost/batch", json=posts)
+    assert response.status_code == 207
+    body = response.json()
+    assert body["created"] == 3
+    assert body["failed"] == 3
+    assert [result["status"] for result in body["results"]] == [
+        "created",
+        "invalid",
+        "created",
+        "created",
+        "invalid",
+        "invalid",
+    ]
+    assert all(result["errors"] for result in body["results"][4:])
+
+    listed = await test_client.get("/posts")
+    assert len(listed.json()) == 3
+
+    rituals = [{"event_type": "sync", "emotion": "calm"}, {"event_type": "sync", "text": "second"}]
+    ritual_resp = await test_client.post("/rituals/batch", json=rituals)
+    assert ritual_resp.status_code == 201
+    assert ritual_resp.json()["created"] == 2
+
+    agents_resp = await test_client.post("/agents/batch", json=[{"name": "Echo"}, {"name": "Lumen"}])
+    assert agents_resp.status_code == 201
+    created_ids = {result["id"] for result in agents_resp.json()["results"]}
+    listed_agents = await test_client.get("/agents")
+    assert {agent["id"] for agent in listed_agents.json()} == created_ids
+
+
+@pytest.mark.asyncio()
+async def test_list_filters(test_client: AsyncClient):
+    agent = (await test_client.post("/agents", json={"name": "Echo"})).json()
+    await test_client.post("/quickpost", json={"theme": "dawn", "agent_id": agent["id"]})
+    await test_client.post("/quickpost", json={"theme": "dusk"})
+    await test_client.post("/rituals", json={"event_type": "wake", "emotion": "calm", "agent_id": agent["id"]})
+    await test_client.post("/rituals", json={"event_type": "sleep", "emotion": "calm"})
+
+    posts = (await test_client.get("/posts", params={"agent_id": agent["id"]})).json()
+    assert [post["theme"] for post in posts] == ["dawn"]
+    posts = (await test_client.get("/posts", params={"theme": "dusk"})).json()
+    assert [post["theme"] for post in posts] == ["dusk"]
+    posts = (await test_client.get("/posts", params={"since": "2999-01-01T00:00:00+00:00"})).json()
+    assert posts == []
+    rituals = (await test_client.get("/rituals", params={"emotion": "calm", "event_type": "sleep"})).json()
+    assert [ritual["event_type"] for ritual in rituals] == ["sleep"]
+    rituals = (await test_client.get("/rituals", params={"until": "2000-01-01T00:00:00Z"})).json()
+    assert rituals == []
+
+
+@pytest.mark.asyncio()
+async def test_full_text_search(test_client: AsyncClient):
+    post = (await test_client.post("/quickpost", json={"theme": "dawn", "content": {"body": "A luminous heron at the river"}})).json()
+    await test_client.post("/rituals", json={"event_type": "wake", "text": "heron sighting", "context": "morning walk"})
+    await test_client.post("/rituals", json={"event_type": "sleep", "text": "quiet night"})
+
+    response = await test_client.get("/search", params={"q": "heron"})
+    assert response.status_code == 200
+    results = response.json()
+    assert {result["type"] for result in results} == {"post", "ritual"}
+    assert post["id"] in {result["id"] for result in results}
+    assert any("[heron]" in result["snippet"] for result in results)
+
+    first = await test_client.get("/search", params={"q": "lumin*", "type": "post", "limit": 1})
+    assert [result["id"] for result in first.json()] == [post["id"]]
+    assert "X-Next-Cursor" not in first.headers
+
+    paged = await test_client.get("/search", params={"q": "heron", "limit": 1})
+    assert len(paged.json()) == 1
+    rest = await test_client.get("/search", params={"q": "heron", "limit": 1, "cursor": paged.headers["X-Next-Cursor"]})
+    assert {paged.json()[0]["id"], rest.json()[0]["id"]} == {result["id"] for result in results}
+
+
+@pytest.mark.asyncio()
+async def test_search_indexes_content_that_is_not_strict_json(test_client: AsyncClient):
+    # The stdlib json.dumps wrote NaN and Infinity, which SQLite's JSON functions reject.
+    with get_engine().begin() as connection:
+        connection.execute(
+            text("INSERT INTO posts (id, theme, content, created_at) VALUES ('p1', 't', :content, '2024-01-01 00:00:00')"),
+            {"content": json.dumps({"body": "heron", "ratio": float("nan")})},
+        )
+
+    hits = (await test_client.get("/search", params={"q": "heron", "type": "post"})).json()
+    assert [hit["id"] for hit in hits] == ["p1"]
+
+    assert (await test_client.get("/search", params={"q": 'AND ( "'})).status_code == 200
+
+
+@pytest.mark.asyncio()
+async def test_ritual_stats_follow_inserts(test_client: AsyncClient):
+    agent = (await test_client.post("/agents", json={"name": "Echo"})).json()
+    for emotion in ("calm", "calm", None):
+        await test_client.post("/rituals", json={"event_type": "wake", "emotion": emotion, "agent_id": agent["id"]})
+    await test_client.post("/rituals/batch", json=[{"event_type": "wake", "emotion": "calm"}])
+
+    def totals(stats: list[dict]) -> dict:
+        counts: dict = {}
+        for stat in stats:
+            counts[stat["emotion"]] = counts.get(stat["emotion"], 0) + stat["count"]
+        return counts
+
+    stats = (await test_client.get("/rituals/stats", params={"agent_id": agent["id"], "bucket": "day"})).json()
+    assert totals(stats) == {"calm": 2, None: 1}
+
+    stats = (await test_client.get("/rituals/stats", params={"bucket": "hour"})).json()
+    assert totals(stats) == {"calm": 3, None: 1}
+
+    stats = (await test_client.get("/rituals/stats", params={"since": "2999-01-01T00:00:00Z"})).json()
+    assert stats == []
+
+
+@pytest.mark.asyncio()
+async def test_conditional_get_returns_304_until_the_table_changes(test_client: AsyncClient):
+    await test_client.post("/quickpost", json={"theme": "dawn"})
+    first = await test_client.get("/posts")
+    etag = first.headers["ETag"]
+    assert etag.startswith('W/"')
+    assert "Last-Modified" in first.headers
+
+    cached = await test_client.get("/posts", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+    await test_client.post("/rituals", json={"event_type": "wake"})
+    assert (await test_client.get("/posts", headers={"If-None-Match": etag})).status_code == 304
+
+    await test_client.post("/quickpost/batch", json=[{"theme": "dusk"}])
+    refreshed = await test_client.get("/posts", headers={"If-None-Match": etag})
+    assert refreshed.status_code == 200
+    assert refreshed.headers["ETag"] != etag
+    assert len(refreshed.json()) == 2
+
+
+@pytest.mark.asyncio()
+async def test_response_cache_hits_until_invalidated(test_client: AsyncClient):
+    await test_client.post("/quickpost", json={"theme": "dawn"})
+    first = await test_client.get("/posts", params={"limit": 5, "theme": "dawn"})
+    assert first.headers["X-Cache"] == "MISS"
+    again = await test_client.get("/posts", params={"theme": "dawn", "limit": 5})
+    assert again.headers["X-Cache"] == "HIT"
+    assert again.content == first.content
+    assert again.headers["ETag"] == first.headers["ETag"]
+
+    await test_client.post("/quickpost", json={"theme": "dawn"})
+    refreshed = await test_client.get("/posts", params={"limit": 5, "theme": "dawn"})
+    assert refreshed.headers["X-Cache"] == "MISS"
+    assert len(refreshed.json()) == 2
+
+    stats = (await test_client.get("/health/cache")).json()
+    assert stats["hits"] == 1
+    assert stats["invalidations"] >= 1
+
+
+@pytest.mark.asyncio()
+async def test_response_cache_misses_after_a_write_from_another_process(test_client: AsyncClient, tmp_path: Path):
+    await test_client.post("/quickpost", json={"theme": "dawn"})
+    assert (await test_client.get("/posts")).headers["X-Cache"] == "MISS"
+    assert (await test_client.get("/posts")).headers["X-Cache"] == "HIT"
+
+    with sqlite3.connect(tmp_path / "db.sqlite") as other:
+        other.execute(
+            "INSERT INTO posts (id, agent_id, theme, content, created_at) "
+            "VALUES ('outside', NULL, 'dusk', '{}', '2030-01-01 00:00:00.000000')"
+        )
+
+    refreshed = await test_client.get("/posts")
+    assert refreshed.headers["X-Cache"] == "MISS"
+    assert [post["id"] for post in refreshed.json()][0] == "outside"
+
+
+def test_response_cache_routes_must_be_tracked(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    get_settings.cache_clear()
+    monkeypatch.setenv("AGENT_SPARK_DATA_DIR", str(tmp_path))
+    monkeypatch.setenv("AGENT_SPARK_RESPONSE_CACHE_ROUTES", '["/posts", "/agents/stats"]')
+    try:
+        with pytest.raises(ValueError, match="/agents/stats"):
+            create_app()
+    finally:
+        get_settings.cache_clear()
+
+
+@pytest.mark.asyncio()
+async def test_vault_posts_append_and_preview(test_client: AsyncClient):
+    record = (await test_client.post("/generate", json={"theme": "dawn", "prompt": "first"})).json()
+    for body in ("second", "third"):
+        appended = await test_client.post(f"/vault/{record['id']}/posts", json={"body": body})
+        assert appended.status_code == 201
+    assert appended.json()["seq"] == 2
+    missing = await test_client.post("/vault/nope/posts", json={"body": "lost"})
+    assert missing.status_code == 404
+
+    [full] = (await test_client.get("/vault")).json()
+    assert [post["body"] for post in full["posts"]] == ["first", "second", "third"]
+    assert "post_count" not in full
+
+    [preview] = (await test_client.get("/vault", params={"posts_limit": 1, "post_count": "true"})).json()
+    assert [post["body"] for post in preview["posts"]] == ["first"]
+    assert preview["post_count"] == 3
+    [counted] = (await test_client.get("/vault", params={"posts_limit": 0, "post_count": "true"})).json()
+    assert counted["posts"] == []
+
+    hits = (await test_client.get("/search", params={"q": "third", "type": "vault"})).json()
+    assert [hit["id"] for hit in hits] == [record["id"]]
+    # The theme is in the record's own index and in each post's; it is still one hit.
+    hits = (await test_client.get("/search", params={"q": "dawn", "type": "vault"})).json()
+    assert [hit["id"] for hit in hits] == [record["id"]]
+
+
+@pytest.mark.asyncio()
+async def test_fast_list_encoding_matches_pydantic(test_client: AsyncClient):
+    contents = [{"text": "plain"}, {"nested": {"list": [1, 2.5, None, True]}, "emoji": "\u2728 caf\u00e9"}, {}]
+    for content in contents:
+        assert (await test_client.post("/quickpost", json={"theme": "t", "content": content, "agent_id": "a"})).status_code == 201
+
+    fast = orjson.loads((await test_client.get("/posts")).content)
+    with get_read_sessionmaker()() as session:
+        posts = session.scalars(select(Post).order_by(Post.created_at.desc(), Post.id.desc())).all()
+        encoded = [json.loads(PostRead.from_orm(post).json()) for post in posts]
+    assert fast == encoded
+
+
+@pytest.mark.asyncio()
+async def test_fast_list_encoding_handles_legacy_nan(test_client: AsyncClient):
+    with get_engine().begin() as connection:
+        connection.execute(
+            text("INSERT INTO posts (id, theme, content, created_at) VALUES ('p1', 't', :content, '2024-01-01 00:00:00')"),
+            {"content": json.dumps({"ratio": float("nan"), "bounds": [float("-inf"), float("inf")]})},
+        )
+
+    # orjson.loads, unlike json.loads, rejects NaN, so this fails on invalid output.
+    [item] = orjson.loads((await test_client.get("/posts")).content)
+    assert item["content"] == {"ratio": None, "bounds": [None, None]}
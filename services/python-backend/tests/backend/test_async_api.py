@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+
+from app.config import get_settings
+from app.db.session import reset_engine
+from app.main import create_app, lifespan as app_lifespan
+
+
+@pytest_asyncio.fixture()
+async def async_client(tmp_path: Path):
+    get_settings.cache_clear()
+    reset_engine()
+    os.environ["AGENT_SPARK_DB_PATH"] = str(tmp_path / "db.sqlite")
+    os.environ["AGENT_SPARK_DEV_MODE"] = "true"
+    os.environ["AGENT_SPARK_SCHEDULER_ENABLED"] = "false"
+    os.environ["AGENT_SPARK_DATA_DIR"] = str(tmp_path)
+    os.environ["AGENT_SPARK_DB_ASYNC"] = "true"
+    try:
+        app = create_app()
+        async with app_lifespan(app):
+            transport = ASGITransport(app=app)
+            async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+                yield client
+    finally:
+        os.environ.pop("AGENT_SPARK_DB_ASYNC", None)
+        get_settings.cache_clear()
+
+
+@pytest.mark.asyncio()
+async def test_async_routes_round_trip(async_client: AsyncClient):
+    agent = await async_client.post("/agents", json={"name": "Echo"})
+    assert agent.status_code == 201
+
+    ritual = await async_client.post("/rituals", json={"event_type": "meditation", "agent_id": agent.json()["id"]})
+    assert ritual.status_code == 201
+
+    batch = await async_client.post("/quickpost/batch", json=[{"theme": "a"}, 7, {"theme": "b"}])
+    assert batch.status_code == 207
+    assert (batch.json()["created"], batch.json()["failed"]) == (2, 1)
+
+    generated = await async_client.post("/generate", json={"theme": "dawn"})
+    assert generated.status_code == 201
+
+    assert [item["id"] for item in (await async_client.get("/agents")).json()] == [agent.json()["id"]]
+    assert len((await async_client.get("/rituals")).json()) == 1
+    assert {post["theme"] for post in (await async_client.get("/posts")).json()} == {"a", "b"}
+
+    page = await async_client.get("/posts", params={"limit": 1})
+    assert len(page.json()) == 1
+    assert "X-Next-Cursor" in page.headers
+
+    exported = await async_client.get("/vault/export", params={"format": "ndjson"})
+    assert exported.text.count("\n") == 1
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+import pytest
+from sqlalchemy import select
+
+from app.config import get_settings
+from app.db.session import get_read_sessionmaker, reset_engine
+from app.models.vault import VaultPost
+from benchmarks.compare import format_comparison
+from benchmarks.datagen import DatasetSpec, ensure_dataset, generate_dataset
+from benchmarks.harness import load_results, summarize, write_results
+from benchmarks.routes import run_routes, select_routes
+
+
+@pytest.fixture(autouse=True)
+def reset_settings():
+    yield
+    reset_engine()
+    get_settings.cache_clear()
+
+
+def _vault_posts() -> list[tuple]:
+    with get_read_sessionmaker()() as session:
+        stmt = select(VaultPost.record_id, VaultPost.seq, VaultPost.content).order_by(VaultPost.record_id, VaultPost.seq)
+        return [tuple(row) for row in session.execute(stmt)]
+
+
+def test_dataset_is_seeded_and_reused(tmp_path: Path):
+    spec = DatasetSpec(rows=300, seed=7)
+    first = generate_dataset(tmp_path / "a.sqlite", spec, chunk_size=128)
+    assert {k: v for k, v in first.counts.items() if k != "vault_posts"} == {
+        "agents": 10,
+        "posts": 300,
+        "ritual_logs": 300,
+        "vault_records": 300,
+    }
+    posts = _vault_posts()
+    second = generate_dataset(tmp_path / "b.sqlite", spec)
+    assert second.counts == first.counts
+    assert _vault_posts() == posts
+
+    assert ensure_dataset(tmp_path / "a.sqlite", spec).seconds == first.describe()["generate_seconds"]
+
+
+def test_route_results_round_trip_and_compare(tmp_path: Path):
+    spec = DatasetSpec(rows=50)
+    dataset = generate_dataset(tmp_path / "bench.sqlite", spec)
+    measurements = asyncio.run(
+        run_routes(
+            dataset.path,
+            anchor=spec.anchor,
+            routes=select_routes(["GET /posts", "POST /quickpost"]),
+            concurrency=[4],
+            requests=12,
+            warmup=1,
+        )
+    )
+    assert {m.name for m in measurements} >= {"GET /posts", "GET /posts?cursor", "POST /quickpost"}
+    assert all(m.operations == 12 and m.errors == 0 for m in measurements)
+
+    old = write_results(tmp_path / "old.json", measurements, dataset=dataset.describe())
+    slower = [summarize(m.name, m.kind, [10.0] * m.operations, seconds=120.0, concurrency=m.concurrency) for m in measurements]
+    write_results(tmp_path / "new.json", slower, dataset=dataset.describe())
+    report, regressions = format_comparison(old, load_results(tmp_path / "new.json"), threshold=10)
+    assert {change.key for change in regressions} == {f"{m.name} @4" for m in measurements}
+    assert "regression" in report
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import get_settings
+from app.db.session import reset_engine
+from app.engine.events import RESYNC, EventBus
+from app.main import create_app
+
+
+@pytest.mark.asyncio()
+async def test_slow_subscriber_is_coalesced_to_resync():
+    bus = EventBus(queue_size=2, replay_size=8)
+    subscription = bus.subscribe()
+    for index in range(4):
+        bus.publish("post.created", {"n": index})
+    await asyncio.sleep(0)
+
+    events = [await subscription.get() for _ in range(subscription.queue.qsize())]
+    assert [event.type for event in events] == [RESYNC, "post.created"]
+    assert events[-1].data == {"n": 3}
+    assert bus.stats()["resyncs"] == 1
+
+
+@pytest.mark.asyncio()
+async def test_last_event_id_replays_missed_events():
+    bus = EventBus(queue_size=16, replay_size=3)
+    first = bus.publish("post.created", {"n": 0})
+    for index in range(1, 3):
+        bus.publish("post.created", {"n": index})
+
+    resumed = bus.subscribe(first.id)
+    assert [(await resumed.get()).data for _ in range(2)] == [{"n": 1}, {"n": 2}]
+
+    for index in range(3, 6):
+        bus.publish("post.created", {"n": index})
+    too_old = bus.subscribe(first.id)
+    assert (await too_old.get()).type == RESYNC
+    assert (await bus.subscribe("other-epoch-1").get()).type == RESYNC
+
+
+def test_websocket_receives_created_posts(tmp_path: Path):
+    get_settings.cache_clear()
+    reset_engine()
+    os.environ["AGENT_SPARK_DB_PATH"] = str(tmp_path / "db.sqlite")
+    os.environ["AGENT_SPARK_DEV_MODE"] = "true"
+    os.environ["AGENT_SPARK_SCHEDULER_ENABLED"] = "false"
+    os.environ["AGENT_SPARK_DATA_DIR"] = str(tmp_path)
+    with TestClient(create_app()) as client:
+        with client.websocket_connect("/ws") as socket:
+            assert socket.receive_json()["type"] == "connected"
+            post = client.post("/quickpost", json={"theme": "dawn"}).json()
+            message = socket.receive_json()
+            assert message["type"] == "post.created"
+            assert message["data"]["id"] == post["id"]
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+
+from app.config import get_settings
+from app.db.session import reset_engine
+from app.engine.backends import UnknownBackendError, register_backend
+from app.engine.generator import GenerateRequest
+from app.engine.workers import GeneratorEngine, GeneratorTimeout
+from app.main import create_app, lifespan as app_lifespan
+
+
+def echo_batch(requests):
+    return [{"theme": request.theme, "batch": len(requests)} for request in requests]
+
+
+def slow_batch(requests):
+    time.sleep(30)
+    return [{} for _ in requests]
+
+
+def pause_batch(requests):
+    time.sleep(1)
+    return [{"theme": request.theme} for request in requests]
+
+
+def test_concurrent_submissions_share_backend_calls():
+    register_backend("echo", f"{__name__}:echo_batch")
+    engine = GeneratorEngine(workers=0, timeout_seconds=5, max_batch_size=64, window_ms=20)
+    try:
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            futures = [
+                pool.submit(lambda n=n: engine.submit("echo", [GenerateRequest(f"t{n}")]).result()) for n in range(32)
+            ]
+            results = [future.result() for future in futures]
+        stats = engine.stats()
+    finally:
+        engine.close()
+
+    assert [posts[0]["theme"] for posts in results] == [f"t{n}" for n in range(32)]
+    assert max(posts[0]["batch"] for posts in results) > 1
+    assert stats["calls"] < 32
+    assert stats["requests"] == 32
+
+    with pytest.raises(UnknownBackendError):
+        engine.submit("missing", [GenerateRequest("x")])
+
+
+def test_timed_out_backend_recycles_the_pool():
+    register_backend("slow", f"{__name__}:slow_batch")
+    engine = GeneratorEngine(workers=1, timeout_seconds=2, max_batch_size=8, window_ms=0)
+    try:
+        with pytest.raises(GeneratorTimeout):
+            engine.run("slow", [GenerateRequest("late")])
+        [post] = engine.run("threadlight", [GenerateRequest("dawn", "hello")])
+        stats = engine.stats()
+    finally:
+        engine.close()
+
+    assert post["body"] == "hello"
+    assert stats["timeouts"] == 1
+    assert stats["restarts"] == 1
+
+
+def test_timeout_does_not_count_time_queued_behind_other_calls():
+    register_backend("echo", f"{__name__}:echo_batch")
+    register_backend("pause", f"{__name__}:pause_batch")
+    engine = GeneratorEngine(workers=1, timeout_seconds=1.6, max_batch_size=8, window_ms=0)
+    try:
+        engine.run("echo", [GenerateRequest("warm")])  # start the worker and import this module there
+        first = engine.submit("pause", [GenerateRequest("first")])
+        time.sleep(0.1)
+        # Waits about a second for the first call; only its own second counts against the timeout.
+        [second] = engine.run("pause", [GenerateRequest("second")])
+        [earlier] = first.result()
+        stats = engine.stats()
+    finally:
+        engine.close()
+
+    assert (earlier["theme"], second["theme"]) == ("first", "second")
+    assert stats["timeouts"] == 0
+
+
+@pytest_asyncio.fixture()
+async def test_client(tmp_path: Path):
+    get_settings.cache_clear()
+    reset_engine()
+    os.environ["AGENT_SPARK_DB_PATH"] = str(tmp_path / "db.sqlite")
+    os.environ["AGENT_SPARK_DEV_MODE"] = "true"
+    os.environ["AGENT_SPARK_SCHEDULER_ENABLED"] = "false"
+    os.environ["AGENT_SPARK_DATA_DIR"] = str(tmp_path)
+    app = create_app()
+    async with app_lifespan(app):
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+            yield client
+
+
+@pytest.mark.asyncio()
+async def test_generate_batch_creates_records_in_one_call(test_client: AsyncClient):
+    items = [{"theme": "dawn"}, {"theme": ""}, {"theme": "dusk", "prompt": "hello"}]
+    response = await test_client.post("/generate/batch", json=items)
+    assert response.status_code == 207
+    body = response.json()
+    assert (body["created"], body["failed"]) == (2, 1)
+    assert [result["status"] for result in body["results"]] == ["created", "invalid", "created"]
+
+    vault = (await test_client.get("/vault")).json()
+    assert sorted(record["theme"] for record in vault) == ["dawn", "dusk"]
+    assert {record["posts"][0]["body"] for record in vault} >= {"hello"}
+
+    stats = (await test_client.get("/health/generator")).json()
+    assert stats["calls"] == 1
+    assert stats["requests"] == 2
+
+    unknown = await test_client.post("/generate", json={"theme": "dawn", "backend": "missing"})
+    assert unknown.status_code == 422
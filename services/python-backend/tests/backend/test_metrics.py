@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import os
+import re
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+from apscheduler.events import EVENT_JOB_EXECUTED, EVENT_JOB_SUBMITTED, JobExecutionEvent, JobSubmissionEvent
+from httpx import ASGITransport, AsyncClient
+
+from app.config import get_settings
+from app.db.metrics import statement_kind
+from app.db.session import reset_engine
+from app.engine.scheduler import JOB_RUNS, JOB_SECONDS, _record_job_event
+from app.main import create_app, lifespan as app_lifespan
+from app.utils.metrics import Registry
+
+
+def _sample(text: str, name: str, **labels: str) -> float:
+    selector = ",".join(f'{key}="{value}"' for key, value in labels.items())
+    pattern = "^" + re.escape(f"{name}{{{selector}}}" if labels else name) + r" (\S+)$"
+    match = re.search(pattern, text, re.MULTILINE)
+    assert match, f"{name} {labels} not in metrics"
+    return float(match.group(1))
+
+
+def test_registry_renders_prometheus_text():
+    registry = Registry()
+    requests = registry.counter("demo_total", "Demo counter.", ("route",))
+    latency = registry.histogram("demo_seconds", "Demo latency.", ("route",), buckets=(0.1, 1.0))
+    requests.inc('/a"b')
+    latency.observe(0.05, "/a")
+    latency.observe(0.5, "/a")
+    latency.observe(7.0, "/a")
+
+    text = registry.render()
+    assert "# TYPE demo_seconds histogram" in text
+    assert 'demo_total{route="/a\\"b"} 1' in text
+    assert _sample(text, "demo_seconds_bucket", route="/a", le="0.1") == 1
+    assert _sample(text, "demo_seconds_bucket", route="/a", le="1") == 2
+    assert _sample(text, "demo_seconds_bucket", route="/a", le="+Inf") == 3
+    assert _sample(text, "demo_seconds_sum", route="/a") == pytest.approx(7.55)
+    with pytest.raises(ValueError):
+        registry.counter("demo_total", "Duplicate.")
+    assert [statement_kind(sql) for sql in ("  select 1", "INSERT INTO t", "VACUUM", "")] == [
+        "SELECT",
+        "INSERT",
+        "OTHER",
+        "OTHER",
+    ]
+
+
+def test_scheduler_job_durations_are_recorded():
+    run_time = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    _record_job_event(JobSubmissionEvent(EVENT_JOB_SUBMITTED, "metrics-demo", "default", [run_time]))
+    _record_job_event(JobExecutionEvent(EVENT_JOB_EXECUTED, "metrics-demo", "default", run_time))
+
+    text = "\n".join(list(JOB_SECONDS.samples()) + list(JOB_RUNS.samples()))
+    assert _sample(text, "agent_spark_scheduler_job_duration_seconds_count", job="metrics-demo") == 1
+    assert _sample(text, "agent_spark_scheduler_job_runs_total", job="metrics-demo", outcome="ok") == 1
+
+
+@pytest_asyncio.fixture()
+async def test_client(tmp_path: Path):
+    get_settings.cache_clear()
+    reset_engine()
+    os.environ["AGENT_SPARK_DB_PATH"] = str(tmp_path / "db.sqlite")
+    os.environ["AGENT_SPARK_DEV_MODE"] = "true"
+    os.environ["AGENT_SPARK_SCHEDULER_ENABLED"] = "false"
+    os.environ["AGENT_SPARK_DATA_DIR"] = str(tmp_path)
+    app = create_app()
+    async with app_lifespan(app):
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+            yield client
+
+
+@pytest.mark.asyncio()
+async def test_metrics_endpoint_reports_routes_and_queries(test_client: AsyncClient):
+    before = (await test_client.get("/metrics")).text
+
+    def delta(text: str, name: str, **labels: str) -> float:
+        try:
+            previous = _sample(before, name, **labels)
+        except AssertionError:
+            previous = 0.0
+        return _sample(text, name, **labels) - previous
+
+    assert (await test_client.post("/quickpost", json={"theme": "dawn"})).status_code == 201
+    assert (await test_client.post("/vault/missing/posts", json={"body": "x"})).status_code == 404
+    assert (await test_client.get("/posts")).status_code == 200
+    assert (await test_client.get("/no-such-route")).status_code == 404
+
+    response = await test_client.get("/metrics")
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    assert delta(text, "agent_spark_http_requests_total", method="POST", route="/quickpost", status="201") == 1
+    assert (
+        delta(text, "agent_spark_http_requests_total", method="POST", route="/vault/{record_id}/posts", status="404")
+        == 1
+    )
+    assert delta(text, "agent_spark_http_requests_total", method="GET", route="unmatched", status="404") == 1
+    assert delta(text, "agent_spark_http_request_duration_seconds_count", method="GET", route="/posts") == 1
+    assert delta(text, "agent_spark_db_query_duration_seconds_count", engine="writer", statement="INSERT") >= 1
+    assert delta(text, "agent_spark_db_query_duration_seconds_count", engine="reader", statement="SELECT") >= 1
+    assert delta(text, "agent_spark_db_commit_duration_seconds_count", engine="writer") >= 1
+    assert _sample(text, "agent_spark_db_pool_size", engine="writer") == 1
+    assert _sample(text, "agent_spark_threadpool_capacity") > 0
+
+
+@pytest.mark.asyncio()
+async def test_metrics_can_be_disabled(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    get_settings.cache_clear()
+    reset_engine()
+    monkeypatch.setenv("AGENT_SPARK_DB_PATH", str(tmp_path / "db.sqlite"))
+    monkeypatch.setenv("AGENT_SPARK_DATA_DIR", str(tmp_path))
+    monkeypatch.setenv("AGENT_SPARK_SCHEDULER_ENABLED", "false")
+    monkeypatch.setenv("AGENT_SPARK_METRICS_ENABLED", "false")
+    app = create_app()
+    async with app_lifespan(app):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://testserver") as client:
+            assert (await client.get("/metrics")).status_code == 404
+    reset_engine()
+    get_settings.cache_clear()
@@ -2,17 +2,25 @@ from __future__ import annotations
 
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import sqlite3
+
 import pytest
-from sqlalchemy import Integer, inspect, select
+from sqlalchemy import Integer, func, inspect, select
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.config import get_settings
+from app.db import bulk_import, legacy, migrate
+from app.db.bulk_import import import_legacy_directory
 from app.db.legacy import migrate_legacy_vault
-from app.db.migrate import run_migrations
+from app.db.migrate import LATEST_VERSION, MIGRATIONS, MigrationPlan, current_version, plan_migrations, run_migrations
+from app.db.search import match_expression, search_statement
 from app.db.session import get_engine, get_sessionmaker, reset_engine
-from app.models.vault import VaultRecord
+from app.models.import_checkpoint import ImportCheckpoint
+from app.models.vault import VaultPost, VaultRecord
 from app.db.base import Base
 
 
@@ -44,6 +52,23 @@ def test_migrates_legacy_file(setup_db: Path):
         assert records[0].theme == "aurora"
 
 
+def test_legacy_posts_that_are_not_lists_are_kept_whole(setup_db: Path):
+    legacy_path = Path(os.environ["AGENT_SPARK_LEGACY_VAULT_PATH"])
+    legacy_path.write_text(json.dumps([
+        {"theme": "text", "posts": "hello"},
+        {"theme": "object", "posts": {"x": 1, "y": 2}},
+        {"theme": "none", "posts": None},
+    ]), encoding="utf-8")
+
+    with get_sessionmaker()() as session:
+        assert migrate_legacy_vault(session) is True
+        posts = session.execute(
+            select(VaultRecord.theme, VaultPost.seq, VaultPost.content).join(VaultPost, VaultPost.record_id == VaultRecord.id)
+        ).all()
+        assert sorted(posts) == [("object", 0, {"x": 1, "y": 2}), ("text", 0, "hello")]
+        assert session.scalar(select(func.count()).select_from(VaultRecord)) == 3
+
+
 def test_corrupt_file_moved(setup_db: Path):
     legacy_path = Path(os.environ["AGENT_SPARK_LEGACY_VAULT_PATH"])
     legacy_path.write_text("not json", encoding="utf-8")
@@ -61,7 +86,7 @@ def test_corrupt_file_moved(setup_db: Path):
 def test_run_migrations_creates_new_tables_without_data_loss(setup_db: Path):
     SessionLocal = get_sessionmaker()
     with SessionLocal() as session:
-        record = VaultRecord(theme="aurora", posts=[{"body": "light"}])
+        record = VaultRecord(theme="aurora", posts=[VaultPost(seq=0, content={"body": "light"})])
         session.add(record)
         session.commit()
         existing_id = record.id
@@ -85,3 +110,218 @@ def test_run_migrations_creates_new_tables_without_data_loss(setup_db: Path):
     # Clean up the dynamically declared model from metadata for other tests
     Base.metadata.remove(NewModel.__table__)
     Base.registry._class_registry.pop(NewModel.__name__, None)
+
+
+def test_legacy_import_resumes_from_checkpoint(setup_db: Path, monkeypatch: pytest.MonkeyPatch):
+    legacy_path = Path(os.environ["AGENT_SPARK_LEGACY_VAULT_PATH"])
+    legacy_path.write_text(
+        json.dumps([{"title": f"record-{index}", "entries": [{"body": index}]} for index in range(7)]),
+        encoding="utf-8",
+    )
+    monkeypatch.setenv("AGENT_SPARK_LEGACY_IMPORT_CHUNK_SIZE", "3")
+    get_settings.cache_clear()
+
+    commit_chunk = legacy._commit_chunk
+    calls = []
+
+    def failing_commit(session, rows, checkpoint):
+        calls.append(len(rows))
+        if len(calls) == 2:
+            raise RuntimeError("interrupted")
+        commit_chunk(session, rows, checkpoint)
+
+    monkeypatch.setattr(legacy, "_commit_chunk", failing_commit)
+    SessionLocal = get_sessionmaker()
+    with SessionLocal() as session:
+        with pytest.raises(RuntimeError):
+            migrate_legacy_vault(session)
+        assert session.scalar(select(func.count()).select_from(VaultRecord)) == 3
+        checkpoint = session.scalars(select(ImportCheckpoint)).one()
+        assert checkpoint.records == 3
+
+    monkeypatch.setattr(legacy, "_commit_chunk", commit_chunk)
+    with SessionLocal() as session:
+        assert migrate_legacy_vault(session) is True
+        themes = sorted(session.scalars(select(VaultRecord.theme)).all())
+        assert themes == sorted(f"record-{index}" for index in range(7))
+        assert session.scalars(select(ImportCheckpoint)).all() == []
+    assert not legacy_path.exists()
+
+
+def test_repaired_corrupt_file_skips_records_already_imported(setup_db: Path, monkeypatch: pytest.MonkeyPatch):
+    legacy_path = Path(os.environ["AGENT_SPARK_LEGACY_VAULT_PATH"])
+    records = [{"theme": f"record-{index}"} for index in range(4)]
+    valid = json.dumps(records[:3])
+    legacy_path.write_text(valid[:-1] + ", oops]", encoding="utf-8")
+    monkeypatch.setenv("AGENT_SPARK_LEGACY_IMPORT_CHUNK_SIZE", "2")
+    get_settings.cache_clear()
+
+    SessionLocal = get_sessionmaker()
+    with SessionLocal() as session:
+        assert migrate_legacy_vault(session) is False
+        assert sorted(session.scalars(select(VaultRecord.theme)).all()) == ["record-0", "record-1"]
+        checkpoint = session.scalars(select(ImportCheckpoint)).one()
+        assert checkpoint.records == 2
+        [quarantined] = (setup_db / "corrupt").iterdir()
+        assert checkpoint.quarantined_as == str(quarantined)
+
+    legacy_path.write_text(json.dumps(records), encoding="utf-8")
+    with SessionLocal() as session:
+        assert migrate_legacy_vault(session) is True
+        assert sorted(session.scalars(select(VaultRecord.theme)).all()) == [f"record-{index}" for index in range(4)]
+        assert session.scalars(select(ImportCheckpoint)).all() == []
+
+
+def test_iter_legacy_records_streams_wrapped_records(tmp_path: Path):
+    path = tmp_path / "wrapped.json"
+    records = [{"theme": "ä" * 40, "posts": [{"n": index}]} for index in range(5)]
+    path.write_text(json.dumps({"version": 2, "records": records}, ensure_ascii=False), encoding="utf-8")
+
+    streamed = list(legacy.iter_legacy_records(path, read_size=16))
+    assert [record for record, _ in streamed] == records
+
+    _, offset = streamed[1]
+    resumed = [record for record, _ in legacy.iter_legacy_records(path, offset, read_size=16)]
+    assert resumed == records[2:]
+
+
+def test_iter_legacy_records_raises_when_a_resumed_file_is_truncated(tmp_path: Path):
+    path = tmp_path / "vault.json"
+    records = [{"theme": f"record-{index}"} for index in range(4)]
+    path.write_text(json.dumps(records), encoding="utf-8")
+    _, offset = list(legacy.iter_legacy_records(path))[1]
+
+    # Cut off after the third record, before the closing bracket.
+    path.write_bytes(path.read_bytes()[: offset + len(json.dumps(records[2])) + 2])
+    resumed = legacy.iter_legacy_records(path, offset)
+    assert next(resumed)[0] == records[2]
+    with pytest.raises(json.JSONDecodeError, match="Unterminated array"):
+        next(resumed)
+
+
+def test_import_legacy_directory_quarantines_corrupt_files(setup_db: Path):
+    source_dir = setup_db / "dumps"
+    source_dir.mkdir()
+    (source_dir / "a.json").write_text(json.dumps([{"theme": "a1"}, {"theme": "a2"}]), encoding="utf-8")
+    (source_dir / "b.json").write_text(json.dumps({"records": [{"title": "b1"}]}), encoding="utf-8")
+    (source_dir / "c.json").write_text("[{\"theme\": ", encoding="utf-8")
+
+    results = import_legacy_directory(source_dir, jobs=2)
+
+    assert [(result.path.name, result.status, result.rows) for result in results] == [
+        ("a.json", "imported", 2),
+        ("b.json", "imported", 1),
+        ("c.json", "corrupt", 0),
+    ]
+    assert not list(source_dir.glob("*.json"))
+    assert any(child.name.startswith("c.json") for child in (setup_db / "corrupt").iterdir())
+    with get_sessionmaker()() as session:
+        assert sorted(session.scalars(select(VaultRecord.theme)).all()) == ["a1", "a2", "b1"]
+
+
+def test_import_legacy_directory_bounds_parsed_files_in_flight(setup_db: Path, monkeypatch: pytest.MonkeyPatch):
+    source_dir = setup_db / "dumps"
+    source_dir.mkdir()
+    for index in range(6):
+        (source_dir / f"{index}.json").write_text(json.dumps([{"theme": f"t{index}"}]), encoding="utf-8")
+    outstanding: list[int] = []
+    in_flight = 0
+
+    class CountingPool(ThreadPoolExecutor):
+        def submit(self, *args, **kwargs):
+            nonlocal in_flight
+            in_flight += 1
+            outstanding.append(in_flight)
+            return super().submit(*args, **kwargs)
+
+    finish = bulk_import._finish
+
+    def counted_finish(*args, **kwargs):
+        nonlocal in_flight
+        in_flight -= 1
+        return finish(*args, **kwargs)
+
+    monkeypatch.setattr(bulk_import, "ProcessPoolExecutor", CountingPool)
+    monkeypatch.setattr(bulk_import, "_finish", counted_finish)
+
+    results = import_legacy_directory(source_dir, jobs=2)
+
+    assert [result.status for result in results] == ["imported"] * 6
+    # Two parsing plus the next one submitted while a parsed file is written.
+    assert max(outstanding) <= 3
+
+
+def test_migrations_are_versioned_and_adopt_unversioned_databases(setup_db: Path):
+    engine = get_engine()
+    assert plan_migrations(engine).up_to_date
+    assert current_version(engine)[0] == LATEST_VERSION
+
+    with engine.begin() as connection:
+        connection.exec_driver_sql("DROP TABLE schema_version")
+        connection.exec_driver_sql("DROP INDEX ix_posts_agent_id_created_at")
+
+    plan = plan_migrations(engine)
+    assert [migration.version for migration in plan.pending] == [migration.version for migration in MIGRATIONS]
+    run_migrations()
+
+    assert plan_migrations(engine).up_to_date
+    index_names = {index["name"] for index in inspect(engine).get_indexes("posts")}
+    assert "ix_posts_agent_id_created_at" in index_names
+
+
+def test_migration_steps_applied_concurrently_are_skipped(setup_db: Path, monkeypatch: pytest.MonkeyPatch):
+    # A plan read before another process applied every step.
+    stale = MigrationPlan(0, MIGRATIONS, sync_metadata=True)
+    monkeypatch.setattr(migrate, "plan_migrations", lambda engine=None: stale)
+
+    assert migrate.apply_migrations(get_engine()) is stale
+
+    with get_engine().connect() as connection:
+        assert connection.exec_driver_sql("SELECT count(*) FROM schema_version").scalar() == len(MIGRATIONS)
+
+
+def test_current_version_does_not_treat_a_locked_database_as_unversioned():
+    class LockedEngine:
+        def connect(self):
+            raise OperationalError("SELECT", {}, sqlite3.OperationalError("database is locked"))
+
+    with pytest.raises(OperationalError):
+        current_version(LockedEngine())
+
+
+def test_vault_posts_migration_explodes_json_arrays(setup_db: Path):
+    engine = get_engine()
+    with engine.begin() as connection:
+        # Recreate the version 6 layout: posts inline on the record, no child table.
+        for statement in (
+            "DROP TABLE vault_posts_fts",
+            "DROP TABLE vault_posts",
+            "ALTER TABLE vault_records ADD COLUMN posts JSON",
+            "DELETE FROM schema_version WHERE version >= 7",
+        ):
+            connection.exec_driver_sql(statement)
+        connection.exec_driver_sql(
+            "INSERT INTO vault_records (id, theme, posts, created_at) VALUES "
+            "('r1', 'aurora', '[{\"body\": \"light\"}, \"plain\"]', '2024-01-01 00:00:00.000000'), "
+            "('r2', 'empty', NULL, '2024-01-02 00:00:00.000000'), "
+            "('r3', 'single', '{\"body\": \"alone\"}', '2024-01-03 00:00:00.000000'), "
+            "('r4', 'stdlib', '[{\"ratio\": NaN}]', '2024-01-04 00:00:00.000000'), "
+            "('r5', 'broken', '[{\"body\": ', '2024-01-05 00:00:00.000000')"
+        )
+
+    run_migrations()
+
+    assert plan_migrations(engine).up_to_date
+    assert "posts" not in {column["name"] for column in inspect(engine).get_columns("vault_records")}
+    with get_sessionmaker()() as session:
+        record = session.get(VaultRecord, "r1")
+        assert [post.content for post in record.posts] == [{"body": "light"}, "plain"]
+        assert session.get(VaultRecord, "r2").posts == []
+        assert [post.content for post in session.get(VaultRecord, "r3").posts] == [{"body": "alone"}]
+        assert [post.content for post in session.get(VaultRecord, "r4").posts] == [{"ratio": None}]
+        assert [post.content for post in session.get(VaultRecord, "r5").posts] == ['[{"body": ']
+        hits = session.execute(search_statement(match_expression("light"), ("vault",), 10, 0)).all()
+        assert [hit.id for hit in hits] == ["r1"]
+        # Records without posts are still found by theme.
+        hits = session.execute(search_statement(match_expression("empty"), ("vault",), 10, 0)).all()
+        assert [hit.id for hit in hits] == ["r2"]
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+from sqlalchemy import select
+
+from app.api.filters import post_filters, ritual_filters, vault_filters
+from app.api.pagination import PageParams, keyset_page
+from app.api.posts import POST_COLUMNS
+from app.api.query_catalog import QuerySamples, list_queries
+from app.api.rituals import RITUAL_COLUMNS
+from app.api.vault import VAULT_COLUMNS, vault_columns
+from app.config import get_settings
+from app.db.explain import explain_query_plan, plan_full_scans, plan_indexes, plan_scans_table
+from app.db.migrate import run_migrations
+from app.db.rollups import stats_statement
+from app.db.session import get_read_sessionmaker, reset_engine
+from app.models.post import Post
+from app.models.ritual import RitualLog
+from app.models.vault import VaultRecord
+
+
+@pytest.fixture()
+def session(tmp_path: Path):
+    get_settings.cache_clear()
+    reset_engine()
+    os.environ["AGENT_SPARK_DB_PATH"] = str(tmp_path / "db.sqlite")
+    os.environ["AGENT_SPARK_DEV_MODE"] = "true"
+    os.environ["AGENT_SPARK_SCHEDULER_ENABLED"] = "false"
+    os.environ["AGENT_SPARK_DATA_DIR"] = str(tmp_path)
+    run_migrations()
+    with get_read_sessionmaker()() as session:
+        yield session
+
+
+SINCE = datetime(2024, 1, 1, tzinfo=timezone.utc)
+PAGE = PageParams(after=(datetime(2025, 1, 1), "z"), limit=50)
+
+
+@pytest.mark.parametrize(
+    ("columns", "model", "filters", "index"),
+    [
+        (POST_COLUMNS, Post, post_filters(agent_id="a", theme=None, since=None, until=None), "ix_posts_agent_id_created_at"),
+        (POST_COLUMNS, Post, post_filters(agent_id=None, theme="t", since=None, until=None), "ix_posts_theme_created_at"),
+        (POST_COLUMNS, Post, post_filters(agent_id=None, theme=None, since=SINCE, until=None), "ix_posts_created_at_id"),
+        (
+            RITUAL_COLUMNS,
+            RitualLog,
+            ritual_filters(agent_id="a", event_type="wake", emotion=None, since=SINCE, until=None),
+            "ix_ritual_logs_agent_id_event_type_created_at",
+        ),
+        (
+            RITUAL_COLUMNS,
+            RitualLog,
+            ritual_filters(agent_id=None, event_type="wake", emotion=None, since=None, until=None),
+            "ix_ritual_logs_event_type_created_at",
+        ),
+        (
+            RITUAL_COLUMNS,
+            RitualLog,
+            ritual_filters(agent_id=None, event_type=None, emotion="calm", since=None, until=None),
+            "ix_ritual_logs_emotion_created_at",
+        ),
+        (VAULT_COLUMNS, VaultRecord, vault_filters(theme="t", since=None, until=None), "ix_vault_records_theme_created_at"),
+    ],
+)
+def test_filtered_pages_use_composite_indexes(session, columns, model, filters, index):
+    stmt = keyset_page(select(*columns).where(*filters), model.created_at, model.id, PAGE)
+    plan = explain_query_plan(session, stmt)
+    assert index in plan_indexes(plan), plan
+    assert not plan_scans_table(plan), plan
+
+
+def test_vault_post_previews_read_the_primary_key(session):
+    stmt = keyset_page(select(*vault_columns(posts_limit=3, post_count=True)), VaultRecord.created_at, VaultRecord.id, PAGE)
+    plan = explain_query_plan(session, stmt)
+    assert "sqlite_autoindex_vault_posts_1" in plan_indexes(plan), plan
+    assert not plan_scans_table(plan), plan
+
+
+@pytest.mark.parametrize("agent_id", ["a", None])
+def test_ritual_stats_read_rollups_by_index(session, agent_id):
+    plan = explain_query_plan(session, stats_statement("day", agent_id, SINCE, None))
+    assert plan_indexes(plan), plan
+    assert not plan_scans_table(plan), plan
+
+
+def test_no_list_query_scans_a_large_table(session):
+    scans = {
+        name: plan_full_scans(explain_query_plan(session, stmt)) & {"posts", "ritual_logs", "vault_records"}
+        for name, stmt in list_queries(QuerySamples(), get_settings())
+    }
+    assert not any(scans.values()), scans
+    assert plan_full_scans(["SCAN posts", "SCAN TABLE ritual_logs AS r", "SCAN vault_records USING INDEX ix"]) == {
+        "posts",
+        "ritual_logs",
+    }
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import time
+
+from app.api.response_cache import CacheEntry, ResponseCache
+from app.db.changes import ChangeTracker
+
+
+def _entry(tables: tuple[str, ...], tracker: ChangeTracker, size: int, ttl: float = 60.0) -> CacheEntry:
+    return CacheEntry(tables, tracker.version(tables), [], b"x" * size, time.monotonic() + ttl)
+
+
+def test_lru_eviction_respects_byte_budget():
+    tracker = ChangeTracker()
+    cache = ResponseCache(max_bytes=250, ttl_seconds=60, tracker=tracker)
+    cache.put("a", _entry(("posts",), tracker, 100))
+    cache.put("b", _entry(("posts",), tracker, 100))
+    assert cache.get("a") is not None
+    cache.put("c", _entry(("posts",), tracker, 100))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] == 200
+
+
+def test_entries_expire_and_follow_table_versions():
+    tracker = ChangeTracker()
+    cache = ResponseCache(max_bytes=1000, ttl_seconds=60, tracker=tracker)
+    cache.put("posts", _entry(("posts",), tracker, 10))
+    cache.put("agents", _entry(("agents",), tracker, 10))
+    cache.put("expired", _entry(("agents",), tracker, 10, ttl=-1))
+
+    tracker.record_write(["posts"])
+
+    assert cache.get("posts") is None
+    assert cache.get("agents") is not None
+    assert cache.get("expired") is None
+    assert cache.stats()["expirations"] == 1
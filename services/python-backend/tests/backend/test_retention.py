@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import os
+import time
+from functools import partial
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from uuid import uuid4
+
+import orjson
+import pytest
+from sqlalchemy import delete, func, select
+
+from app.config import get_settings
+from app.db.migrate import run_migrations
+from app.db.retention import iter_archive, run_retention
+from app.db.session import get_engine, get_sessionmaker, reset_engine
+from app.db.writer import write_rows
+from app.models.archive_segment import ArchiveSegment
+from app.models.post import Post
+from app.models.ritual import RitualLog
+from app.models.ritual_rollup import RitualRollup
+from app.utils import locking
+from app.utils.locking import exclusive_lock
+
+NOW = datetime.now(timezone.utc)
+
+
+@pytest.fixture()
+def setup_db(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    get_settings.cache_clear()
+    reset_engine()
+    os.environ["AGENT_SPARK_DB_PATH"] = str(tmp_path / "db.sqlite")
+    os.environ["AGENT_SPARK_DEV_MODE"] = "true"
+    os.environ["AGENT_SPARK_SCHEDULER_ENABLED"] = "false"
+    os.environ["AGENT_SPARK_DATA_DIR"] = str(tmp_path)
+    monkeypatch.setenv("AGENT_SPARK_RETENTION_MAX_AGE_DAYS", '{"ritual_logs": 30}')
+    monkeypatch.setenv("AGENT_SPARK_RETENTION_MAX_ROWS", '{"posts": 2}')
+    monkeypatch.setenv("AGENT_SPARK_ARCHIVE_CHUNK_SIZE", "2")
+    run_migrations()
+    yield tmp_path
+    reset_engine()
+    get_settings.cache_clear()
+
+
+def _ritual(days_ago: float) -> dict:
+    return {
+        "id": str(uuid4()),
+        "agent_id": None,
+        "event_type": "wake",
+        "emotion": None,
+        "context": None,
+        "text": f"{days_ago} days ago",
+        "created_at": NOW - timedelta(days=days_ago),
+    }
+
+
+def _post(minutes_ago: int) -> dict:
+    return {
+        "id": str(uuid4()),
+        "agent_id": None,
+        "theme": f"post-{minutes_ago}",
+        "content": {"n": minutes_ago},
+        "created_at": NOW - timedelta(minutes=minutes_ago),
+    }
+
+
+def _rollup_total(session) -> int:
+    return session.scalar(select(func.sum(RitualRollup.count)).where(RitualRollup.bucket == "day")) or 0
+
+
+def test_expired_rows_move_to_compressed_segments(setup_db: Path):
+    write_rows(RitualLog, [_ritual(40), _ritual(40.5), _ritual(45), _ritual(1)])
+    write_rows(Post, [_post(minutes) for minutes in (1, 2, 3, 4)])
+
+    results = {result.table: result for result in run_retention()}
+    assert (results["ritual_logs"].rows, results["posts"].rows) == (3, 2)
+
+    with get_sessionmaker()() as session:
+        assert session.scalar(select(func.count()).select_from(RitualLog)) == 1
+        assert sorted(session.scalars(select(Post.theme))) == ["post-1", "post-2"]
+        # Archived rituals stay counted; ordinary deletes still subtract.
+        assert _rollup_total(session) == 4
+        session.execute(delete(RitualLog))
+        session.commit()
+        assert _rollup_total(session) == 3
+        segments = session.scalars(select(ArchiveSegment).where(ArchiveSegment.table_name == "ritual_logs")).all()
+
+    assert {segment.state for segment in segments} == {"archived"}
+    assert sum(segment.rows for segment in segments) == 3
+    assert all((setup_db / "archive" / segment.path).is_file() for segment in segments)
+    assert all(segment.path.endswith(".jsonl.gz") for segment in segments)
+
+    archived = [orjson.loads(line) for line in iter_archive("ritual_logs")]
+    assert sorted(row["text"] for row in archived) == ["40 days ago", "40.5 days ago", "45 days ago"]
+    recent = [orjson.loads(line) for line in iter_archive("ritual_logs", since=NOW - timedelta(days=42))]
+    assert sorted(row["text"] for row in recent) == ["40 days ago", "40.5 days ago"]
+    assert [orjson.loads(line)["theme"] for line in iter_archive("posts")] == ["post-4", "post-3"]
+
+    assert [result.rows for result in run_retention()] == [0, 0]
+
+
+def test_orphan_segments_are_removed_and_space_reclaimed(setup_db: Path):
+    with get_engine().connect() as connection:
+        assert connection.exec_driver_sql("PRAGMA auto_vacuum").scalar() == 2
+
+    orphan = setup_db / "archive" / "ritual_logs" / "2020-01-01" / "crashed-00000.jsonl.gz.partial"
+    orphan.parent.mkdir(parents=True)
+    orphan.write_bytes(b"")
+    os.utime(orphan, (time.time() - 60, time.time() - 60))
+    # Written after this run started, so it may belong to a run that has not committed yet.
+    pending = orphan.with_name("running-00000.jsonl.gz.partial")
+    pending.write_bytes(b"")
+    os.utime(pending, (time.time() + 60, time.time() + 60))
+    write_rows(RitualLog, [_ritual(60) | {"text": "x" * 4000} for _ in range(200)])
+
+    result = {result.table: result for result in run_retention()}["ritual_logs"]
+    assert result.rows == 200
+    assert result.freed_pages > 0
+    assert not orphan.exists()
+    assert pending.exists()
+
+
+def test_archive_run_skips_a_table_another_run_is_archiving(setup_db: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(locking, "exclusive_lock", partial(exclusive_lock, timeout=0.1))
+    write_rows(RitualLog, [_ritual(40)])
+
+    with exclusive_lock(setup_db / "archive" / "ritual_logs.lock"):
+        results = {result.table: result for result in run_retention()}
+    assert results["ritual_logs"].skipped and results["ritual_logs"].rows == 0
+    assert not results["posts"].skipped
+
+    assert {result.table: result for result in run_retention()}["ritual_logs"].rows == 1
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+from sqlalchemy import inspect
+
+from app.config import get_settings
+from app.db.migrate import run_migrations
+from app.db.session import get_engine, reset_engine
+from app.engine import scheduler
+from app.utils.locking import LeaderLease, read_lease
+
+
+def test_lease_fails_over_to_standby(tmp_path: Path):
+    path = tmp_path / "scheduler.lease"
+    events = []
+    leader = LeaderLease(
+        path, heartbeat_seconds=60, on_acquire=lambda: events.append("a+"), on_release=lambda: events.append("a-")
+    )
+    standby = LeaderLease(path, heartbeat_seconds=60, on_acquire=lambda: events.append("b+"))
+
+    assert leader.renew() is True
+    assert standby.renew() is False
+    assert read_lease(path, 60)["acquired_at"] is not None
+    assert read_lease(path, 60)["stale"] is False
+
+    leader.stop()
+    assert standby.renew() is True
+    assert events == ["a+", "a-", "b+"]
+    standby.stop()
+
+
+def test_stopping_leader_keeps_the_info_of_a_standby_that_takes_over(tmp_path: Path):
+    path = tmp_path / "scheduler.lease"
+    leader = LeaderLease(path, heartbeat_seconds=60)
+    standby = LeaderLease(path, heartbeat_seconds=60)
+    assert leader.renew() is True
+
+    lock = leader._lock
+    release = lock.release
+
+    def release_then_standby_renews():
+        release()
+        assert standby.renew() is True
+
+    lock.release = release_then_standby_renews
+    leader.stop()
+
+    info = read_lease(path, 60)
+    assert info is not None and info["acquired_at"] == standby._acquired_at
+    standby.stop()
+
+
+@pytest.fixture()
+def leader_scheduler(tmp_path: Path):
+    get_settings.cache_clear()
+    reset_engine()
+    os.environ["AGENT_SPARK_DB_PATH"] = str(tmp_path / "db.sqlite")
+    os.environ["AGENT_SPARK_DEV_MODE"] = "true"
+    os.environ["AGENT_SPARK_SCHEDULER_ENABLED"] = "true"
+    os.environ["AGENT_SPARK_DATA_DIR"] = str(tmp_path)
+    run_migrations()
+    scheduler.get_scheduler()
+    yield tmp_path
+    scheduler.shutdown_scheduler()
+    os.environ["AGENT_SPARK_SCHEDULER_ENABLED"] = "false"
+    get_settings.cache_clear()
+
+
+def test_only_the_leader_runs_persistent_jobs(leader_scheduler: Path):
+    status = scheduler.scheduler_status()
+    assert status["is_leader"] is True
+    assert status["leader"]["pid"] == os.getpid()
+    assert sorted(job["id"] for job in status["jobs"]) == ["retention", "threadlight"]
+    assert "apscheduler_jobs" in inspect(get_engine()).get_table_names()
+
+    standby = LeaderLease(leader_scheduler / "scheduler.lease", heartbeat_seconds=60)
+    assert standby.renew() is False
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+from pathlib import Path
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.exc import OperationalError
+
+from app.config import get_settings
+from app.db.migrate import run_migrations
+from app.models.agent import Agent
+from app.db.session import get_engine, get_read_engine, reset_engine, session_scope, with_busy_retry
+
+
+@pytest.fixture()
+def setup_db(tmp_path: Path):
+    get_settings.cache_clear()
+    reset_engine()
+    os.environ["AGENT_SPARK_DB_PATH"] = str(tmp_path / "db.sqlite")
+    os.environ["AGENT_SPARK_DEV_MODE"] = "true"
+    os.environ["AGENT_SPARK_SCHEDULER_ENABLED"] = "false"
+    os.environ["AGENT_SPARK_DATA_DIR"] = str(tmp_path)
+    os.environ["AGENT_SPARK_DB_BUSY_RETRY_BASE_MS"] = "1"
+    run_migrations()
+    yield tmp_path
+    os.environ.pop("AGENT_SPARK_DB_BUSY_RETRY_BASE_MS", None)
+    reset_engine()
+
+
+def test_writer_and_reader_pragmas(setup_db: Path):
+    with get_engine().connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert conn.exec_driver_sql("PRAGMA busy_timeout").scalar() == 5000
+        assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+
+    with get_read_engine().connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA query_only").scalar() == 1
+        with pytest.raises(OperationalError):
+            conn.execute(text("INSERT INTO agents (id, name, traits, created_at) VALUES ('a', 'b', '{}', '2024-01-01')"))
+
+
+def test_busy_errors_are_retried(setup_db: Path):
+    attempts: list[int] = []
+    resets: list[int] = []
+
+    def flaky() -> str:
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise OperationalError("COMMIT", {}, sqlite3.OperationalError("database is locked"))
+        return "done"
+
+    assert with_busy_retry(flaky, on_retry=lambda: resets.append(1)) == "done"
+    assert len(attempts) == 3
+    assert len(resets) == 2
+
+
+def test_non_busy_errors_are_not_retried(setup_db: Path):
+    attempts: list[int] = []
+
+    def broken() -> None:
+        attempts.append(1)
+        raise OperationalError("SELECT", {}, sqlite3.OperationalError("no such table: nope"))
+
+    with pytest.raises(OperationalError):
+        with_busy_retry(broken)
+    assert len(attempts) == 1
+
+
+def test_session_scope_rolls_back_a_busy_commit(setup_db: Path, monkeypatch: pytest.MonkeyPatch):
+    with session_scope() as session:
+        session.add(Agent(id="a1", name="first", traits={}))
+
+    def busy_commit(self: object) -> None:
+        raise OperationalError("COMMIT", {}, sqlite3.OperationalError("database is locked"))
+
+    with pytest.raises(OperationalError):
+        with session_scope() as session:
+            session.get(Agent, "a1").name = "renamed"
+            session.add(Agent(id="a2", name="second", traits={}))
+            session.flush()
+            monkeypatch.setattr(type(session), "commit", busy_commit)
+    monkeypatch.undo()
+
+    with session_scope() as session:
+        assert session.execute(select(Agent.id, Agent.name)).all() == [("a1", "first")]
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import logging
+import os
+from pathlib import Path
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.cli import main as cli_main
+from app.config import get_settings
+from app.db.session import reset_engine
+from app.main import create_app, lifespan as app_lifespan
+
+
+@pytest.fixture()
+def slow_everything(tmp_path: Path):
+    get_settings.cache_clear()
+    reset_engine()
+    os.environ["AGENT_SPARK_DB_PATH"] = str(tmp_path / "db.sqlite")
+    os.environ["AGENT_SPARK_DEV_MODE"] = "true"
+    os.environ["AGENT_SPARK_SCHEDULER_ENABLED"] = "false"
+    os.environ["AGENT_SPARK_DATA_DIR"] = str(tmp_path)
+    os.environ["AGENT_SPARK_SLOW_QUERY_MS"] = "0.000001"
+    yield
+    del os.environ["AGENT_SPARK_SLOW_QUERY_MS"]
+    reset_engine()
+    get_settings.cache_clear()
+
+
+@pytest.mark.asyncio()
+async def test_slow_queries_are_logged_with_route_and_plan(slow_everything, caplog: pytest.LogCaptureFixture):
+    app = create_app()
+    async with app_lifespan(app):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://testserver") as client:
+            caplog.clear()
+            with caplog.at_level(logging.WARNING, logger="app.db.slow_queries"):
+                assert (await client.get("/posts", params={"theme": "dawn"})).status_code == 200
+
+    messages = [record.getMessage() for record in caplog.records if record.name == "app.db.slow_queries"]
+    listing = next(message for message in messages if "FROM posts" in message)
+    assert "route GET /posts" in listing
+    assert "'dawn'" in listing
+    assert "plan: SEARCH posts USING INDEX ix_posts_theme_created_at" in listing
+
+
+def test_explain_routes_reports_every_list_query(slow_everything, capsys: pytest.CaptureFixture[str]):
+    cli_main(["explain-routes", "--explain-only"])
+    output = capsys.readouterr().out
+    names = [line.split()[0] for line in output.splitlines()]
+    assert {"posts?theme", "rituals?emotion&cursor", "vault/export", "search"} <= set(names)
+    assert "FULL SCAN" not in output
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+from pathlib import Path
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import func, select
+
+from app.config import get_settings
+from app.db import legacy
+from app.db.session import get_read_sessionmaker, reset_engine
+from app.main import create_app, lifespan as app_lifespan
+from app.models.vault import VaultRecord
+from app.utils.importtime import measure_imports, parse_importtime
+
+
+@pytest.fixture()
+def fast_start(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    get_settings.cache_clear()
+    reset_engine()
+    monkeypatch.setenv("AGENT_SPARK_DB_PATH", str(tmp_path / "db.sqlite"))
+    monkeypatch.setenv("AGENT_SPARK_LEGACY_VAULT_PATH", str(tmp_path / "vault.json"))
+    monkeypatch.setenv("AGENT_SPARK_DATA_DIR", str(tmp_path))
+    monkeypatch.setenv("AGENT_SPARK_SCHEDULER_ENABLED", "false")
+    monkeypatch.setenv("AGENT_SPARK_FAST_START", "true")
+    yield tmp_path
+    reset_engine()
+    get_settings.cache_clear()
+
+
+@pytest.mark.asyncio()
+async def test_fast_start_imports_legacy_vault_in_background(fast_start: Path, monkeypatch: pytest.MonkeyPatch):
+    (fast_start / "vault.json").write_text(json.dumps([{"theme": "aurora", "posts": [{"body": "light"}]}]), "utf-8")
+    release = threading.Event()
+    migrate = legacy.migrate_legacy_vault
+
+    def held_migration(session, stop=None):
+        release.wait(5)
+        return migrate(session, stop)
+
+    monkeypatch.setattr(legacy, "migrate_legacy_vault", held_migration)
+    app = create_app()
+    async with app_lifespan(app):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://testserver") as client:
+            assert (await client.get("/health")).status_code == 200
+            pending = await client.get("/ready")
+            assert pending.status_code == 503
+            assert pending.json()["pending"] == ["legacy_import"]
+
+            release.set()
+            for _ in range(100):
+                ready = await client.get("/ready")
+                if ready.status_code == 200:
+                    break
+                await asyncio.sleep(0.05)
+            assert ready.json()["status"] == "ready"
+            assert "legacy_import" in ready.json()["seconds"]
+
+    with get_read_sessionmaker()() as session:
+        assert session.scalar(select(func.count()).select_from(VaultRecord)) == 1
+
+
+def test_importing_main_defers_app_and_optional_dependencies(fast_start: Path):
+    report = measure_imports("app.main")
+    modules = {timing.module for timing in report.timings}
+    assert "app.main" in modules
+    assert not modules & {"apscheduler", "uvicorn", "portalocker", "app.api.aio", "app.api.agents"}
+    assert report.build_seconds == 0 or report.build_seconds < report.import_seconds
+
+    [timing] = parse_importtime("import time:       120 |       4500 |     app.api.agents")
+    assert (timing.module, timing.self_us, timing.cumulative_us, timing.depth) == ("app.api.agents", 120, 4500, 2)
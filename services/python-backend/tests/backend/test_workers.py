@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+from pathlib import Path
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.config import get_settings
+from app.db.migrate import plan_migrations, run_migrations
+from app.db.session import get_engine, reset_engine
+from app.engine import events
+from app.engine.events import RESYNC, EventBus, EventRelay, get_event_bus
+from app.main import create_app, lifespan as app_lifespan
+from app.supervisor import prepare_workers_environment
+
+
+@pytest.fixture()
+def worker_env(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    get_settings.cache_clear()
+    reset_engine()
+    monkeypatch.setenv("AGENT_SPARK_DB_PATH", str(tmp_path / "db.sqlite"))
+    monkeypatch.setenv("AGENT_SPARK_LEGACY_VAULT_PATH", str(tmp_path / "vault.json"))
+    monkeypatch.setenv("AGENT_SPARK_DATA_DIR", str(tmp_path))
+    monkeypatch.setenv("AGENT_SPARK_DEV_MODE", "true")
+    monkeypatch.setenv("AGENT_SPARK_SCHEDULER_ENABLED", "false")
+    yield tmp_path
+    reset_engine()
+    get_settings.cache_clear()
+
+
+@pytest.mark.asyncio()
+async def test_change_versions_follow_writes_from_other_connections(worker_env: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("AGENT_SPARK_CHANGE_EPOCH", "feedc0de")
+    app = create_app()
+    async with app_lifespan(app):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://testserver") as client:
+            assert (await client.post("/quickpost", json={"theme": "dawn"})).status_code == 201
+            first = await client.get("/posts")
+            etag = first.headers["ETag"]
+            assert etag.startswith('W/"feedc0de.')
+            assert (await client.get("/posts", headers={"If-None-Match": etag})).status_code == 304
+
+            # Another process (a CLI import, another worker or container) commits a post directly.
+            with sqlite3.connect(worker_env / "db.sqlite") as other:
+                other.execute(
+                    "INSERT INTO posts (id, agent_id, theme, content, created_at) "
+                    "VALUES ('outside', NULL, 'dusk', '{}', '2030-01-01 00:00:00.000000')"
+                )
+
+            refreshed = await client.get("/posts", headers={"If-None-Match": etag})
+            assert refreshed.status_code == 200
+            assert refreshed.headers["ETag"] != etag
+            assert "outside" in {post["id"] for post in refreshed.json()}
+
+
+@pytest.mark.asyncio()
+async def test_worker_event_feeds_receive_events_published_by_other_workers(
+    worker_env: Path, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setenv("AGENT_SPARK_EVENTS_RELAY", "true")
+    monkeypatch.setenv("AGENT_SPARK_EVENTS_RELAY_INTERVAL_SECONDS", "0.02")
+    app = create_app()
+    async with app_lifespan(app):
+        subscription = get_event_bus().subscribe()
+        # The leader's scheduler, in another worker, writes a ritual and publishes it.
+        other = EventBus()
+        other.share(worker_env / "db.sqlite", 0.02)
+        try:
+            other.publish_rows("ritual_logs", [{"id": "r1", "event_type": "wake"}])
+            event = await asyncio.wait_for(subscription.get(), 5)
+        finally:
+            other.unshare()
+        assert (event.type, event.data) == ("ritual.created", {"id": "r1", "event_type": "wake"})
+        assert event.id.startswith(get_event_bus().epoch)
+
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://testserver") as client:
+            assert (await client.post("/quickpost", json={"theme": "dawn"})).status_code == 201
+        # Events published here reach this worker's clients once, not again through the relay.
+        assert (await asyncio.wait_for(subscription.get(), 5)).type == "post.created"
+        await asyncio.sleep(0.1)
+        assert subscription.queue.empty()
+        get_event_bus().unsubscribe(subscription)
+
+    with sqlite3.connect(worker_env / "db.sqlite") as db:
+        assert [row[0] for row in db.execute("SELECT type FROM shared_events ORDER BY id")] == [
+            "ritual.created",
+            "post.created",
+        ]
+
+
+@pytest.mark.asyncio()
+async def test_event_relay_resyncs_after_missing_pruned_events(worker_env: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(events, "RELAY_KEEP", 2)
+    run_migrations()
+    db_path = worker_env / "db.sqlite"
+    publisher, listener = EventBus(), EventBus()
+    outgoing, incoming = EventRelay(publisher, db_path, 1), EventRelay(listener, db_path, 1)
+    subscription = listener.subscribe()
+    incoming.tick()
+
+    for n in range(5):
+        event = publisher.publish("post.created", {"n": n}, relay=False)
+        outgoing.send(event)
+    outgoing.tick()
+    incoming.tick()
+
+    await asyncio.sleep(0)
+    received = [subscription.queue.get_nowait() for _ in range(subscription.queue.qsize())]
+    assert [(event.type, event.data) for event in received] == [
+        (RESYNC, None),
+        ("post.created", {"n": 3}),
+        ("post.created", {"n": 4}),
+    ]
+
+
+def test_prepare_workers_environment_runs_startup_once(worker_env: Path, monkeypatch: pytest.MonkeyPatch):
+    # Registered with monkeypatch so the values the supervisor sets are undone afterwards.
+    monkeypatch.setenv("AGENT_SPARK_SKIP_STARTUP_TASKS", "false")
+    monkeypatch.setenv("AGENT_SPARK_EVENTS_RELAY", "false")
+    monkeypatch.setenv("AGENT_SPARK_CHANGE_EPOCH", "")
+
+    prepare_workers_environment()
+
+    settings = get_settings()
+    assert settings.skip_startup_tasks and settings.events_relay and settings.change_epoch
+    assert plan_migrations(get_engine()).up_to_date
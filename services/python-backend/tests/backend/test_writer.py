@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+
+from app.config import get_settings
+from app.db.migrate import run_migrations
+from app.db.session import get_sessionmaker, reset_engine
+from app.db.writer import WriteCoalescer
+from app.models.post import Post
+
+
+@pytest.fixture()
+def setup_db(tmp_path: Path):
+    get_settings.cache_clear()
+    reset_engine()
+    os.environ["AGENT_SPARK_DB_PATH"] = str(tmp_path / "db.sqlite")
+    os.environ["AGENT_SPARK_DEV_MODE"] = "true"
+    os.environ["AGENT_SPARK_SCHEDULER_ENABLED"] = "false"
+    os.environ["AGENT_SPARK_DATA_DIR"] = str(tmp_path)
+    run_migrations()
+    yield tmp_path
+    reset_engine()
+
+
+def _post_row(row_id: str | None = None) -> dict:
+    return {
+        "id": row_id or str(uuid4()),
+        "theme": "batch",
+        "content": {},
+        "agent_id": None,
+        "created_at": datetime.now(timezone.utc),
+    }
+
+
+def test_concurrent_writes_share_commits(setup_db: Path):
+    coalescer = WriteCoalescer(enabled=True, max_batch_size=64, window_ms=20)
+    try:
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            futures = [pool.submit(lambda: coalescer.submit(Post, [_post_row()]).result()) for _ in range(64)]
+            assert [future.result() for future in futures] == [1] * 64
+        stats = coalescer.stats()
+    finally:
+        coalescer.close()
+
+    assert stats["items"] == 64
+    assert stats["batches"] < 64
+    assert stats["max_batch_size"] > 1
+    with get_sessionmaker()() as session:
+        assert session.scalar(select(func.count()).select_from(Post)) == 64
+
+
+def test_failed_write_only_fails_its_own_request(setup_db: Path):
+    duplicate_id = str(uuid4())
+    coalescer = WriteCoalescer(enabled=True, max_batch_size=8, window_ms=50)
+    try:
+        coalescer.submit(Post, [_post_row(duplicate_id)]).result()
+        good = coalescer.submit(Post, [_post_row()])
+        bad = coalescer.submit(Post, [_post_row(duplicate_id)])
+        assert good.result() == 1
+        with pytest.raises(IntegrityError):
+            bad.result()
+    finally:
+        coalescer.close()
+
+    with get_sessionmaker()() as session:
+        assert session.scalar(select(func.count()).select_from(Post)) == 2
+
+
+def test_write_order_needs_only_the_models_in_the_batch():
+    # A fresh interpreter: here every model module is already imported.
+    script = (
+        "import json\n"
+        "from app.db.writer import parents_first\n"
+        "from app.models.post import Post\n"
+        "from app.models.vault import VaultPost, VaultRecord\n"
+        "print(json.dumps([model.__name__ for model in parents_first([VaultPost, Post, VaultRecord])]))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, check=True, cwd=Path(__file__).parents[2]
+    )
+    order = json.loads(result.stdout)
+    assert sorted(order) == ["Post", "VaultPost", "VaultRecord"]
+    assert order.index("VaultRecord") < order.index("VaultPost")